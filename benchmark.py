@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+
+# Mede as operações de cada representação de grafo sobre todas as entradas de trabalho_pt1 e trabalho_pt2.
+#   python benchmark.py --out atual.json
+#   python benchmark.py --out atual.json --compare baseline.json
+# Cada trabalho tem o seu graph.py, então os dois módulos são carregados pelo caminho e não por import.
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from glob import glob
+from os import path
+from types import ModuleType
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+ROOT = path.dirname(path.abspath(__file__))
+
+BACKENDS = {
+    "pt1": ["matriz", "matriz_bits", "lista", "csr"],
+    "pt2": ["matriz", "lista", "csr"],
+}
+OPERATIONS = {
+    "pt1": ["load", "bfs", "dfs", "components", "degrees"],
+    "pt2": ["load", "bfs", "dfs", "components", "degrees", "dijkstra_point", "dijkstra_source"],
+}
+# Bytes por célula das representações densas, para pular entradas que não cabem na memória
+DENSE_CELL_BYTES = {"matriz": 1.0, "matriz_bits": 1 / 8}
+
+
+def load_graph_module(trabalho: str) -> ModuleType:
+    module_path = path.join(ROOT, f"trabalho_{trabalho}", "src", "graph.py")
+    spec = importlib.util.spec_from_file_location(f"graph_{trabalho}", module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def read_vertices_num(file_path: str) -> int:
+    with open(file_path) as file:
+        return int(file.readline())
+
+
+def measure(run: Callable[[], object], warmups: int, repetitions: int) -> List[float]:
+    for _ in range(warmups):
+        run()
+
+    times = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    return times
+
+
+def operation_runs(graph, operation: str) -> Callable[[], object]:
+    origin = graph.labels[0]
+    end = graph.labels[-1]
+
+    if operation == "bfs":
+        return lambda: graph.breadth_first_search(origin, raw=True)
+    if operation == "dfs":
+        return lambda: graph.depth_first_search(origin, raw=True)
+    if operation == "components":
+        return lambda: graph.find_connected_components()
+    if operation == "degrees":
+        return lambda: graph.get_graph_degrees(raw=True)
+    if operation == "dijkstra_point":
+        return lambda: graph.find_minimum_path(origin, end)
+    if operation == "dijkstra_source":
+        return lambda: graph._dijkstra(origin, raw=True)
+
+    raise ValueError(f"Operação desconhecida: {operation}")
+
+
+def run_benchmarks(args: argparse.Namespace) -> List[Dict]:
+    results = []
+
+    for trabalho in args.trabalhos:
+        module = load_graph_module(trabalho)
+        weighted = trabalho == "pt2"
+        input_paths = sorted(glob(path.join(ROOT, f"trabalho_{trabalho}", "input", "*.txt")))
+
+        for input_path in input_paths:
+            if args.inputs and not any(name in path.basename(input_path) for name in args.inputs):
+                continue
+            vertices_num = read_vertices_num(input_path)
+
+            for backend in BACKENDS[trabalho]:
+                if args.backends and backend not in args.backends:
+                    continue
+                if vertices_num**2 * DENSE_CELL_BYTES.get(backend, 0) > args.max_dense_bytes:
+                    print(f"{trabalho} {path.basename(input_path)} {backend}: pulado, a matriz não cabe no limite")
+                    continue
+
+                def load() -> object:
+                    extra = (weighted,) if weighted else ()
+                    return module.Graph.from_edge_file(input_path, backend, *extra, cache=False)
+
+                for operation in OPERATIONS[trabalho]:
+                    if args.operations and operation not in args.operations:
+                        continue
+
+                    if operation == "load":
+                        run = load
+                    else:
+                        graph = load()
+                        # Sem o cache de caminhos cada repetição recalcula o Dijkstra
+                        if weighted:
+                            graph.path_cache_size = 0
+                        run = operation_runs(graph, operation)
+
+                    # As mensagens de caminho inexistente não interessam aqui
+                    try:
+                        with contextlib.redirect_stdout(io.StringIO()):
+                            times = measure(run, args.warmups, args.repetitions)
+                            # O tracemalloc deixa tudo mais lento, então o pico é medido numa execução à parte
+                            with module.MemoryPeak() as peak:
+                                run()
+                    except ValueError as error:
+                        # Ex.: caminho mínimo com ciclo negativo, que agora é um erro e não só um aviso
+                        print(f"{trabalho} {path.basename(input_path)} {backend} {operation}: pulado, {error}")
+                        continue
+
+                    result = {
+                        "trabalho": trabalho,
+                        "input": path.basename(input_path),
+                        "backend": backend,
+                        "operation": operation,
+                        "repetitions": args.repetitions,
+                        "median": float(np.median(times)),
+                        "p95": float(np.percentile(times, 95)),
+                        "min": min(times),
+                        "peak_bytes": peak.peak,
+                    }
+                    results.append(result)
+                    print(
+                        f"{trabalho} {result['input']} {backend} {operation}: "
+                        f"mediana {result['median']:.2e}s | p95 {result['p95']:.2e}s | pico {peak.peak // 1024} kb",
+                        flush=True,
+                    )
+
+    return results
+
+
+def result_key(result: Dict) -> Tuple[str, str, str, str]:
+    return result["trabalho"], result["input"], result["backend"], result["operation"]
+
+
+def compare(results: List[Dict], baseline_path: str, tolerance: float, min_delta: float) -> List[Dict]:
+    # Regressão: a mediana piorou além da tolerância relativa e de um mínimo absoluto (ruído em tempos curtos)
+    with open(baseline_path) as file:
+        baseline = {result_key(result): result for result in json.load(file)["results"]}
+
+    regressions = []
+    for result in results:
+        previous = baseline.get(result_key(result))
+        if previous is None:
+            continue
+
+        ratio = result["median"] / previous["median"] if previous["median"] > 0 else float("inf")
+        if ratio > 1 + tolerance and result["median"] - previous["median"] > min_delta:
+            regressions.append({**result, "baseline_median": previous["median"], "ratio": ratio})
+
+    return regressions
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark das representações de grafo dos dois trabalhos")
+    parser.add_argument("--out", default="benchmark.json", help="arquivo JSON com os resultados")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON de uma execução anterior para comparar")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="piora relativa aceita na mediana")
+    parser.add_argument("--min-delta", type=float, default=1e-3, help="piora absoluta mínima (s) de uma regressão")
+    parser.add_argument("--warmups", type=int, default=1)
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument("--trabalhos", nargs="+", choices=sorted(BACKENDS), default=sorted(BACKENDS))
+    parser.add_argument("--backends", nargs="+", help="apenas estas representações (ex.: lista csr)")
+    parser.add_argument("--operations", nargs="+", help="apenas estas operações (ex.: bfs components)")
+    parser.add_argument("--inputs", nargs="+", help="apenas entradas cujo nome contém um destes trechos")
+    parser.add_argument("--max-dense-bytes", type=float, default=2**31, help="limite de memória das matrizes densas")
+
+    args = parser.parse_args()
+    if args.repetitions < 1 or args.warmups < 0:
+        parser.error("Quantidade de repetições inválida!")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = run_benchmarks(args)
+
+    with open(args.out, "w") as file:
+        json.dump(
+            {
+                "meta": {
+                    "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    "python": platform.python_version(),
+                    "numpy": np.__version__,
+                    "machine": platform.platform(),
+                    "warmups": args.warmups,
+                    "repetitions": args.repetitions,
+                },
+                "results": results,
+            },
+            file,
+            indent=2,
+        )
+
+    if args.compare is not None:
+        regressions = compare(results, args.compare, args.tolerance, args.min_delta)
+        for regression in regressions:
+            print(
+                f"REGRESSÃO {regression['trabalho']} {regression['input']} {regression['backend']} "
+                f"{regression['operation']}: {regression['baseline_median']:.2e}s -> {regression['median']:.2e}s "
+                f"({regression['ratio']:.2f}x)"
+            )
+        if len(regressions) != 0:
+            sys.exit(1)
+        print("Nenhuma regressão encontrada")
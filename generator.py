@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+
+# Gera grafos sintéticos grandes direto no disco, em blocos, sem manter as arestas na memória.
+#   python generator.py potencia trabalho_pt2/input/trab2grafo_4.txt --vertices 100000 --edges 1000000 --pesos inteiro
+#   python generator.py grade grade.bin --rows 1000 --cols 1000 --binario
+# O texto segue o formato das entradas (n e depois "origem destino [peso]" por linha, rótulos a partir de 1);
+# o binário é lido de volta por read_binary_edges, que devolve arrays prontos para Graph.insert_relations.
+
+import argparse
+import struct
+from typing import Iterator, Literal, Optional, Sequence, Tuple
+
+import numpy as np
+
+Edges = Tuple[np.ndarray, np.ndarray]
+
+CHUNK_SIZE = 1 << 20
+
+# Cabeçalho do binário: assinatura, n, m e se tem pesos; depois os registros (origem, destino[, peso]), 0-based
+BINARY_MAGIC = b"GRAFOEDG"
+BINARY_HEADER = struct.Struct("<8sqq?7x")
+
+
+def _edge_dtype(weighted: bool) -> np.dtype:
+    fields = [("src", "<i4"), ("dest", "<i4")]
+    if weighted:
+        fields.append(("weight", "<f8"))
+    return np.dtype(fields)
+
+
+def erdos_renyi(
+    vertices_num: int, edges_num: int, rng: np.random.Generator, chunk_size: int = CHUNK_SIZE
+) -> Iterator[Edges]:
+    # G(n, m) com sorteio independente de cada aresta; laços são descartados e arestas repetidas (raras quando
+    # m << n²) são ignoradas pelo grafo ao carregar
+    for start in range(0, edges_num, chunk_size):
+        size = min(chunk_size, edges_num - start)
+        src = rng.integers(0, vertices_num, size, dtype=np.int32)
+        dest = rng.integers(0, vertices_num, size, dtype=np.int32)
+        keep = src != dest
+        yield src[keep], dest[keep]
+
+
+def power_law(
+    vertices_num: int,
+    edges_num: int,
+    rng: np.random.Generator,
+    exponent: float = 2.1,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[Edges]:
+    # Chung-Lu: cada ponta é sorteada com probabilidade proporcional ao peso esperado do vértice,
+    # w_i ~ (i + 1)^(-1 / (exponent - 1)), o que dá graus em lei de potência com esse expoente (como o as_graph)
+    if exponent <= 2:
+        raise ValueError("O expoente da lei de potência deve ser maior que 2")
+
+    # Acumulada contínua de (x + 1)^(-a) em [0, n]: C(x) = ((x + 1)^(1 - a) - 1) / ((n + 1)^(1 - a) - 1);
+    # cada ponta sai da inversa dela com um sorteio uniforme, sem busca
+    power = 1 - 1 / (exponent - 1)
+    scale = (vertices_num + 1) ** power - 1
+    # Os hubs ficam espalhados pelos rótulos em vez de concentrados nos primeiros
+    labels = rng.permutation(vertices_num).astype(np.int32)
+
+    def endpoints(size: int) -> np.ndarray:
+        positions = (1 + rng.random(size) * scale) ** (1 / power) - 1
+        return labels[np.minimum(positions.astype(np.int64), vertices_num - 1)]
+
+    for start in range(0, edges_num, chunk_size):
+        size = min(chunk_size, edges_num - start)
+        src, dest = endpoints(size), endpoints(size)
+        keep = src != dest
+        yield src[keep], dest[keep]
+
+
+def grid(
+    rows: int, cols: int, rng: np.random.Generator, removal: float = 0.0, chunk_size: int = CHUNK_SIZE
+) -> Iterator[Edges]:
+    # Malha rows x cols (vértice r * cols + c) ligada à direita e para baixo, como uma malha viária;
+    # removal é a fração de ruas removidas ao acaso
+    rows_per_chunk = max(1, chunk_size // max(1, 2 * cols))
+    for first_row in range(0, rows, rows_per_chunk):
+        block_rows = np.arange(first_row, min(rows, first_row + rows_per_chunk), dtype=np.int64)
+        vertices = (block_rows[:, None] * cols + np.arange(cols)).ravel()
+
+        right = vertices[(vertices % cols) != cols - 1]
+        down = vertices[vertices < (rows - 1) * cols]
+        src = np.concatenate((right, down))
+        dest = np.concatenate((right + 1, down + cols))
+
+        if removal > 0:
+            keep = rng.random(len(src)) >= removal
+            src, dest = src[keep], dest[keep]
+        yield src.astype(np.int32), dest.astype(np.int32)
+
+
+def components(
+    sizes: Sequence[int], average_degree: float, rng: np.random.Generator, chunk_size: int = CHUNK_SIZE
+) -> Iterator[Edges]:
+    # Um componente por bloco de vértices consecutivos: uma árvore aleatória garante que o bloco é conexo, então
+    # há exatamente len(sizes) componentes, e um Erdős–Rényi completa o grau médio pedido
+    offset = 0
+    for size in sizes:
+        # Árvore recursiva aleatória: o i-ésimo vértice de uma permutação se liga a um dos anteriores
+        order = rng.permutation(size).astype(np.int32)
+        for start in range(1, size, chunk_size):
+            children = np.arange(start, min(size, start + chunk_size))
+            parents = (rng.random(len(children)) * children).astype(np.int64)
+            yield order[children] + offset, order[parents] + offset
+
+        edges_num = max(0, int(round(size * average_degree / 2)) - (size - 1)) if size > 1 else 0
+        for src, dest in erdos_renyi(size, edges_num, rng, chunk_size):
+            yield src + offset, dest + offset
+        offset += size
+
+
+def random_weights(
+    size: int,
+    rng: np.random.Generator,
+    distribution: Literal["inteiro", "uniforme", "exponencial"] = "inteiro",
+    low: float = 1,
+    high: float = 15,
+) -> np.ndarray:
+    if distribution == "inteiro":
+        return rng.integers(int(low), int(high), size, endpoint=True).astype(np.float64)
+    if distribution == "uniforme":
+        return rng.uniform(low, high, size)
+    if distribution == "exponencial":
+        # Média low, limitada a high
+        return np.minimum(rng.exponential(low, size), high)
+
+    raise ValueError("Distribuição de pesos inválida!")
+
+
+def _digits(values: np.ndarray, width: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    # Dígitos ASCII alinhados à direita (k, width) e quantos deles valem em cada linha; width fixo mantém zeros
+    fixed = width is not None
+    if not fixed:
+        width = max(1, len(str(int(values.max())))) if len(values) != 0 else 1
+    values = values.astype(np.int32 if width < 10 else np.int64)
+
+    digits = np.empty((width, len(values)), dtype=np.uint8)
+    lengths = np.full(len(values), width) if fixed else np.ones(len(values), dtype=np.int64)
+    # Da unidade para a esquerda, uma coluna de dígitos por vez
+    for position in range(width - 1, -1, -1):
+        values, digit = np.divmod(values, 10)
+        np.add(digit, ord("0"), out=digits[position], casting="unsafe")
+        if not fixed and position != 0:
+            lengths += values > 0
+
+    return digits.T, lengths
+
+
+def _char(char: str, size: int, present: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    # Campo de um caractere, presente em todas as linhas ou só onde present é verdadeiro
+    lengths = np.ones(size, dtype=np.int64) if present is None else present.astype(np.int64)
+    return np.full((size, 1), ord(char), dtype=np.uint8), lengths
+
+
+def format_edges(
+    src: np.ndarray, dest: np.ndarray, weights: Optional[np.ndarray] = None, decimals: int = 0
+) -> bytes:
+    # Linhas "origem destino [peso]" com rótulos a partir de 1, montadas em bloco: cada campo vira uma matriz de
+    # bytes alinhada à direita e uma máscara escolhe só as posições ocupadas de cada linha
+    size = len(src)
+    fields = [_digits(src + 1), _char(" ", size), _digits(dest + 1)]
+
+    if weights is not None:
+        scaled = np.round(np.abs(weights) * 10**decimals).astype(np.int64)
+        fields += [_char(" ", size), _char("-", size, (weights < 0) & (scaled != 0)), _digits(scaled // 10**decimals)]
+        if decimals > 0:
+            fields += [_char(".", size), _digits(scaled % 10**decimals, decimals)]
+
+    fields.append(_char("\n", size))
+
+    matrix = np.concatenate([digits for digits, _ in fields], axis=1)
+    mask = np.concatenate(
+        [np.arange(digits.shape[1]) >= digits.shape[1] - lengths[:, None] for digits, lengths in fields], axis=1
+    )
+    return matrix[mask].tobytes()
+
+
+def write_graph(
+    file_path: str,
+    vertices_num: int,
+    edges: Iterator[Edges],
+    weights_rng: Optional[np.random.Generator] = None,
+    distribution: Literal["inteiro", "uniforme", "exponencial"] = "inteiro",
+    weight_range: Tuple[float, float] = (1, 15),
+    decimals: int = 2,
+    binary: bool = False,
+) -> int:
+    # Escreve bloco a bloco e devolve a quantidade de arestas; pesos só são sorteados se weights_rng for dado
+    weighted = weights_rng is not None
+    # Pesos inteiros saem sem casas decimais, como nas entradas do trabalho_pt2
+    decimals = 0 if distribution == "inteiro" else decimals
+    edges_num = 0
+
+    with open(file_path, "wb") as file:
+        if binary:
+            file.write(BINARY_HEADER.pack(BINARY_MAGIC, vertices_num, 0, weighted))
+        else:
+            file.write(f"{vertices_num}\n".encode())
+
+        for src, dest in edges:
+            weights = random_weights(len(src), weights_rng, distribution, *weight_range) if weighted else None
+
+            if binary:
+                records = np.empty(len(src), dtype=_edge_dtype(weighted))
+                records["src"] = src
+                records["dest"] = dest
+                if weighted:
+                    records["weight"] = weights
+                file.write(records.tobytes())
+            else:
+                file.write(format_edges(src, dest, weights, decimals))
+
+            edges_num += len(src)
+
+        if binary:
+            # m só é conhecido no fim
+            file.seek(0)
+            file.write(BINARY_HEADER.pack(BINARY_MAGIC, vertices_num, edges_num, weighted))
+
+    return edges_num
+
+
+def read_binary_edges(file_path: str) -> Tuple[int, np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    # (n, origens, destinos, pesos) com índices 0-based, mapeados do arquivo sem copiar
+    with open(file_path, "rb") as file:
+        magic, vertices_num, edges_num, weighted = BINARY_HEADER.unpack(file.read(BINARY_HEADER.size))
+    if magic != BINARY_MAGIC:
+        raise ValueError("Arquivo binário de arestas inválido")
+
+    records = np.memmap(file_path, dtype=_edge_dtype(weighted), mode="r", offset=BINARY_HEADER.size, shape=(edges_num,))
+    return vertices_num, records["src"], records["dest"], records["weight"] if weighted else None
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Gerador de grafos sintéticos")
+    parser.add_argument("model", choices=["erdos_renyi", "potencia", "grade", "componentes"])
+    parser.add_argument("out", help="arquivo de saída")
+    parser.add_argument("--vertices", type=int, default=1000)
+    parser.add_argument("--edges", type=int, default=10000)
+    parser.add_argument("--exponent", type=float, default=2.1, help="expoente da lei de potência")
+    parser.add_argument("--rows", type=int, default=100, help="linhas da grade")
+    parser.add_argument("--cols", type=int, default=100, help="colunas da grade")
+    parser.add_argument("--removal", type=float, default=0.0, help="fração de arestas removidas da grade")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000], help="tamanho de cada componente")
+    parser.add_argument(
+        "--degree", type=float, default=4.0, help="grau médio dentro de cada componente (no mínimo ~2, o da árvore)"
+    )
+    parser.add_argument("--pesos", choices=["inteiro", "uniforme", "exponencial"], help="distribuição dos pesos")
+    parser.add_argument("--peso-min", type=float, default=1)
+    parser.add_argument("--peso-max", type=float, default=15)
+    parser.add_argument("--decimals", type=int, default=2, help="casas decimais dos pesos não inteiros")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--binario", action="store_true", help="grava no formato binário em vez de texto")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    # Sementes independentes para a topologia e para os pesos: trocar a distribuição não muda as arestas
+    topology_seed, weights_seed = np.random.SeedSequence(args.seed).spawn(2)
+    rng = np.random.default_rng(topology_seed)
+
+    if args.model == "erdos_renyi":
+        vertices_num, edges = args.vertices, erdos_renyi(args.vertices, args.edges, rng)
+    elif args.model == "potencia":
+        vertices_num, edges = args.vertices, power_law(args.vertices, args.edges, rng, args.exponent)
+    elif args.model == "grade":
+        vertices_num, edges = args.rows * args.cols, grid(args.rows, args.cols, rng, args.removal)
+    else:
+        vertices_num, edges = sum(args.sizes), components(args.sizes, args.degree, rng)
+
+    edges_num = write_graph(
+        args.out,
+        vertices_num,
+        edges,
+        None if args.pesos is None else np.random.default_rng(weights_seed),
+        args.pesos or "inteiro",
+        (args.peso_min, args.peso_max),
+        args.decimals,
+        args.binario,
+    )
+    print(f"{args.out}: {vertices_num} vértices, {edges_num} arestas")
@@ -0,0 +1,39 @@
+# Os dois trabalhos têm um graph.py cada, então os módulos são carregados pelo caminho, como no benchmark
+import sys
+from os import path
+
+import pytest
+
+ROOT = path.dirname(path.dirname(path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmark import load_graph_module  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def pt1():
+    return load_graph_module("pt1")
+
+
+@pytest.fixture(scope="session")
+def pt2():
+    return load_graph_module("pt2")
+
+
+@pytest.fixture(scope="session")
+def input_path():
+    def find(trabalho, name):
+        return path.join(ROOT, f"trabalho_{trabalho}", "input", name)
+
+    return find
+
+
+@pytest.fixture
+def edge_file(tmp_path):
+    # Escreve um arquivo no formato das entradas: n e depois "origem destino [peso]" por linha
+    def write(vertices_num, lines):
+        file_path = tmp_path / "grafo.txt"
+        file_path.write_text(f"{vertices_num}\n" + "".join(" ".join(map(str, line)) + "\n" for line in lines))
+        return str(file_path)
+
+    return write
@@ -0,0 +1,108 @@
+import shutil
+
+import numpy as np
+import pytest
+
+
+def adjacency(graph):
+    # [(origem, destino)] em índices internos, ordenado
+    offsets, neighbors = graph._Graph__instance.csr_arrays()
+    src = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    return sorted(zip(src.tolist(), neighbors.tolist()))
+
+
+def test_csr_frozen_and_pending_inserts_match_list(pt1):
+    edges = [("1", "2"), ("2", "3"), ("2", "1"), ("4", "4")]
+    csr, lista = pt1.Graph("csr", 5), pt1.Graph("lista", 5)
+    for graph in (csr, lista):
+        for edge in edges[:2]:
+            graph.insert_relation(pt1.Edge(*edge))
+    csr.freeze()
+    for graph in (csr, lista):
+        for edge in edges[2:]:
+            graph.insert_relation(pt1.Edge(*edge))
+
+    assert adjacency(csr) == adjacency(lista) == [(0, 1), (1, 0), (1, 2), (2, 1), (3, 3)]
+    assert csr.get_graph_degrees(raw=True).tolist() == lista.get_graph_degrees(raw=True).tolist()
+
+
+BACKENDS = ["matriz", "matriz_bits", "lista", "csr"]
+# Aresta repetida invertida, repetição idêntica e laço
+EDGE_LINES = [(1, 2), (2, 3), (3, 4), (2, 1), (3, 2), (4, 4), (1, 5)]
+
+
+@pytest.mark.parametrize("graph_type", BACKENDS)
+def test_bulk_load_matches_per_line_inserts(pt1, edge_file, graph_type):
+    file_path = edge_file(6, EDGE_LINES)
+    bulk = pt1.Graph.from_edge_file(file_path, graph_type, cache=False)
+    per_line = pt1.Graph(graph_type, 6)
+    for src, dest in EDGE_LINES:
+        per_line.insert_relation(pt1.Edge(str(src), str(dest)))
+
+    assert adjacency(bulk) == adjacency(per_line)
+    assert bulk.get_graph_degrees(raw=True).tolist() == per_line.get_graph_degrees(raw=True).tolist()
+    assert bulk.connected_components_count() == per_line.connected_components_count() == 2
+    assert [tree.tolist() for tree in bulk.breadth_first_search("1", raw=True)] == [
+        tree.tolist() for tree in per_line.breadth_first_search("1", raw=True)
+    ]
+
+
+@pytest.mark.parametrize("writer", BACKENDS)
+@pytest.mark.parametrize("graph_type", BACKENDS)
+def test_cache_written_by_any_backend_matches_uncached_load(pt1, edge_file, writer, graph_type):
+    file_path = edge_file(6, EDGE_LINES)
+    pt1.Graph.from_edge_file(file_path, writer)
+    cached = pt1.Graph.from_edge_file(file_path, graph_type)
+    uncached = pt1.Graph.from_edge_file(file_path, graph_type, cache=False)
+
+    assert adjacency(cached) == adjacency(uncached)
+    assert cached.get_graph_degrees(raw=True).tolist() == uncached.get_graph_degrees(raw=True).tolist()
+    assert cached.connected_components_count() == uncached.connected_components_count()
+
+
+def search_results(graph):
+    # Níveis em vez de pais: a lista percorre vizinhos na ordem do set e desempata diferente
+    return (
+        graph.get_graph_degrees(raw=True).tolist(),
+        graph.breadth_first_search("1", raw=True).levels.tolist(),
+        sorted(map(len, graph.find_connected_components())),
+    )
+
+
+# A lista é a representação da versão original e serve de referência nas entradas reais
+@pytest.mark.parametrize("file_name", ["teste_2.txt", "as_graph.txt"])
+@pytest.mark.parametrize("graph_type", ["matriz", "matriz_bits", "csr"])
+def test_bulk_load_matches_baseline_list(pt1, input_path, graph_type, file_name):
+    file_path = input_path("pt1", file_name)
+    graph = pt1.Graph.from_edge_file(file_path, graph_type, cache=False)
+    baseline = pt1.Graph.from_edge_file(file_path, "lista", cache=False)
+
+    assert adjacency(graph) == adjacency(baseline)
+    assert search_results(graph) == search_results(baseline)
+
+
+@pytest.mark.parametrize("graph_type, writer", list(zip(BACKENDS, BACKENDS[1:] + BACKENDS[:1])))
+def test_cached_load_matches_baseline_list(pt1, input_path, tmp_path, graph_type, writer):
+    # Cache escrito por outra representação, numa cópia da entrada no diretório temporário
+    file_path = shutil.copy(input_path("pt1", "as_graph.txt"), tmp_path)
+    pt1.Graph.from_edge_file(file_path, writer)
+    cached = pt1.Graph.from_edge_file(file_path, graph_type)
+    baseline = pt1.Graph.from_edge_file(file_path, "lista", cache=False)
+
+    assert adjacency(cached) == adjacency(baseline)
+    assert search_results(cached) == search_results(baseline)
+
+
+def test_csr_frozen_and_pending_inserts_match_baseline_list(pt1, input_path):
+    # O grosso do arquivo em lote e congelado; as últimas linhas ficam pendentes sobre ele
+    file_path = input_path("pt1", "as_graph.txt")
+    vertices_num, src, dest = pt1._read_edge_file(file_path)
+    graph = pt1.Graph("csr", vertices_num)
+    graph.insert_relations(src[:-100], dest[:-100])
+    graph.freeze()
+    for edge in zip(src[-100:] + 1, dest[-100:] + 1):
+        graph.insert_relation(pt1.Edge(*map(str, edge)))
+    baseline = pt1.Graph.from_edge_file(file_path, "lista", cache=False)
+
+    assert adjacency(graph) == adjacency(baseline)
+    assert search_results(graph) == search_results(baseline)
@@ -0,0 +1,214 @@
+import re
+import shutil
+from glob import glob
+from os import path
+
+import numpy as np
+import pytest
+
+
+def adjacency(graph):
+    # [(origem, destino, peso)] em índices internos, na ordem de (origem, destino, peso)
+    offsets, neighbors, weights = graph._Graph__instance.csr_arrays()
+    src = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    return sorted(zip(src.tolist(), neighbors.tolist(), weights.tolist()))
+
+
+def test_csr_reversed_duplicate_keeps_edge_symmetric(pt2):
+    graph = pt2.Graph("csr", 3, True)
+    graph.insert_relation(pt2.Edge("1", "2", 1))
+    graph.insert_relation(pt2.Edge("2", "1", 2))
+
+    assert graph.find_minimum_path("1", "2")[-1][1] == 2
+    assert graph.find_minimum_path("2", "1")[-1][1] == 2
+    assert adjacency(graph) == [(0, 1, 2.0), (1, 0, 2.0)]
+
+
+def test_csr_frozen_and_pending_inserts_merge_like_sequential_ones(pt2):
+    graph = pt2.Graph("csr", 4, True)
+    graph.insert_relation(pt2.Edge("1", "2", 5))
+    graph.insert_relation(pt2.Edge("3", "3", 2))
+    graph.freeze()
+    # Reinserções, uma delas invertida, sobre arestas já compactadas
+    graph.insert_relation(pt2.Edge("2", "1", 7))
+    graph.insert_relation(pt2.Edge("4", "3", 1))
+    graph.insert_relation(pt2.Edge("3", "4", 3))
+
+    assert adjacency(graph) == [(0, 1, 7.0), (1, 0, 7.0), (2, 2, 2.0), (2, 3, 3.0), (3, 2, 3.0)]
+    assert graph.get_graph_degrees(raw=True).tolist() == [1, 1, 2, 1]
+
+
+def test_matrix_bulk_reversed_duplicate_keeps_edge_symmetric(pt2):
+    graph = pt2.Graph("matriz", 3, True)
+    graph.insert_relations(np.array([0, 1]), np.array([1, 0]), np.array([7.0, 4.0]))
+
+    assert adjacency(graph) == [(0, 1, 4.0), (1, 0, 4.0)]
+    assert graph.find_minimum_path("1", "2")[-1][1] == graph.find_minimum_path("2", "1")[-1][1] == 4
+
+
+def test_matrix_input_file_keeps_last_weight_both_ways(pt2, input_path):
+    # trab2grafo_2 tem "1 1000 7" e depois "1000 1 4": como no dok sequencial, vale 4 nas duas direções
+    graph = pt2.Graph.from_edge_file(input_path("pt2", "trab2grafo_2.txt"), "matriz", True, cache=False)
+    matrix = graph._Graph__instance.adj_matrix
+
+    assert matrix[0, 999] == matrix[999, 0] == 4
+    assert graph._dijkstra("1")["1000"][1] == graph._dijkstra("1000")["1"][1]
+
+
+def test_matrix_frozen_and_pending_inserts_follow_dok(pt2):
+    graph = pt2.Graph("matriz", 4, True)
+    graph.insert_relation(pt2.Edge("1", "2", 5))
+    graph.insert_relation(pt2.Edge("2", "3", 1))
+    graph.freeze()
+    # Como no dok: a última inserção vale nas duas células e peso 0 apaga a aresta, mesmo já congelada
+    graph.insert_relation(pt2.Edge("2", "1", 3))
+    graph.insert_relation(pt2.Edge("3", "2", 0))
+    graph.insert_relation(pt2.Edge("4", "3", 2))
+    pending_degrees = graph.get_graph_degrees(raw=True).tolist()
+
+    assert adjacency(graph) == [(0, 1, 3.0), (1, 0, 3.0), (2, 3, 2.0), (3, 2, 2.0)]
+    assert pending_degrees == graph.get_graph_degrees(raw=True).tolist() == [1, 1, 1, 1]
+
+
+def load_per_line(pt2, file_path, graph_type, weighted):
+    # Uma aresta por vez, como o from_edge_file fazia antes da carga em lote
+    with open(file_path) as file:
+        graph = pt2.Graph(graph_type, int(file.readline()), weighted)
+        for line in file:
+            graph.insert_relation(pt2.Edge(*line.split()))
+    return graph
+
+
+# Aresta repetida invertida com outro peso, repetição idêntica, laço e peso 0
+EDGE_LINES = [(1, 2, 7), (2, 3, 1.5), (3, 4, 2), (2, 1, 4), (3, 2, 1.5), (4, 4, 3), (1, 5, 0), (5, 3, 6)]
+
+
+@pytest.mark.parametrize("graph_type", ["matriz", "lista", "csr"])
+def test_bulk_load_matches_per_line_inserts(pt2, edge_file, graph_type):
+    file_path = edge_file(5, EDGE_LINES)
+    bulk = pt2.Graph.from_edge_file(file_path, graph_type, True, cache=False)
+    per_line = load_per_line(pt2, file_path, graph_type, True)
+
+    assert adjacency(bulk) == adjacency(per_line)
+    assert bulk.get_graph_degrees(raw=True).tolist() == per_line.get_graph_degrees(raw=True).tolist()
+    assert bulk.connected_components_count() == per_line.connected_components_count()
+    assert bulk._dijkstra("1") == per_line._dijkstra("1")
+
+
+@pytest.mark.parametrize("graph_type", ["matriz", "lista", "csr"])
+def test_unweighted_bulk_load_matches_per_line_inserts(pt2, edge_file, graph_type):
+    file_path = edge_file(5, [line[:2] for line in EDGE_LINES])
+    bulk = pt2.Graph.from_edge_file(file_path, graph_type, False, cache=False)
+    per_line = load_per_line(pt2, file_path, graph_type, False)
+
+    assert bulk.get_graph_degrees(raw=True).tolist() == per_line.get_graph_degrees(raw=True).tolist()
+    assert [tree.tolist() for tree in bulk.breadth_first_search("1", raw=True)] == [
+        tree.tolist() for tree in per_line.breadth_first_search("1", raw=True)
+    ]
+
+
+@pytest.mark.parametrize("writer", ["matriz", "lista", "csr"])
+@pytest.mark.parametrize("graph_type", ["matriz", "lista", "csr"])
+def test_cache_written_by_any_backend_matches_uncached_load(pt2, edge_file, writer, graph_type):
+    file_path = edge_file(5, EDGE_LINES)
+    pt2.Graph.from_edge_file(file_path, writer, True)
+    cached = pt2.Graph.from_edge_file(file_path, graph_type, True)
+    uncached = pt2.Graph.from_edge_file(file_path, graph_type, True, cache=False)
+
+    assert adjacency(cached) == adjacency(uncached)
+    assert cached.get_graph_degrees(raw=True).tolist() == uncached.get_graph_degrees(raw=True).tolist()
+    assert cached._dijkstra("1") == uncached._dijkstra("1")
+
+
+def test_cache_is_reused_by_the_same_backend(pt2, edge_file):
+    file_path = edge_file(5, EDGE_LINES)
+    pt2.Graph.from_edge_file(file_path, "csr", True)
+    cached = pt2.Graph.from_edge_file(file_path, "csr", True)
+
+    # A CSR carregada do cache usa os arrays mapeados do arquivo
+    assert isinstance(cached._Graph__instance.neighbors, np.memmap)
+    assert adjacency(cached) == adjacency(pt2.Graph.from_edge_file(file_path, "csr", True, cache=False))
+
+
+def test_dial_tree_matches_heap_with_zero_weights(pt2):
+    # Pesos inteiros em [0, 5] vão para o Dial; arestas de peso 0 entram no balde que está sendo esvaziado
+    rng = np.random.default_rng(1)
+    for _ in range(100):
+        vertices_num = int(rng.integers(5, 60))
+        edges_num = int(rng.integers(vertices_num, 4 * vertices_num))
+        graph = pt2.Graph("csr", vertices_num, True)
+        graph.insert_relations(
+            rng.integers(0, vertices_num, edges_num),
+            rng.integers(0, vertices_num, edges_num),
+            rng.integers(0, 6, edges_num).astype(np.float64),
+        )
+        graph.path_cache_size = 0
+        origin = str(int(rng.integers(1, vertices_num + 1)))
+
+        assert graph._bucket_bound() is not None
+        dial = graph._dijkstra(origin, raw=True)
+        graph.bucket_queue = False
+        heap = graph._dijkstra(origin, raw=True)
+
+        assert np.array_equal(dial.distances, heap.distances)
+        assert np.array_equal(dial.parents, heap.parents)
+
+
+
+# Saídas gravadas em out/ pela versão original; só há entrada para os três primeiros grafos.
+# A csr não tem pasta própria e segue a da lista
+BASELINE_OUT = path.join(path.dirname(path.abspath(__file__)), "..", "trabalho_pt2", "out")
+BASELINE_DIRS = {"matriz": "matrix", "lista": "list", "csr": "list"}
+BASELINE_GRAFOS = ["grafo_1", "grafo_2", "grafo_3"]
+
+
+def baseline_distances(graph_type, grafo):
+    distances = {}
+    for out_file in sorted(glob(path.join(BASELINE_OUT, BASELINE_DIRS[graph_type], grafo, "1_to_*.txt"))):
+        with open(out_file) as file:
+            match = re.search(r"Destination = (\d+) \| Total distance = ([\d.]+)", file.read())
+        distances[match[1]] = float(match[2])
+    return distances
+
+
+def baseline_input_distances(graph, expected):
+    # Só a distância total: caminhos empatados podem sair diferentes
+    return {end: graph.find_minimum_path("1", end)[-1][1] for end in expected}
+
+
+@pytest.mark.parametrize("grafo", BASELINE_GRAFOS)
+@pytest.mark.parametrize("graph_type", ["matriz", "lista", "csr"])
+def test_bulk_load_matches_baseline_outputs(pt2, input_path, graph_type, grafo):
+    expected = baseline_distances(graph_type, grafo)
+    graph = pt2.Graph.from_edge_file(input_path("pt2", f"trab2{grafo}.txt"), graph_type, True, cache=False)
+
+    assert expected
+    assert baseline_input_distances(graph, expected) == expected
+
+
+@pytest.mark.parametrize("grafo", BASELINE_GRAFOS)
+@pytest.mark.parametrize("graph_type, writer", [("matriz", "lista"), ("lista", "csr"), ("csr", "matriz")])
+def test_cached_load_matches_baseline_outputs(pt2, input_path, tmp_path, graph_type, writer, grafo):
+    # Cache escrito por outra representação, numa cópia da entrada no diretório temporário
+    file_path = shutil.copy(input_path("pt2", f"trab2{grafo}.txt"), tmp_path)
+    pt2.Graph.from_edge_file(file_path, writer, True)
+    expected = baseline_distances(graph_type, grafo)
+
+    assert baseline_input_distances(pt2.Graph.from_edge_file(file_path, graph_type, True), expected) == expected
+
+
+@pytest.mark.parametrize("grafo", BASELINE_GRAFOS)
+@pytest.mark.parametrize("graph_type", ["matriz", "csr"])
+def test_frozen_and_pending_inserts_match_baseline_outputs(pt2, input_path, graph_type, grafo):
+    # O grosso do arquivo em lote e congelado; as últimas linhas ficam pendentes sobre ele
+    file_path = input_path("pt2", f"trab2{grafo}.txt")
+    vertices_num, src, dest, weights = pt2._read_edge_file(file_path, True)
+    graph = pt2.Graph(graph_type, vertices_num, True)
+    graph.insert_relations(src[:-100], dest[:-100], weights[:-100])
+    graph.freeze()
+    for edge in zip(src[-100:] + 1, dest[-100:] + 1, weights[-100:]):
+        graph.insert_relation(pt2.Edge(*map(str, edge)))
+    expected = baseline_distances(graph_type, grafo)
+
+    assert adjacency(graph) == adjacency(pt2.Graph.from_edge_file(file_path, graph_type, True, cache=False))
+    assert baseline_input_distances(graph, expected) == expected
@@ -3,7 +3,7 @@
 from os import path
 import sys
 from typing import Optional, Tuple
-from graph import Graph, Edge
+from graph import Graph
 
 
 def validate_args() -> Optional[Tuple[str, str]]:
@@ -14,7 +14,7 @@ def validate_args() -> Optional[Tuple[str, str]]:
         if not path.exists(text_arg):
             raise FileNotFoundError
 
-        assert graph_type_arg == "matriz" or graph_type_arg == "lista"
+        assert graph_type_arg in ("matriz", "matriz_bits", "lista")
 
     except IndexError:
         print("Há argumento(s) faltando!")
@@ -35,14 +35,6 @@ if __name__ == "__main__":
 
     text_arg, graph_type = args
 
-    with open(text_arg) as text_file:
-        vertices_num = int(text_file.readline())
-        edges = text_file.readlines()
-        edges = [Edge(*edge.strip().split()) for edge in edges]
+    graph = Graph.from_edge_file(text_arg, graph_type)
 
-        graph = Graph(graph_type, vertices_num)
-
-        for edge in edges:
-            graph.insert_relation(edge)
-
-        graph.out_graph(path.join("..", "out"))
+    graph.out_graph(path.join("..", "out"))
@@ -11,7 +11,7 @@
 #    3.3 Comparar 3.1 e 3.2
 # 4. Determine o comprimento do maior caminho mínimo entre dois vértices (BFS)
 
-from graph import Graph, Edge
+from graph import Graph
 import matplotlib.pyplot as plt
 from os import path
 
@@ -20,25 +20,19 @@ if __name__ == "__main__":
 
     input_path = path.join("..", "input", "as_graph.txt")
 
-    with open(input_path) as text_file:
-        vertices_num = int(text_file.readline())
-        edges = text_file.readlines()
-        edges = [Edge(*edge.strip().split()) for edge in edges]
-
-        g_list = Graph("lista", vertices_num)
-
-        for edge in edges:
-            g_list.insert_relation(edge)
+    g_list = Graph.from_edge_file(input_path, "lista")
 
     # --------------- Questão 1 ------------------- #
 
-    graph_degrees = g_list.get_graph_degrees()
+    # Graus como array, sem montar o dicionário por rótulo
+    graph_degrees = g_list.get_graph_degrees(raw=True)
+    degree_distribution = g_list.degree_distribution()
     greatest_degree = g_list.vertices_num - 1
     print(f"O maior grau possível para o grafo seria {greatest_degree}")
-    print(f"O maior grau do grafo é {max(graph_degrees.values())}")
-    print(f"O menor grau do grafo é {min(graph_degrees.values())}")
+    print(f"O maior grau do grafo é {degree_distribution.max_degree}")
+    print(f"O menor grau do grafo é {degree_distribution.min_degree}")
 
-    plt.plot(list(graph_degrees.values()))
+    plt.plot(graph_degrees)
     plt.axhline(y=greatest_degree, color="r")
     plt.legend(["Graus", "Grau máximo"])
     plt.xlabel("Vértices")
@@ -78,18 +72,5 @@ if __name__ == "__main__":
 
     # --------------- Questão 4 ------------------- #
 
-    connected_components_diameters = list()
-    for c in connected_components:
-        component_diameter = 0
-        for v in c:
-            g_list.breadth_first_search(v, out_path)
-
-            with open(path.join(out_path, "graph_list_breadth_search_out.txt")) as file:
-                vertices = file.readlines()
-                levels = [int(vertex.strip().split(sep="Nível = ")[-1])
-                          for vertex in vertices]
-
-            component_diameter = max(component_diameter, max(levels))
-        connected_components_diameters.append(component_diameter)
-
-    print(f"O diâmetro da internet é: {max(connected_components_diameters)}")
+    # Diâmetro exato de cada componente com iFUB, sem uma busca por vértice
+    print(f"O diâmetro da internet é: {g_list.diameter()}")
@@ -1,8 +1,20 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 from os import path
-from typing import Dict, List, Literal, NamedTuple, Optional, Set, Tuple, Deque
+import hashlib
+import os
+import struct
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from typing import Callable, Dict, Iterable, Iterator, List, Literal, NamedTuple, Optional, Set, Tuple, Deque, Union
 import numpy as np
 import math as m
 from collections import deque
+from itertools import chain
 
 
 class Edge(NamedTuple):
@@ -10,54 +22,428 @@ class Edge(NamedTuple):
     dest: str
 
 
+class SearchTree(NamedTuple):
+    # Índices internos (0-based); -1 indica raiz ou vértice não alcançado
+    order: np.ndarray
+    parents: np.ndarray
+    levels: np.ndarray
+
+
+class DegreeDistribution(NamedTuple):
+    max_degree: int
+    min_degree: int
+    mean_degree: float
+    # histogram[d] = quantidade de vértices com grau d
+    histogram: np.ndarray
+    # log_histogram[i] = quantidade de vértices com grau em [log_bins[i], log_bins[i + 1])
+    log_bins: np.ndarray
+    log_histogram: np.ndarray
+
+
+class MemoryPeak:
+    # Pico de memória alocada (tracemalloc) dentro do bloco with, em bytes acima do que já estava alocado na entrada
+    def __enter__(self) -> "MemoryPeak":
+        self._started = not tracemalloc.is_tracing()
+        if self._started:
+            tracemalloc.start()
+
+        tracemalloc.reset_peak()
+        self._start, _ = tracemalloc.get_traced_memory()
+        self.peak = 0
+        self.allocated = 0
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        current, peak = tracemalloc.get_traced_memory()
+        self.peak = peak - self._start
+        # O que continuou alocado depois do bloco, por exemplo o grafo construído
+        self.allocated = current - self._start
+
+        if self._started:
+            tracemalloc.stop()
+
+
+class GraphStats:
+    # Contadores e tempos de uma operação do grafo, preenchidos só com a instrumentação ligada (Graph.instrument)
+    def __init__(self, operation: str) -> None:
+        self.operation = operation
+        self.vertices_settled = 0
+        self.edges_scanned = 0
+        self.heap_pushes = 0
+        # Entradas retiradas do heap cujo vértice já estava fechado
+        self.stale_pops = 0
+        # Segundos por fase: load, freeze, traversal, path e output
+        self.phases: Dict[str, float] = {}
+        self.total = 0.0
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "operation": self.operation,
+            "vertices_settled": self.vertices_settled,
+            "edges_scanned": self.edges_scanned,
+            "heap_pushes": self.heap_pushes,
+            "stale_pops": self.stale_pops,
+            "phases": dict(self.phases),
+            "total": self.total,
+        }
+
+    def __repr__(self) -> str:
+        return f"GraphStats({self.as_dict()})"
+
+
+def _instrumented(operation: str) -> Callable:
+    # Desligada, a instrumentação custa só um teste de atributo por chamada
+    def decorator(method: Callable) -> Callable:
+        @wraps(method)
+        def wrapper(self: "Graph", *args, **kwargs):
+            # Chamadas aninhadas (ex.: o Dijkstra dentro do caminho mínimo) somam na operação externa
+            if not self._instrumented or self._active_stats is not None:
+                return method(self, *args, **kwargs)
+
+            stats = GraphStats(operation)
+            self._active_stats = stats
+            start = time.perf_counter()
+            try:
+                with stats.phase("freeze"):
+                    self.freeze()
+                return method(self, *args, **kwargs)
+            finally:
+                stats.total = time.perf_counter() - start
+                self._active_stats = None
+                self.stats = stats
+                if self._stats_callback is not None:
+                    self._stats_callback(stats)
+
+        return wrapper
+
+    return decorator
+
+
 class Graph:
-    def __init__(self, graph_type: Literal["matriz", "lista"], vertices_num: int) -> None:
+    def __init__(self, graph_type: Literal["matriz", "matriz_bits", "lista", "csr"], vertices_num: int) -> None:
         self.graph_type = graph_type
         self.vertices_num = vertices_num
 
+        # Rótulos só existem na entrada e na saída; os algoritmos usam índices 0-based
+        self.labels: List[str] = [str(v + 1) for v in range(vertices_num)]
+        self.vertices: Dict[str, int] = {label: v for v, label in enumerate(self.labels)}
+
+        # Componentes conexos mantidos a cada inserção, para consultas sem percorrer o grafo
+        self._components = _UnionFind(vertices_num)
+
+        # Contadores da última operação instrumentada; desligado por padrão
+        self.stats: Optional[GraphStats] = None
+        self._instrumented = False
+        self._stats_callback: Optional[Callable[[GraphStats], None]] = None
+        self._active_stats: Optional[GraphStats] = None
+
         if self.graph_type == "matriz":
             self.__instance = _GraphMatrix(self.vertices_num)
             self.graph_type = "matrix"
+        elif self.graph_type == "matriz_bits":
+            # Matriz com um bit por célula: 8x menos memória que a de bool
+            self.__instance = _GraphBitMatrix(self.vertices_num)
+            self.graph_type = "bitmatrix"
         elif self.graph_type == "lista":
             self.__instance = _GraphList(self.vertices_num)
             self.graph_type = "list"
+        elif self.graph_type == "csr":
+            self.__instance = _GraphCSR(self.vertices_num)
         else:
             raise ValueError("Tipo de grafo inválido!")
 
     def insert_relation(self, edge: Edge) -> None:
-        self.__instance.insert_relation(edge)
+        src, dest = self.vertices[edge.src], self.vertices[edge.dest]
+        self.__instance.insert_relation(src, dest)
+        self._components.union(src, dest)
+
+    def insert_relations(self, src: np.ndarray, dest: np.ndarray) -> None:
+        # src e dest são índices internos (0-based), não rótulos
+        src = np.asarray(src, dtype=np.int32)
+        dest = np.asarray(dest, dtype=np.int32)
+        if src.shape != dest.shape:
+            raise ValueError("Arrays de arestas com tamanhos diferentes")
+        if len(src) != 0 and (min(src.min(), dest.min()) < 0 or max(src.max(), dest.max()) >= self.vertices_num):
+            raise ValueError("Vértice não pertence ao grafo")
+
+        self.__instance.insert_relations(src, dest)
+        self._components.union_all(src, dest)
+
+    @classmethod
+    def from_edge_file(
+        cls,
+        file_path: str,
+        graph_type: Literal["matriz", "matriz_bits", "lista", "csr"],
+        cache: bool = True,
+        instrument: bool = False,
+    ) -> "Graph":
+        if not instrument:
+            return cls._from_edge_file(file_path, graph_type, cache)
+
+        # Já devolve o grafo instrumentado, com os tempos da carga em graph.stats
+        stats = GraphStats("load")
+        start = time.perf_counter()
+        with stats.phase("load"):
+            graph = cls._from_edge_file(file_path, graph_type, cache)
+        with stats.phase("freeze"):
+            graph.freeze()
+        stats.total = time.perf_counter() - start
+
+        graph.instrument()
+        graph.stats = stats
+        return graph
+
+    @classmethod
+    def _from_edge_file(
+        cls, file_path: str, graph_type: Literal["matriz", "matriz_bits", "lista", "csr"], cache: bool
+    ) -> "Graph":
+        # O cache binário fica ao lado do arquivo texto e só é usado se a fonte não mudou
+        cache_path = file_path + CACHE_SUFFIX
+        if cache and _check_graph_cache(cache_path, file_path):
+            return cls.load(cache_path, graph_type)
+
+        source_key = _source_key(file_path) if cache else None
+        vertices_num, src, dest = _read_edge_file(file_path)
+
+        graph = cls(graph_type, vertices_num)
+        graph.insert_relations(src, dest)
+
+        if cache:
+            try:
+                graph.save(cache_path, source_key)
+            except OSError:
+                pass
+
+        return graph
+
+    def freeze(self) -> None:
+        # Só a CSR acumula inserções pendentes; nas outras representações as consultas já usam o que foi inserido
+        if isinstance(self.__instance, _GraphCSR):
+            self.__instance._compact()
+
+    def instrument(self, enabled: bool = True, callback: Optional[Callable[[GraphStats], None]] = None) -> None:
+        # Cada operação instrumentada deixa seus contadores em self.stats e os repassa ao callback
+        self._instrumented = enabled
+        self._stats_callback = callback if enabled else None
+
+    def _phase(self, name: str):
+        if self._active_stats is None:
+            return nullcontext()
+        return self._active_stats.phase(name)
+
+    def save(self, file_path: str, source_key: Optional[Tuple[int, int, bytes]] = None) -> None:
+        offsets, neighbors = self.__instance.csr_arrays()
+        _write_graph_cache(file_path, self.vertices_num, offsets, neighbors, source_key)
+
+    @classmethod
+    def load(cls, file_path: str, graph_type: Literal["matriz", "matriz_bits", "lista", "csr"]) -> "Graph":
+        vertices_num, offsets, neighbors = _map_graph_cache(file_path)
+
+        graph = cls(graph_type, vertices_num)
+        src = np.repeat(np.arange(vertices_num, dtype=np.int32), np.diff(offsets))
+        upper = src <= neighbors
+        if isinstance(graph.__instance, _GraphCSR):
+            # Usa os arrays mapeados diretamente: nada é copiado para a memória do processo
+            graph.__instance.set_arrays(offsets, neighbors)
+            graph._components.union_all(src[upper], neighbors[upper])
+        else:
+            graph.insert_relations(src[upper], neighbors[upper])
+
+        return graph
+
+    def get_graph_degrees(self, raw: bool = False) -> Union[Dict[str, int], np.ndarray]:
+        degrees = self.__instance.get_graph_degrees()
+        if raw:
+            return degrees
+
+        return dict(zip(self.labels, degrees.tolist()))
+
+    def degree_distribution(self) -> DegreeDistribution:
+        degrees = self.__instance.get_graph_degrees()
+        if len(degrees) == 0:
+            empty = np.zeros(1, dtype=np.int64)
+            return DegreeDistribution(0, 0, 0.0, empty, np.array([0, 1]), empty)
+
+        max_degree = int(degrees.max())
+        # Faixas [0, 1), [1, 2), [2, 4), [4, 8), ... até cobrir o maior grau
+        log_bins = np.concatenate(([0], 2 ** np.arange(m.ceil(m.log2(max_degree + 1)) + 1)))
+        log_histogram, _ = np.histogram(degrees, bins=log_bins)
+
+        return DegreeDistribution(
+            max_degree, int(degrees.min()), float(degrees.mean()), np.bincount(degrees), log_bins, log_histogram
+        )
+
+    def memory_usage(self) -> Dict[str, int]:
+        # Bytes de cada estrutura interna com o conteúdo dos contêineres; a representação usa os nomes dos atributos
+        seen: Set[int] = set()
+        usage = {
+            "vertex_maps": _deep_sizeof(self.labels, seen) + _deep_sizeof(self.vertices, seen),
+            "components": _deep_sizeof(self._components, seen),
+        }
+        for name, value in vars(self.__instance).items():
+            usage[name.lstrip("_")] = _deep_sizeof(value, seen)
 
-    def get_graph_degrees(self) -> Dict[str, int]:
-        return self.__instance.get_graph_degrees()
+        usage["total"] = sum(usage.values())
+        return usage
 
     def out_graph(self, out_path: str) -> None:
-        self.__instance.out_graph(out_path)
+        degrees = self.__instance.get_graph_degrees()
 
-    def breadth_first_search(self, origin: str, out_path: Optional[str] = None):
-        vertices = self.__instance.breadth_first_search(origin)
+        with open(path.join(out_path, f"graph_{self.graph_type}_out.txt"), "w") as file:
+            file.write(f"# n = {self.vertices_num}\n")
+            file.write(f"# m = {int(degrees.sum() / 2)}\n")
+            for label, degree in zip(self.labels, degrees.tolist()):
+                file.write(f"{label} {degree}\n")
 
-        if vertices is None:
+    @_instrumented("bfs")
+    def breadth_first_search(
+        self, origin: str, out_path: Optional[str] = None, raw: bool = False, level_sync: bool = False
+    ):
+        if origin not in self.vertices:
             raise ValueError(
                 f"O argumento origem: {origin} não pertence ao grafo!")
 
-        if out_path is not None:
-            self._search_out_graph(vertices, "largura", out_path)
+        if level_sync:
+            # Expande cada nível inteiro de uma vez com operações vetorizadas
+            if self.graph_type != "matrix":
+                raise ValueError("A busca em largura por níveis só está disponível para a matriz!")
+            with self._phase("traversal"):
+                vertices = self.__instance.breadth_first_search(
+                    self.vertices[origin], level_sync=True, stats=self._active_stats
+                )
+        else:
+            with self._phase("traversal"):
+                vertices = self.__instance.breadth_first_search(self.vertices[origin], stats=self._active_stats)
 
-    def depth_first_search(self, origin: str, out_path: Optional[str] = None):
-        vertices = self.__instance.depth_first_search(origin)
+        if raw:
+            with self._phase("path"):
+                return self._search_tree(vertices)
+
+        if out_path is not None:
+            with self._phase("output"):
+                self._search_out_graph(vertices, "largura", out_path)
 
-        if vertices is None:
+    @_instrumented("dfs")
+    def depth_first_search(self, origin: str, out_path: Optional[str] = None, raw: bool = False):
+        if origin not in self.vertices:
             raise ValueError(
                 f"O argumento origem: {origin} não pertence ao grafo!")
 
+        with self._phase("traversal"):
+            vertices = self.__instance.depth_first_search(self.vertices[origin], stats=self._active_stats)
+
+        if raw:
+            with self._phase("path"):
+                return self._search_tree(vertices)
+
         if out_path is not None:
-            self._search_out_graph(vertices, "profundidade", out_path)
+            with self._phase("output"):
+                self._search_out_graph(vertices, "profundidade", out_path)
+
+    def iter_bfs(self, origin: str, max_level: Optional[int] = None) -> Iterator[Tuple[str, str, int]]:
+        # (vértice, pai, nível) sob demanda; a raiz tem pai ""
+        if origin not in self.vertices:
+            raise ValueError(f"O argumento origem: {origin} não pertence ao grafo!")
+
+        vertices = self.__instance.iter_breadth_first_search(self.vertices[origin], max_level)
+        return self._iter_labels(vertices)
+
+    def iter_dfs(self, origin: str, max_level: Optional[int] = None) -> Iterator[Tuple[str, str, int]]:
+        if origin not in self.vertices:
+            raise ValueError(f"O argumento origem: {origin} não pertence ao grafo!")
+
+        vertices = self.__instance.iter_depth_first_search(self.vertices[origin], max_level)
+        return self._iter_labels(vertices)
+
+    def _iter_labels(self, vertices: Iterator[Tuple[int, int, int]]) -> Iterator[Tuple[str, str, int]]:
+        for vertex, parent, level in vertices:
+            yield self.labels[vertex], "" if parent == -1 else self.labels[parent], level
+
+    def eccentricities(self, raw: bool = False, workers: Optional[int] = None) -> Union[Dict[str, int], np.ndarray]:
+        # Excentricidade de cada vértice dentro do seu componente conexo
+        offsets, neighbors = self.__instance.csr_arrays()
+        eccentricities = _parallel_eccentricities(offsets, neighbors, workers)
+
+        if raw:
+            return eccentricities
+
+        return dict(zip(self.labels, eccentricities.tolist()))
+
+    def diameter(self, workers: Optional[int] = None, method: Literal["ifub", "forca_bruta"] = "ifub") -> int:
+        # Maior caminho mínimo entre dois vértices, considerando todos os componentes
+        if method not in ("ifub", "forca_bruta"):
+            raise ValueError("Método de cálculo do diâmetro inválido!")
+        if self.vertices_num == 0:
+            return 0
+
+        if method == "ifub":
+            return max(self.connected_components_diameters(workers))
+
+        return int(self.eccentricities(raw=True, workers=workers).max())
+
+    def connected_components_diameters(self, workers: Optional[int] = None) -> List[int]:
+        # Na mesma ordem dos componentes de find_connected_components; workers divide as buscas das franjas do iFUB
+        offsets, neighbors = self.__instance.csr_arrays()
+        component_labels = self.find_connected_components(raw=True)
+
+        return _components_diameters(offsets, neighbors, component_labels, workers).tolist()
+
+    @_instrumented("components")
+    def find_connected_components(self, raw: bool = False) -> Union[List[Set[str]], np.ndarray]:
+        if raw and isinstance(self.__instance, _GraphMatrix):
+            # A matriz rotula todos os vértices de uma vez, sem montar os conjuntos
+            with self._phase("traversal"):
+                return self.__instance.component_labels(self._active_stats)
+
+        with self._phase("traversal"):
+            connected_components = self.__instance.find_connected_components(self._active_stats)
 
-    def find_connected_components(self) -> List[Set[str]]:
-        return self.__instance.find_connected_components()
+        with self._phase("output"):
+            if raw:
+                # component_labels[v] = índice do componente de v
+                component_labels = np.empty(self.vertices_num, dtype=np.int32)
+                for idx, component in enumerate(connected_components):
+                    component_labels[np.fromiter(component, dtype=np.int32, count=len(component))] = idx
+                return component_labels
+
+            return [{self.labels[vertex] for vertex in component} for component in connected_components]
+
+    def connected_components_count(self) -> int:
+        return self._components.count
+
+    def connected_component_size(self, vertex: str) -> int:
+        if vertex not in self.vertices:
+            raise ValueError(f"O vértice: {vertex} não pertence ao grafo!")
+
+        return int(self._components.sizes[self._components.find(self.vertices[vertex])])
+
+    def same_component(self, src: str, dest: str) -> bool:
+        for vertex in (src, dest):
+            if vertex not in self.vertices:
+                raise ValueError(f"O vértice: {vertex} não pertence ao grafo!")
+
+        return self._components.find(self.vertices[src]) == self._components.find(self.vertices[dest])
+
+    def _search_tree(self, vertices: Dict[int, Tuple[int, int]]) -> SearchTree:
+        order = np.fromiter(vertices.keys(), dtype=np.int32, count=len(vertices))
+        parents = np.full(self.vertices_num, -1, dtype=np.int32)
+        levels = np.full(self.vertices_num, -1, dtype=np.int32)
+
+        parents[order] = np.fromiter((parent for parent, _ in vertices.values()), dtype=np.int32, count=len(order))
+        levels[order] = np.fromiter((level for _, level in vertices.values()), dtype=np.int32, count=len(order))
+
+        return SearchTree(order, parents, levels)
 
     def _search_out_graph(
-        self, vertices: Dict[str, Tuple[str, int]], search_type: Literal["largura", "profundidade"], out_path: str
+        self, vertices: Dict[int, Tuple[int, int]], search_type: Literal["largura", "profundidade"], out_path: str
     ):
         translate_search_type = {"largura": "breadth", "profundidade": "depth"}
         max_len_number = m.floor(m.log10(self.vertices_num)) + 1
@@ -68,219 +454,1064 @@ class Graph:
         ) as file:
             for vertex, (parent, level) in vertices.items():
                 file.write(
-                    f"{vertex:>{max_len_number}}: {'Raiz':^{max_len_number + 6}} | Nível = {level}\n"
-                    if parent == ""
-                    else f"{vertex:>{max_len_number}}: Pai = {parent:>{max_len_number}} | Nível = {level}\n"
+                    f"{self.labels[vertex]:>{max_len_number}}: {'Raiz':^{max_len_number + 6}} | Nível = {level}\n"
+                    if parent == -1
+                    else f"{self.labels[vertex]:>{max_len_number}}: Pai = {self.labels[parent]:>{max_len_number}} | Nível = {level}\n"
                 )
 
 
-class _GraphMatrix:
+def _read_edge_file(file_path: str) -> Tuple[int, np.ndarray, np.ndarray]:
+    with open(file_path) as file:
+        vertices_num = int(file.readline())
+        # Converte o arquivo inteiro de uma vez, sem criar um objeto por aresta
+        values = np.loadtxt(file, dtype=np.int64, ndmin=2)
+
+    if values.size == 0:
+        values = values.reshape(0, 2)
+    elif values.shape[1] != 2:
+        raise ValueError(f"Arquivo de entrada inválido: {file_path}")
+
+    # Rótulos "1".."n" -> índices 0..n-1
+    src = values[:, 0].astype(np.int32) - 1
+    dest = values[:, 1].astype(np.int32) - 1
+
+    return vertices_num, src, dest
+
+
+def _deep_sizeof(obj: object, seen: Set[int]) -> int:
+    # Bytes do objeto e de tudo que ele referencia; objetos já vistos (por exemplo os rótulos) contam uma vez
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, np.ndarray):
+        # Views e arrays mapeados do cache não são donos dos dados, mas o grafo os usa do mesmo jeito
+        return sys.getsizeof(obj) + (0 if obj.flags.owndata else obj.nbytes)
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_sizeof(key, seen) + _deep_sizeof(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(_deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, "__dict__") and not isinstance(obj, type):
+        size += _deep_sizeof(vars(obj), seen)
+
+    return size
+
+
+class _ScratchBuffers:
     def __init__(self, vertices_num: int) -> None:
-        self.vertices = {str(v + 1): v for v in range(vertices_num)}
-        self.adj_matrix = np.zeros((vertices_num, vertices_num), dtype="bool")
+        # marks[v] == stamp: v já foi descoberto na travessia atual
+        self.marks = bytearray(vertices_num)
+        self.parents = array("i", bytes(4 * vertices_num))
+        self.levels = array("i", bytes(4 * vertices_num))
+        self.stamp = 0
 
-    def insert_relation(self, edge: Edge):
-        self.adj_matrix[self.vertices[edge.src]][self.vertices[edge.dest]] = 1
-        self.adj_matrix[self.vertices[edge.dest]][self.vertices[edge.src]] = 1
 
-    def breadth_first_search(self, origin: str) -> Optional[Dict[str, Tuple[str, int]]]:
-        if origin not in self.vertices:
-            return None
+class _ScratchPool:
+    def __init__(self, vertices_num: int) -> None:
+        self.vertices_num = vertices_num
+        # Buffers devolvidos pelas travessias já terminadas
+        self._free: List[_ScratchBuffers] = []
 
-        # [current, parent, level]
-        vertices_queue: Deque[Tuple[str, str, int]] = deque()
-        # {current: (parent, level)}
-        visited_vertices: Dict[str, Tuple[str, int]] = dict()
+    def acquire(self) -> _ScratchBuffers:
+        buffers = self._free.pop() if len(self._free) != 0 else _ScratchBuffers(self.vertices_num)
 
-        to_be_visited_vertices: Set[str] = set()
+        # Um carimbo novo invalida as marcas antigas sem percorrer os arrays; só zera quando o byte estoura
+        if buffers.stamp == 255:
+            buffers.marks[:] = bytes(self.vertices_num)
+            buffers.stamp = 0
+        buffers.stamp += 1
 
-        vertices_queue.append((origin, "", 0))
+        return buffers
 
-        while len(vertices_queue) > 0:
-            (current, parent, level) = vertices_queue.popleft()
-            to_be_visited_vertices.discard(current)
+    def release(self, buffers: _ScratchBuffers) -> None:
+        self._free.append(buffers)
 
-            visited_vertices[current] = (parent, level)
 
-            (indexes,) = np.nonzero(self.adj_matrix[self.vertices[current]])
-            for idx in indexes:
-                vertex = str(idx + 1)
-                if vertex not in visited_vertices and vertex not in to_be_visited_vertices:
-                    vertices_queue.append((vertex, current, level + 1))
-                    to_be_visited_vertices.add(vertex)
+class _UnionFind:
+    def __init__(self, vertices_num: int) -> None:
+        # parents[v] == v nas raízes; ranks[v] limita a altura da árvore de v e sizes[v] só vale nas raízes
+        self.parents = np.arange(vertices_num, dtype=np.int32)
+        self.ranks = np.zeros(vertices_num, dtype=np.uint8)
+        self.sizes = np.ones(vertices_num, dtype=np.int32)
+        self.count = vertices_num
+
+    def find(self, vertex: int) -> int:
+        parents = self.parents
+
+        root = vertex
+        while parents[root] != root:
+            root = int(parents[root])
+
+        # Compressão de caminho: todo o caminho passa a apontar direto para a raiz
+        while parents[vertex] != root:
+            parents[vertex], vertex = root, int(parents[vertex])
+
+        return root
+
+    def union(self, src: int, dest: int) -> None:
+        src, dest = self.find(src), self.find(dest)
+        if src == dest:
+            return
+
+        # União por rank: a árvore mais baixa fica embaixo da mais alta
+        if self.ranks[src] < self.ranks[dest]:
+            src, dest = dest, src
+        self.parents[dest] = src
+        self.sizes[src] += self.sizes[dest]
+        if self.ranks[src] == self.ranks[dest]:
+            self.ranks[src] += 1
+        self.count -= 1
+
+    def union_all(self, src: np.ndarray, dest: np.ndarray) -> None:
+        # Inserção em lote: pendura cada raiz na menor raiz vizinha e comprime tudo, até as arestas não unirem mais nada
+        parents = self.parents
+        while True:
+            self._compress()
+            src_roots, dest_roots = parents[src], parents[dest]
+            differ = src_roots != dest_roots
+            if not differ.any():
+                break
+
+            src_roots, dest_roots = src_roots[differ], dest_roots[differ]
+            np.minimum.at(parents, np.maximum(src_roots, dest_roots), np.minimum(src_roots, dest_roots))
+
+        # Depois de comprimidas as árvores têm altura no máximo 1
+        roots = parents == np.arange(len(parents))
+        self.sizes[roots] = np.bincount(parents, minlength=len(parents))[roots]
+        self.ranks[:] = 0
+        self.ranks[roots & (self.sizes > 1)] = 1
+        self.count = int(np.count_nonzero(roots))
+
+    def _compress(self) -> None:
+        # Salto de ponteiros: parents[v] = parents[parents[v]] até todo vértice apontar para a raiz
+        parents = self.parents
+        while True:
+            grandparents = parents[parents]
+            if np.array_equal(grandparents, parents):
+                return
+            parents[:] = grandparents
+
+
+def _iter_breadth_first_search(
+    adjacent: Callable[[int], Iterable[int]],
+    scratch: _ScratchPool,
+    origin: int,
+    max_level: Optional[int] = None,
+    stats: Optional[GraphStats] = None,
+) -> Iterator[Tuple[int, int, int]]:
+    # Contadores locais, copiados para stats só no fim
+    settled = scanned = 0
+    buffers = scratch.acquire()
+    try:
+        marks, parents, levels, stamp = buffers.marks, buffers.parents, buffers.levels, buffers.stamp
+
+        marks[origin] = stamp
+        parents[origin] = -1
+        levels[origin] = 0
+
+        # [current]; pai e nível ficam nos buffers
+        vertices_queue: Deque[int] = deque()
+        vertices_queue.append(origin)
 
-        return visited_vertices
+        while len(vertices_queue) != 0:
+            current = vertices_queue.popleft()
+            level = levels[current]
+            settled += 1
 
-    def depth_first_search(self, origin: str) -> Optional[Dict[str, Tuple[str, int]]]:
-        if origin not in self.vertices:
-            return None
+            # Entrega o vértice antes de expandi-lo: quem parar aqui não paga pelos vizinhos dele
+            yield current, parents[current], level
 
-        # [current, parent, level]
-        vertices_stack: Deque[Tuple[str, str, int]] = deque()
-        # {current: (parent, level)}
-        visited_vertices: Dict[str, Tuple[str, int]] = dict()
-        to_be_visited_vertices: Set[str] = set()
+            if max_level is not None and level >= max_level:
+                continue
 
-        vertices_stack.append((origin, "", 0))
+            neighbors = adjacent(current)
+            scanned += len(neighbors)
+            for vertex in neighbors:
+                if marks[vertex] != stamp:
+                    marks[vertex] = stamp
+                    parents[vertex] = current
+                    levels[vertex] = level + 1
+                    vertices_queue.append(vertex)
+    finally:
+        if stats is not None:
+            stats.vertices_settled += settled
+            stats.edges_scanned += scanned
+        scratch.release(buffers)
+
+
+def _iter_depth_first_search(
+    adjacent: Callable[[int], Iterable[int]],
+    scratch: _ScratchPool,
+    origin: int,
+    max_level: Optional[int] = None,
+    stats: Optional[GraphStats] = None,
+) -> Iterator[Tuple[int, int, int]]:
+    # Contadores locais, copiados para stats só no fim
+    settled = scanned = 0
+    buffers = scratch.acquire()
+    try:
+        marks, parents, levels, stamp = buffers.marks, buffers.parents, buffers.levels, buffers.stamp
+
+        marks[origin] = stamp
+        parents[origin] = -1
+        levels[origin] = 0
+
+        # [current]; pai e nível ficam nos buffers
+        vertices_stack: Deque[int] = deque()
+        vertices_stack.append(origin)
 
         while len(vertices_stack) != 0:
-            current, parent, level = vertices_stack.pop()
-            visited_vertices[current] = (parent, level)
-            to_be_visited_vertices.discard(current)
+            current = vertices_stack.pop()
+            level = levels[current]
+            settled += 1
 
-            (indexes,) = np.nonzero(self.adj_matrix[self.vertices[current]])
-            for idx in indexes:
-                vertex = str(idx + 1)
-                if vertex not in visited_vertices and vertex not in to_be_visited_vertices:
-                    vertices_stack.append((vertex, current, level + 1))
-                    to_be_visited_vertices.add(vertex)
+            yield current, parents[current], level
 
-        return visited_vertices
+            if max_level is not None and level >= max_level:
+                continue
 
-    def find_connected_components(self) -> List[Set[str]]:
-        connected_components: List[Set[str]] = list()
-        visited_vertices: Set[str] = set()
+            neighbors = adjacent(current)
+            scanned += len(neighbors)
+            for vertex in neighbors:
+                if marks[vertex] != stamp:
+                    marks[vertex] = stamp
+                    parents[vertex] = current
+                    levels[vertex] = level + 1
+                    vertices_stack.append(vertex)
+    finally:
+        if stats is not None:
+            stats.vertices_settled += settled
+            stats.edges_scanned += scanned
+        scratch.release(buffers)
+
+
+def _connected_components(
+    adjacent: Callable[[int], Iterable[int]],
+    scratch: _ScratchPool,
+    vertices_num: int,
+    stats: Optional[GraphStats] = None,
+) -> List[Set[int]]:
+    connected_components: List[Set[int]] = list()
+    scanned = 0
+
+    buffers = scratch.acquire()
+    try:
+        marks, stamp = buffers.marks, buffers.stamp
+
+        for vertex in range(vertices_num):
+            if marks[vertex] == stamp:
+                continue
 
-        for vertex in self.vertices:
-            if vertex not in visited_vertices:
-                vertices_queue: Deque[str] = deque()
-                to_be_visited_vertices: Set[str] = set()
-                component: List[str] = list()
+            marks[vertex] = stamp
+            vertices_stack: List[int] = [vertex]
+            local_component: Set[int] = set()
 
-                vertices_queue.append(vertex)
+            while len(vertices_stack) != 0:
+                current_vertex = vertices_stack.pop()
+                local_component.add(current_vertex)
 
-                while len(vertices_queue) != 0:
-                    current = vertices_queue.popleft()
+                neighbors = adjacent(current_vertex)
+                scanned += len(neighbors)
+                for neighbor in neighbors:
+                    if marks[neighbor] != stamp:
+                        marks[neighbor] = stamp
+                        vertices_stack.append(neighbor)
+
+            connected_components.append(local_component)
+    finally:
+        if stats is not None:
+            stats.vertices_settled += vertices_num
+            stats.edges_scanned += scanned
+        scratch.release(buffers)
+
+    return connected_components
+
+
+def _component_labels(vertices_num: int, src: np.ndarray, dest: np.ndarray) -> np.ndarray:
+    # Hooking e salto de ponteiros sobre os arrays de arestas: cada vértice termina apontando para o menor vértice
+    # do seu componente, então os índices saem na mesma ordem das buscas de _connected_components
+    components = _UnionFind(vertices_num)
+    components.union_all(src, dest)
+    return np.unique(components.parents, return_inverse=True)[1].astype(np.int32)
+
+
+def _labels_to_components(component_labels: np.ndarray) -> List[Set[int]]:
+    # Conjuntos de vértices a partir dos rótulos, na ordem dos índices dos componentes
+    if len(component_labels) == 0:
+        return []
+
+    order = np.argsort(component_labels, kind="stable")
+    bounds = np.cumsum(np.bincount(component_labels))[:-1]
+    return [set(component.tolist()) for component in np.split(order, bounds)]
 
-                    component.append(current)
 
-                    to_be_visited_vertices.discard(current)
-                    visited_vertices.add(current)
+def _level_sync_bfs(
+    offsets: np.ndarray,
+    neighbors: np.ndarray,
+    origin: int,
+    end: Optional[int] = None,
+    stats: Optional[GraphStats] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    vertices_num = len(offsets) - 1
+    parents = np.full(vertices_num, -1, dtype=np.int32)
+    levels = np.full(vertices_num, -1, dtype=np.int32)
+
+    levels[origin] = 0
+    frontier = np.array([origin], dtype=np.int32)
+    order = [frontier]
 
-                    (indexes,) = np.nonzero(
-                        self.adj_matrix[self.vertices[current]])
-                    for idx in indexes:
-                        vertex = str(idx + 1)
-                        if vertex not in visited_vertices and vertex not in to_be_visited_vertices:
-                            vertices_queue.append(vertex)
-                            to_be_visited_vertices.add(vertex)
+    level = 0
+    while len(frontier) != 0 and (end is None or levels[end] == -1):
+        starts = offsets[frontier].astype(np.int64)
+        counts = offsets[frontier + 1] - starts
+        if stats is not None:
+            stats.vertices_settled += len(frontier)
+            stats.edges_scanned += int(counts.sum())
 
-                connected_components.append(set(component))
+        # Todos os vizinhos da fronteira de uma vez, na ordem em que a fila os visitaria
+        entries = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        candidates = neighbors[entries]
+        positions = np.repeat(np.arange(len(frontier)), counts)
+
+        new = levels[candidates] == -1
+        candidates, positions = candidates[new], positions[new]
+
+        # A primeira ocorrência de cada vértice define o pai (o primeiro da fila) e a ordem de chegada
+        _, first = np.unique(candidates, return_index=True)
+        first.sort()
+
+        level += 1
+        parents[candidates[first]] = frontier[positions[first]]
+        frontier = candidates[first].astype(np.int32)
+        levels[frontier] = level
+        order.append(frontier)
+
+    return np.concatenate(order), parents, levels
+
+
+def _search_dict(order: np.ndarray, parents: np.ndarray, levels: np.ndarray) -> Dict[int, Tuple[int, int]]:
+    # {vertex: (parent, level)} na ordem de visita, como devolvido pelas buscas com fila
+    return dict(zip(order.tolist(), zip(parents[order].tolist(), levels[order].tolist())))
+
+
+# Quantas buscas em largura cada lote faz ao mesmo tempo (um bit por origem em uma palavra de 64 bits)
+_BFS_BATCH = 64
+
+
+def _batch_eccentricities(offsets: np.ndarray, neighbors: np.ndarray, sources: np.ndarray) -> np.ndarray:
+    vertices_num = len(offsets) - 1
+    eccentricities = np.zeros(len(sources), dtype=np.int32)
+    if len(neighbors) == 0:
+        return eccentricities
+
+    # reduceat não aceita segmentos vazios, então só os vértices com vizinhos entram na expansão
+    has_neighbors = np.flatnonzero(np.diff(offsets))
+    starts = offsets[has_neighbors]
+
+    # Bit i de seen[v]: a busca que parte de sources[i] já alcançou v
+    shifts = np.arange(len(sources), dtype=np.uint64)
+    seen = np.zeros(vertices_num, dtype=np.uint64)
+    seen[sources] = np.left_shift(np.uint64(1), shifts)
+    frontier = seen.copy()
+
+    level = 0
+    while True:
+        # Um vértice entra na fronteira de cada busca que alcançou algum vizinho seu no nível anterior
+        reached = np.zeros(vertices_num, dtype=np.uint64)
+        reached[has_neighbors] = np.bitwise_or.reduceat(frontier[neighbors], starts)
+        frontier = reached & ~seen
+
+        active = np.bitwise_or.reduce(frontier)
+        if active == 0:
+            return eccentricities
+
+        level += 1
+        seen |= frontier
+        eccentricities[(np.right_shift(active, shifts) & np.uint64(1)) == 1] = level
+
+
+def _ifub_diameter(offsets: np.ndarray, neighbors: np.ndarray, workers: Optional[int] = None) -> int:
+    # Grafo conexo: dupla varredura a partir do vértice de maior grau para um limite inferior
+    _, _, levels = _level_sync_bfs(offsets, neighbors, int(np.argmax(np.diff(offsets))))
+    _, parents, levels = _level_sync_bfs(offsets, neighbors, int(np.argmax(levels)))
+    lower_bound = int(levels.max())
+
+    # Raiz do iFUB: o vértice no meio do caminho encontrado pela dupla varredura
+    root = int(np.argmax(levels))
+    for _ in range(lower_bound // 2):
+        root = int(parents[root])
+
+    _, _, levels = _level_sync_bfs(offsets, neighbors, root)
+    root_eccentricity = int(levels.max())
+    lower_bound = max(lower_bound, root_eccentricity)
+
+    with _EccentricityPool(offsets, neighbors, workers) as pool:
+        for level in range(root_eccentricity, 0, -1):
+            # Dois vértices até este nível estão a no máximo 2 * level um do outro, e os dos níveis
+            # mais distantes já tiveram a excentricidade calculada
+            if lower_bound >= 2 * level:
+                break
+
+            fringe = np.flatnonzero(levels == level).astype(np.int32)
+            lower_bound = max(lower_bound, int(pool.eccentricities(fringe).max()))
+
+    return lower_bound
+
+
+def _components_diameters(
+    offsets: np.ndarray, neighbors: np.ndarray, component_labels: np.ndarray, workers: Optional[int] = None
+) -> np.ndarray:
+    components_num = int(component_labels.max()) + 1 if len(component_labels) != 0 else 0
+
+    # Renumera os vértices para que cada componente ocupe um intervalo contíguo do CSR
+    order = np.argsort(component_labels, kind="stable").astype(np.int32)
+    position = np.empty_like(order)
+    position[order] = np.arange(len(order), dtype=np.int32)
 
-        return connected_components
+    degrees = np.diff(offsets)[order]
+    sorted_offsets = np.zeros(len(order) + 1, dtype=np.int64)
+    np.cumsum(degrees, out=sorted_offsets[1:])
+    starts = offsets[order].astype(np.int64)
+    entries = np.repeat(starts - sorted_offsets[:-1], degrees) + np.arange(sorted_offsets[-1])
+    sorted_neighbors = position[neighbors[entries]]
 
-    def get_graph_degrees(self) -> Dict[str, int]:
-        return {str(vertex + 1): np.count_nonzero(line) for vertex, line in enumerate(self.adj_matrix)}
+    bounds = np.searchsorted(component_labels[order], np.arange(components_num + 1))
 
-    def out_graph(self, out_path: str):
-        with open(path.join(out_path, "graph_matrix_out.txt"), "w") as file:
-            file.write(f"# n = {len(self.vertices)}\n")
-            file.write(f"# m = {int(np.count_nonzero(self.adj_matrix) / 2)}\n")
-            for vertex, line in enumerate(self.adj_matrix):
-                file.write(f"{vertex + 1} {np.count_nonzero(line)}\n")
+    diameters = np.zeros(components_num, dtype=np.int32)
+    for component, (first, last) in enumerate(zip(bounds[:-1].tolist(), bounds[1:].tolist())):
+        if last - first <= 2:
+            diameters[component] = last - first - 1
+            continue
 
+        component_offsets = (sorted_offsets[first : last + 1] - sorted_offsets[first]).astype(np.int32)
+        component_neighbors = sorted_neighbors[sorted_offsets[first] : sorted_offsets[last]] - first
+
+        if last - first <= _BFS_BATCH:
+            # Um único lote de buscas simultâneas já dá todas as excentricidades
+            sources = np.arange(last - first, dtype=np.int32)
+            diameters[component] = _batch_eccentricities(component_offsets, component_neighbors, sources).max()
+        else:
+            diameters[component] = _ifub_diameter(component_offsets, component_neighbors, workers)
+
+    return diameters
+
+
+# Arrays CSR compartilhados com os processos do pool, definidos em _attach_shared_csr
+_shared_csr: Optional[Tuple[np.ndarray, np.ndarray]] = None
+_shared_blocks: List[shared_memory.SharedMemory] = []
+
+
+def _attach_shared_csr(offsets_spec: Tuple[str, int], neighbors_spec: Tuple[str, int]) -> None:
+    global _shared_csr
+
+    arrays = []
+    for name, size in (offsets_spec, neighbors_spec):
+        block = shared_memory.SharedMemory(name=name)
+        _shared_blocks.append(block)
+        array_view = np.ndarray(size, dtype=np.int32, buffer=block.buf)
+        array_view.flags.writeable = False
+        arrays.append(array_view)
+
+    _shared_csr = (arrays[0], arrays[1])
+
+
+def _sources_eccentricities(offsets: np.ndarray, neighbors: np.ndarray, sources: np.ndarray) -> np.ndarray:
+    if len(sources) == 0:
+        return np.zeros(0, dtype=np.int32)
+
+    batches = np.array_split(sources, -(-len(sources) // _BFS_BATCH))
+    return np.concatenate([_batch_eccentricities(offsets, neighbors, batch) for batch in batches])
+
+
+def _shared_eccentricities(sources: np.ndarray) -> np.ndarray:
+    return _sources_eccentricities(*_shared_csr, sources)
+
+
+class _EccentricityPool:
+    # Excentricidades de lotes de origens sobre um CSR fixo. O pool de processos e a memória compartilhada só são
+    # criados no primeiro pedido com lotes suficientes para dividir, e atendem aos pedidos seguintes
+    def __init__(self, offsets: np.ndarray, neighbors: np.ndarray, workers: Optional[int] = None) -> None:
+        self.offsets = offsets
+        self.neighbors = neighbors
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._blocks: List[shared_memory.SharedMemory] = []
+
+    def __enter__(self) -> "_EccentricityPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def eccentricities(self, sources: np.ndarray) -> np.ndarray:
+        if self.workers <= 1 or len(sources) <= _BFS_BATCH:
+            return _sources_eccentricities(self.offsets, self.neighbors, sources)
+
+        # Vários lotes por processo para equilibrar componentes de tamanhos diferentes
+        tasks = np.array_split(sources, min(-(-len(sources) // _BFS_BATCH), self.workers * 8))
+        return np.concatenate(list(self._start().map(_shared_eccentricities, tasks)))
+
+    def _start(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            specs = []
+            for source in (self.offsets, self.neighbors):
+                source = np.ascontiguousarray(source, dtype=np.int32)
+                block = shared_memory.SharedMemory(create=True, size=max(source.nbytes, 1))
+                self._blocks.append(block)
+                np.ndarray(len(source), dtype=np.int32, buffer=block.buf)[:] = source
+                specs.append((block.name, len(source)))
+
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_attach_shared_csr, initargs=tuple(specs)
+            )
+        return self._pool
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+
+def _parallel_eccentricities(offsets: np.ndarray, neighbors: np.ndarray, workers: Optional[int] = None) -> np.ndarray:
+    with _EccentricityPool(offsets, neighbors, workers) as pool:
+        return pool.eccentricities(np.arange(len(offsets) - 1, dtype=np.int32))
+
+
+# Quantidade de bits 1 em cada valor de byte, para versões do numpy sem bitwise_count
+_BYTE_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+
+
+def _add_new_edges_degrees(degrees: np.ndarray, src: np.ndarray, dest: np.ndarray) -> None:
+    # Arestas que ainda não existiam no grafo; repetidas no lote contam uma vez e o laço (v, v) soma 1, como na matriz
+    low, high = np.minimum(src, dest), np.maximum(src, dest)
+    low, high = np.divmod(np.unique(low.astype(np.int64) * len(degrees) + high), len(degrees))
+    degrees += np.bincount(low, minlength=len(degrees))
+    degrees += np.bincount(high[high != low], minlength=len(degrees))
+
+
+def _popcount(words: np.ndarray) -> np.ndarray:
+    # Bits 1 de cada linha de um bitmap de palavras uint64
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    return _BYTE_POPCOUNT[words.view(np.uint8)].sum(axis=-1, dtype=np.int64)
+
+
+def _bits_to_vertices(words: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # (linha, vértice) de cada bit 1 de um bitmap 2-d, em ordem crescente; bit (v % 64) da palavra v // 64
+    rows, columns = np.nonzero(words)
+    word_bytes = words[rows, columns].astype("<u8").view(np.uint8).reshape(-1, 8)
+    entries, positions = np.nonzero(np.unpackbits(word_bytes, axis=1, bitorder="little"))
+
+    return rows[entries], columns[entries].astype(np.int64) * 64 + positions
+
+
+CACHE_SUFFIX = ".graphcache"
+
+# magic, vértices, tamanho de neighbors, tamanho da fonte, mtime da fonte (ns), hash da fonte, ponderado
+_CACHE_HEADER = struct.Struct("<8sqqqq32s?")
+_CACHE_HEADER_SIZE = 128
+_CACHE_MAGIC = b"GRAFOCSR"
+
+
+def _source_key(file_path: str) -> Tuple[int, int, bytes]:
+    # (tamanho, mtime em ns, hash do conteúdo)
+    stat = os.stat(file_path)
+    return stat.st_size, stat.st_mtime_ns, _source_hash(file_path)
+
+
+def _source_hash(file_path: str) -> bytes:
+    digest = hashlib.blake2b(digest_size=32)
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def _align(position: int) -> int:
+    return (position + 7) & ~7
 
-class _GraphList:
-    def __init__(self, vertices_num: int) -> None:
-        self.elements: Dict[str, Set[str]] = {
-            vertex: set() for vertex in (str(vertice + 1) for vertice in range(vertices_num))
-        }
 
-    def insert_relation(self, edge: Edge):
-        self[edge.src].add(edge.dest)
-        self[edge.dest].add(edge.src)
+def _write_graph_cache(
+    file_path: str,
+    vertices_num: int,
+    offsets: np.ndarray,
+    neighbors: np.ndarray,
+    source_key: Optional[Tuple[int, int, bytes]],
+):
+    source_size, source_mtime, source_hash = source_key if source_key is not None else (0, 0, bytes(32))
+    header = _CACHE_HEADER.pack(
+        _CACHE_MAGIC, vertices_num, len(neighbors), source_size, source_mtime, source_hash, False
+    )
 
-    def get_graph_degrees(self) -> Dict[str, int]:
-        return {vertex: len(edges) for vertex, edges in self.elements.items()}
+    # Escreve em um arquivo temporário e troca de uma vez, para que leitores nunca vejam um cache incompleto
+    tmp_path = f"{file_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(header.ljust(_CACHE_HEADER_SIZE, b"\0"))
+        for values in (offsets.astype("<i4"), neighbors.astype("<i4")):
+            file.write(bytes(_align(file.tell()) - file.tell()))
+            file.write(values.tobytes())
+    os.replace(tmp_path, file_path)
 
-    def out_graph(self, out_path: str):
-        with open(path.join(out_path, "graph_list_out.txt"), "w") as file:
-            file.write(f"# n = {len(self.elements.keys())}\n")
+
+def _read_cache_header(file_path: str) -> Optional[Tuple]:
+    try:
+        with open(file_path, "rb") as file:
+            header = file.read(_CACHE_HEADER.size)
+    except OSError:
+        return None
+
+    if len(header) != _CACHE_HEADER.size or header[:8] != _CACHE_MAGIC:
+        return None
+    return _CACHE_HEADER.unpack(header)
+
+
+def _check_graph_cache(cache_path: str, source_path: str) -> bool:
+    header = _read_cache_header(cache_path)
+    if header is None:
+        return False
+
+    magic, vertices_num, neighbors_num, cached_size, cached_mtime, cached_hash, cached_weighted = header
+    stat = os.stat(source_path)
+
+    # Caches ponderados (trabalho_pt2) não servem para este grafo
+    if cached_weighted or cached_size != stat.st_size:
+        return False
+    if cached_mtime == stat.st_mtime_ns:
+        return True
+
+    # Só o mtime mudou (ex.: checkout): confere o conteúdo e atualiza o cabeçalho
+    if cached_hash != _source_hash(source_path):
+        return False
+    try:
+        with open(cache_path, "r+b") as file:
             file.write(
-                f"# m = {int(sum(len(edges) for edges in self.elements.values()) / 2)}\n")
+                _CACHE_HEADER.pack(
+                    magic, vertices_num, neighbors_num, stat.st_size, stat.st_mtime_ns, cached_hash, cached_weighted
+                )
+            )
+    except OSError:
+        pass
+    return True
 
-            for vertex, edges in self.elements.items():
-                file.write(f"{vertex} {len(edges)}\n")
 
-    def breadth_first_search(self, origin: str) -> Optional[Dict[str, Tuple[str, int]]]:
-        if origin not in self.elements:
-            return None
+def _map_graph_cache(file_path: str) -> Tuple[int, np.ndarray, np.ndarray]:
+    header = _read_cache_header(file_path)
+    if header is None:
+        raise ValueError(f"Cache de grafo inválido: {file_path}")
 
-        # [current, parent, level]
-        vertices_queue: Deque[Tuple[str, str, int]] = deque()
-        # {current: (parent, level)}
-        visited_vertices: Dict[str, Tuple[str, int]] = dict()
+    _, vertices_num, neighbors_num, _, _, _, _ = header
 
-        to_be_visited_vertices: Set[str] = set()
+    def map_array(position: int, dtype: str, size: int) -> np.ndarray:
+        if size == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(file_path, dtype=dtype, mode="r", offset=position, shape=(size,))
 
-        vertices_queue.append((origin, "", 0))
+    # Mapeia os arrays em modo somente leitura: vários processos compartilham as mesmas páginas
+    position = _CACHE_HEADER_SIZE
+    offsets = map_array(position, "<i4", vertices_num + 1)
+    position = _align(position + offsets.nbytes)
+    neighbors = map_array(position, "<i4", neighbors_num)
 
-        while len(vertices_queue) != 0:
-            current, parent, level = vertices_queue.popleft()
-            visited_vertices[current] = parent, level
-            to_be_visited_vertices.discard(current)
+    return vertices_num, offsets, neighbors
 
-            for edge in self[current]:
-                if edge not in visited_vertices and edge not in to_be_visited_vertices:
-                    vertices_queue.append((edge, current, level + 1))
-                    to_be_visited_vertices.add(edge)
 
-        return visited_vertices
+class _GraphMatrix:
+    def __init__(self, vertices_num: int) -> None:
+        self.adj_matrix = np.zeros((vertices_num, vertices_num), dtype="bool")
+        # Graus mantidos a cada inserção, sem percorrer as linhas
+        self.degrees = np.zeros(vertices_num, dtype=np.int32)
+        # (offsets, neighbors) das posições não nulas, usado pela busca por níveis e pelos componentes
+        self._nonzero_index: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._scratch = _ScratchPool(vertices_num)
+
+    def insert_relation(self, src: int, dest: int):
+        if not self.adj_matrix[src, dest]:
+            self.degrees[src] += 1
+            if src != dest:
+                self.degrees[dest] += 1
+
+        self.adj_matrix[src][dest] = 1
+        self.adj_matrix[dest][src] = 1
+        self._nonzero_index = None
+
+    def insert_relations(self, src: np.ndarray, dest: np.ndarray):
+        new = ~self.adj_matrix[src, dest]
+        _add_new_edges_degrees(self.degrees, src[new], dest[new])
+
+        self.adj_matrix[src, dest] = 1
+        self.adj_matrix[dest, src] = 1
+        self._nonzero_index = None
+
+    def csr_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        # flatnonzero + divmod é bem mais rápido que np.nonzero em 2-d numa matriz grande
+        rows, neighbors = np.divmod(np.flatnonzero(self.adj_matrix), max(1, len(self.adj_matrix)))
+        offsets = np.zeros(len(self.adj_matrix) + 1, dtype=np.int32)
+        np.cumsum(np.bincount(rows, minlength=len(self.adj_matrix)), out=offsets[1:])
+        return offsets, neighbors.astype(np.int32)
+
+    def iter_breadth_first_search(
+        self, origin: int, max_level: Optional[int] = None, stats: Optional[GraphStats] = None
+    ) -> Iterator[Tuple[int, int, int]]:
+        return _iter_breadth_first_search(self._adjacent, self._scratch, origin, max_level, stats)
+
+    def iter_depth_first_search(
+        self, origin: int, max_level: Optional[int] = None, stats: Optional[GraphStats] = None
+    ) -> Iterator[Tuple[int, int, int]]:
+        return _iter_depth_first_search(self._adjacent, self._scratch, origin, max_level, stats)
+
+    def _adjacent(self, vertex: int) -> List[int]:
+        return np.flatnonzero(self.adj_matrix[vertex]).tolist()
+
+    def breadth_first_search(
+        self, origin: int, level_sync: bool = False, stats: Optional[GraphStats] = None
+    ) -> Dict[int, Tuple[int, int]]:
+        if level_sync:
+            return self._level_sync_breadth_first_search(origin, stats)
+
+        # {current: (parent, level)}
+        vertices = self.iter_breadth_first_search(origin, stats=stats)
+        return {current: (parent, level) for current, parent, level in vertices}
 
-    def depth_first_search(self, origin: str) -> Optional[Dict[str, Tuple[str, int]]]:
-        if origin not in self.elements:
-            return None
+    def _level_sync_breadth_first_search(self, origin: int, stats: Optional[GraphStats]) -> Dict[int, Tuple[int, int]]:
+        order, parents, levels = _level_sync_bfs(*self._nonzero_csr(), origin, stats=stats)
+        return _search_dict(order, parents, levels)
 
-        # [current, parent, level]
-        vertices_stack: Deque[Tuple[str, str, int]] = deque()
+    def _nonzero_csr(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._nonzero_index is None:
+            # Índice compacto das posições não nulas da matriz, refeito após novas inserções
+            self._nonzero_index = self.csr_arrays()
+
+        return self._nonzero_index
+
+    def depth_first_search(self, origin: int, stats: Optional[GraphStats] = None) -> Dict[int, Tuple[int, int]]:
         # {current: (parent, level)}
-        visited_vertices: Dict[str, Tuple[str, int]] = dict()
+        vertices = self.iter_depth_first_search(origin, stats=stats)
+        return {current: (parent, level) for current, parent, level in vertices}
 
-        to_be_visited_vertices: Set[str] = set()
+    def find_connected_components(self, stats: Optional[GraphStats] = None) -> List[Set[int]]:
+        return _labels_to_components(self.component_labels(stats))
 
-        vertices_stack.append((origin, "", 0))
+    def component_labels(self, stats: Optional[GraphStats] = None) -> np.ndarray:
+        offsets, neighbors = self._nonzero_csr()
+        if stats is not None:
+            # A rotulação vetorizada passa por cada vértice e cada entrada não nula
+            stats.vertices_settled += len(self.adj_matrix)
+            stats.edges_scanned += len(neighbors)
+        src = np.repeat(np.arange(len(self.adj_matrix), dtype=np.int32), np.diff(offsets))
+        return _component_labels(len(self.adj_matrix), src, neighbors)
 
-        while len(vertices_stack) != 0:
-            current, parent, level = vertices_stack.pop()
-            visited_vertices[current] = parent, level
-            to_be_visited_vertices.discard(current)
+    def get_graph_degrees(self) -> np.ndarray:
+        return self.degrees.copy()
+
+
+class _GraphBitMatrix:
+    def __init__(self, vertices_num: int) -> None:
+        self.vertices_num = vertices_num
+        # Linha v: bit (u % 64) da palavra u // 64 indica a aresta v-u
+        self.adj_bits = np.zeros((vertices_num, -(-vertices_num // 64)), dtype=np.uint64)
+        # Graus mantidos a cada inserção, sem percorrer as linhas
+        self.degrees = np.zeros(vertices_num, dtype=np.int32)
+        self._scratch = _ScratchPool(vertices_num)
+
+    def insert_relation(self, src: int, dest: int):
+        if not (int(self.adj_bits[src, dest >> 6]) >> (dest & 63)) & 1:
+            self.degrees[src] += 1
+            if src != dest:
+                self.degrees[dest] += 1
+
+        self.adj_bits[src, dest >> 6] |= np.uint64(1 << (dest & 63))
+        self.adj_bits[dest, src >> 6] |= np.uint64(1 << (src & 63))
+
+    def insert_relations(self, src: np.ndarray, dest: np.ndarray):
+        rows = np.concatenate((src, dest))
+        columns = np.concatenate((dest, src))
+        # Várias arestas podem cair na mesma palavra, então os bits são acumulados com bitwise_or.at
+        bits = np.left_shift(np.uint64(1), (columns & 63).astype(np.uint64))
+        np.bitwise_or.at(self.adj_bits, (rows, columns >> 6), bits)
+
+        # Popcount só das linhas que receberam arestas; repetidas não mudam o número de bits
+        touched = np.unique(rows)
+        block = max(1, (1 << 22) // max(1, self.adj_bits.shape[1]))
+        for start in range(0, len(touched), block):
+            self.degrees[touched[start : start + block]] = _popcount(self.adj_bits[touched[start : start + block]])
+
+    def csr_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        rows, neighbors = _bits_to_vertices(self.adj_bits)
+        offsets = np.zeros(self.vertices_num + 1, dtype=np.int32)
+        np.cumsum(np.bincount(rows, minlength=self.vertices_num), out=offsets[1:])
+        return offsets, neighbors.astype(np.int32)
+
+    def _adjacent(self, vertex: int) -> List[int]:
+        return _bits_to_vertices(self.adj_bits[vertex : vertex + 1])[1].tolist()
+
+    def iter_breadth_first_search(
+        self, origin: int, max_level: Optional[int] = None, stats: Optional[GraphStats] = None
+    ) -> Iterator[Tuple[int, int, int]]:
+        return self._iter_search(origin, max_level, False, stats)
+
+    def iter_depth_first_search(
+        self, origin: int, max_level: Optional[int] = None, stats: Optional[GraphStats] = None
+    ) -> Iterator[Tuple[int, int, int]]:
+        return self._iter_search(origin, max_level, True, stats)
+
+    def _iter_search(
+        self, origin: int, max_level: Optional[int], depth_first: bool, stats: Optional[GraphStats]
+    ) -> Iterator[Tuple[int, int, int]]:
+        settled = scanned = 0
+        buffers = self._scratch.acquire()
+        try:
+            parents, levels = buffers.parents, buffers.levels
+
+            # Bitmap dos vértices já visitados ou na fila/pilha e buffer dos recém-descobertos
+            discovered = np.zeros(self.adj_bits.shape[1], dtype=np.uint64)
+            discovered[origin >> 6] |= np.uint64(1 << (origin & 63))
+            undiscovered = np.empty_like(discovered)
+            new_bits = np.empty_like(discovered)
+            parents[origin] = -1
+            levels[origin] = 0
+
+            # [current]; pai e nível ficam nos buffers
+            vertices: Deque[int] = deque()
+            vertices.append(origin)
+
+            while len(vertices) != 0:
+                current = vertices.pop() if depth_first else vertices.popleft()
+                level = levels[current]
+                settled += 1
+
+                yield current, parents[current], level
+
+                if max_level is not None and level >= max_level:
+                    continue
+
+                # A linha inteira é lida de uma vez, então conta como todas as arestas do vértice
+                scanned += int(self.degrees[current])
+                # Vizinhos ainda não descobertos: a linha do vértice AND NOT o bitmap de descobertos
+                np.bitwise_and(self.adj_bits[current], np.invert(discovered, out=undiscovered), out=new_bits)
+                if not new_bits.any():
+                    continue
+                discovered |= new_bits
+
+                for vertex in _bits_to_vertices(new_bits[None, :])[1].tolist():
+                    parents[vertex] = current
+                    levels[vertex] = level + 1
+                    vertices.append(vertex)
+        finally:
+            if stats is not None:
+                stats.vertices_settled += settled
+                stats.edges_scanned += scanned
+            self._scratch.release(buffers)
+
+    def breadth_first_search(self, origin: int, stats: Optional[GraphStats] = None) -> Dict[int, Tuple[int, int]]:
+        # {current: (parent, level)}
+        vertices = self.iter_breadth_first_search(origin, stats=stats)
+        return {current: (parent, level) for current, parent, level in vertices}
+
+    def depth_first_search(self, origin: int, stats: Optional[GraphStats] = None) -> Dict[int, Tuple[int, int]]:
+        # {current: (parent, level)}
+        vertices = self.iter_depth_first_search(origin, stats=stats)
+        return {current: (parent, level) for current, parent, level in vertices}
+
+    def find_connected_components(self, stats: Optional[GraphStats] = None) -> List[Set[int]]:
+        connected_components: List[Set[int]] = list()
+        discovered = np.zeros(self.adj_bits.shape[1], dtype=np.uint64)
+
+        buffers = self._scratch.acquire()
+        try:
+            marks, stamp = buffers.marks, buffers.stamp
+
+            for vertex in range(self.vertices_num):
+                if marks[vertex] == stamp:
+                    continue
+
+                discovered[vertex >> 6] |= np.uint64(1 << (vertex & 63))
+                frontier = np.array([vertex])
+                component = [frontier]
+
+                while len(frontier) != 0:
+                    # Próximo nível: OU das linhas da fronteira, AND NOT o que já foi descoberto
+                    new_bits = np.bitwise_or.reduce(self.adj_bits[frontier], axis=0) & ~discovered
+                    discovered |= new_bits
+                    frontier = _bits_to_vertices(new_bits[None, :])[1]
+                    component.append(frontier)
+
+                local_component = set(np.concatenate(component).tolist())
+                for current in local_component:
+                    marks[current] = stamp
+
+                connected_components.append(local_component)
+        finally:
+            self._scratch.release(buffers)
+
+        if stats is not None:
+            # Cada linha entra no OU da sua fronteira exatamente uma vez
+            stats.vertices_settled += self.vertices_num
+            stats.edges_scanned += int(self.degrees.sum())
+        return connected_components
 
-            for edge in self[current]:
-                if edge not in visited_vertices and edge not in to_be_visited_vertices:
-                    vertices_stack.append((edge, current, level + 1))
-                    to_be_visited_vertices.add(edge)
+    def get_graph_degrees(self) -> np.ndarray:
+        return self.degrees.copy()
 
-        return visited_vertices
 
-    def find_connected_components(self) -> List[Set[str]]:
-        connected_components: List[Set[str]] = list()
-        visited_vertices: Set[str] = set()
+class _GraphList:
+    def __init__(self, vertices_num: int) -> None:
+        self.elements: List[Set[int]] = [set() for _ in range(vertices_num)]
+        # degrees[v] == len(elements[v]), mantido a cada inserção
+        self.degrees = np.zeros(vertices_num, dtype=np.int32)
+        self._scratch = _ScratchPool(vertices_num)
+
+    def insert_relation(self, src: int, dest: int):
+        if dest not in self[src]:
+            self[src].add(dest)
+            self[dest].add(src)
+            self.degrees[src] += 1
+            if src != dest:
+                self.degrees[dest] += 1
+
+    def insert_relations(self, src: np.ndarray, dest: np.ndarray):
+        # Agrupa as arestas por vértice de origem e atualiza cada conjunto uma única vez
+        all_src = np.concatenate((src, dest))
+        order = np.argsort(all_src, kind="stable")
+        all_src = all_src[order]
+        all_dest = np.concatenate((dest, src))[order]
+
+        vertices, starts = np.unique(all_src, return_index=True)
+        for vertex, neighbors in zip(vertices.tolist(), np.split(all_dest, starts[1:])):
+            self.elements[vertex].update(neighbors.tolist())
+            self.degrees[vertex] = len(self.elements[vertex])
+
+    def get_graph_degrees(self) -> np.ndarray:
+        return self.degrees.copy()
+
+    def csr_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        offsets = np.zeros(len(self.elements) + 1, dtype=np.int32)
+        np.cumsum(self.get_graph_degrees(), out=offsets[1:])
+        neighbors = np.fromiter(chain.from_iterable(self.elements), dtype=np.int32, count=int(offsets[-1]))
+        return offsets, neighbors
+
+    def iter_breadth_first_search(
+        self, origin: int, max_level: Optional[int] = None, stats: Optional[GraphStats] = None
+    ) -> Iterator[Tuple[int, int, int]]:
+        return _iter_breadth_first_search(self._adjacent, self._scratch, origin, max_level, stats)
+
+    def iter_depth_first_search(
+        self, origin: int, max_level: Optional[int] = None, stats: Optional[GraphStats] = None
+    ) -> Iterator[Tuple[int, int, int]]:
+        return _iter_depth_first_search(self._adjacent, self._scratch, origin, max_level, stats)
+
+    def breadth_first_search(self, origin: int, stats: Optional[GraphStats] = None) -> Dict[int, Tuple[int, int]]:
+        # {current: (parent, level)}
+        vertices = self.iter_breadth_first_search(origin, stats=stats)
+        return {current: (parent, level) for current, parent, level in vertices}
 
-        for vertex in self.elements:
-            if vertex in visited_vertices:
-                continue
+    def depth_first_search(self, origin: int, stats: Optional[GraphStats] = None) -> Dict[int, Tuple[int, int]]:
+        # {current: (parent, level)}
+        vertices = self.iter_depth_first_search(origin, stats=stats)
+        return {current: (parent, level) for current, parent, level in vertices}
 
-            to_be_visited_vertices: Set[str] = set()
-            vertices_stack: Deque[str] = deque()
-            local_component: Set[str] = set()
+    def find_connected_components(self, stats: Optional[GraphStats] = None) -> List[Set[int]]:
+        return _connected_components(self._adjacent, self._scratch, len(self.elements), stats)
 
-            vertices_stack.append(vertex)
+    def _adjacent(self, vertex: int) -> Set[int]:
+        return self[vertex]
 
-            while len(vertices_stack) != 0:
-                current_vertex = vertices_stack.pop()
+    def __getitem__(self, key):
+        return self.elements[key]
 
-                visited_vertices.add(current_vertex)
-                local_component.add(current_vertex)
-                to_be_visited_vertices.discard(current_vertex)
 
-                for edge in self[current_vertex]:
-                    if edge not in visited_vertices and edge not in to_be_visited_vertices:
-                        vertices_stack.append(edge)
-                        to_be_visited_vertices.add(edge)
+class _GraphCSR:
+    def __init__(self, vertices_num: int) -> None:
+        self.vertices_num = vertices_num
+        self._scratch = _ScratchPool(vertices_num)
+        # vizinhos de v: neighbors[offsets[v]:offsets[v + 1]]
+        self.offsets = np.zeros(vertices_num + 1, dtype=np.int32)
+        self.neighbors = np.zeros(0, dtype=np.int32)
+
+        # Arestas inseridas desde a última compactação
+        self._pending_src = array("i")
+        self._pending_dest = array("i")
+
+    def insert_relation(self, src: int, dest: int):
+        self._pending_src.append(src)
+        self._pending_dest.append(dest)
+
+    def insert_relations(self, src: np.ndarray, dest: np.ndarray):
+        self._pending_src.frombytes(src.astype(np.int32).tobytes())
+        self._pending_dest.frombytes(dest.astype(np.int32).tobytes())
+
+    def _compact(self):
+        if len(self._pending_src) == 0:
+            return
+
+        vertices_num = self.vertices_num
+        pending_src = np.frombuffer(self._pending_src, dtype=np.int32)
+        pending_dest = np.frombuffer(self._pending_dest, dtype=np.int32)
+
+        src = np.concatenate(
+            (np.repeat(np.arange(vertices_num, dtype=np.int32), np.diff(self.offsets)), pending_src, pending_dest)
+        )
+        dest = np.concatenate((self.neighbors, pending_dest, pending_src))
+
+        # Ordena por (origem, destino) e remove arestas repetidas
+        keys = np.unique(src.astype(np.int64) * vertices_num + dest)
+        src = keys // vertices_num
+
+        self.neighbors = (keys % vertices_num).astype(np.int32)
+        self.offsets = np.zeros(vertices_num + 1, dtype=np.int32)
+        np.cumsum(np.bincount(src, minlength=vertices_num), out=self.offsets[1:])
+
+        self._pending_src = array("i")
+        self._pending_dest = array("i")
+
+    def set_arrays(self, offsets: np.ndarray, neighbors: np.ndarray):
+        self.offsets = offsets
+        self.neighbors = neighbors
+
+        self._pending_src = array("i")
+        self._pending_dest = array("i")
+
+    def csr_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        self._compact()
+        return self.offsets, self.neighbors
+
+    def _adjacent(self, vertex: int) -> List[int]:
+        return self.neighbors[self.offsets[vertex] : self.offsets[vertex + 1]].tolist()
+
+    def get_graph_degrees(self) -> np.ndarray:
+        self._compact()
+        return np.diff(self.offsets)
+
+    def iter_breadth_first_search(
+        self, origin: int, max_level: Optional[int] = None, stats: Optional[GraphStats] = None
+    ) -> Iterator[Tuple[int, int, int]]:
+        self._compact()
+        return _iter_breadth_first_search(self._adjacent, self._scratch, origin, max_level, stats)
+
+    def iter_depth_first_search(
+        self, origin: int, max_level: Optional[int] = None, stats: Optional[GraphStats] = None
+    ) -> Iterator[Tuple[int, int, int]]:
+        self._compact()
+        return _iter_depth_first_search(self._adjacent, self._scratch, origin, max_level, stats)
+
+    def breadth_first_search(self, origin: int, stats: Optional[GraphStats] = None) -> Dict[int, Tuple[int, int]]:
+        # {current: (parent, level)}
+        vertices = self.iter_breadth_first_search(origin, stats=stats)
+        return {current: (parent, level) for current, parent, level in vertices}
 
-            connected_components.append(local_component)
+    def depth_first_search(self, origin: int, stats: Optional[GraphStats] = None) -> Dict[int, Tuple[int, int]]:
+        # {current: (parent, level)}
+        vertices = self.iter_depth_first_search(origin, stats=stats)
+        return {current: (parent, level) for current, parent, level in vertices}
 
-        return connected_components
+    def find_connected_components(self, stats: Optional[GraphStats] = None) -> List[Set[int]]:
+        self._compact()
+        return _connected_components(self._adjacent, self._scratch, self.vertices_num, stats)
 
 
 if __name__ == "__main__":
@@ -2,7 +2,7 @@
 
 import sys
 from typing import Optional
-from graph import Graph, Edge
+from graph import Graph
 from os import path
 
 
@@ -22,31 +22,22 @@ if __name__ == "__main__":
     if text_arg is None:
         exit(0)
 
-    with open(text_arg) as text_file:
-        vertices_num = int(text_file.readline())
-        edges = text_file.readlines()
-        edges = [Edge(*edge.strip().split()) for edge in edges]
+    g_matrix = Graph.from_edge_file(text_arg, "matriz")
+    g_list = Graph.from_edge_file(text_arg, "lista")
 
-        g_matrix = Graph("matriz", vertices_num)
-        g_list = Graph("lista", vertices_num)
+    out_path = path.join("..", "out")
 
-        for edge in edges:
-            g_matrix.insert_relation(edge)
-            g_list.insert_relation(edge)
+    g_matrix.out_graph(out_path)
+    g_list.out_graph(out_path)
 
-        out_path = path.join("..", "out")
+    g_matrix.breadth_first_search("1", out_path)
+    g_list.breadth_first_search("1", out_path)
 
-        g_matrix.out_graph(out_path)
-        g_list.out_graph(out_path)
+    g_list.depth_first_search("1", out_path)
+    g_matrix.depth_first_search("1", out_path)
 
-        g_matrix.breadth_first_search("1", out_path)
-        g_list.breadth_first_search("1", out_path)
+    print("Matriz: ")
+    print(g_matrix.find_connected_components())
 
-        g_list.depth_first_search("1", out_path)
-        g_matrix.depth_first_search("1", out_path)
-
-        print("Matriz: ")
-        print(g_matrix.find_connected_components())
-
-        print("Lista: ")
-        print(g_list.find_connected_components())
+    print("Lista: ")
+    print(g_list.find_connected_components())
@@ -5,7 +5,7 @@
 #    3.1 Quantidade de componentes conexos
 #    3.2 Maior e menor componente conexo
 
-from graph import Graph, Edge
+from graph import Graph
 from time import time
 from os import makedirs, path
 
@@ -20,36 +20,27 @@ if __name__ == "__main__":
     ]
 
     for i, input_path in enumerate(input_paths):
-        with open(input_path, "r") as input_file:
-            vertices_num = int(input_file.readline())
-            edges = input_file.readlines()
-            edges = [Edge(*edge.strip().split()) for edge in edges]
-
-            g_list = Graph("lista", vertices_num, weighted=True)
-            g_matrix = Graph("matriz", vertices_num, weighted=True)
-
-            for edge in edges:
-                g_list.insert_relation(edge)
-                g_matrix.insert_relation(edge)
-
-            src = "1"
-            for dest in ["10", "100", "1000", "10000"]:
-                for g, g_type in [(g_list, "list"), (g_matrix, "matrix")]:
-                    start = time()
-                    minimum_path = g.find_minimum_path(src, dest)
-                    finish = time()
-
-                    print(f"{g_type} - grafo_{i+1} - {src}_to_{dest}: {(finish - start):.2e}")
-                    # print(minimum_path)
-                    if minimum_path:
-                        path_str = (
-                            "Complete path:\n"
-                            + " -> ".join([f"{step[0]} ({step[1]:.2f})" for step in minimum_path])
-                            + "\n"
-                        )
-                        path_str += f"Destination = {minimum_path[-1][0]} | Total distance = {minimum_path[-1][1]}\n"
-
-                        path_file = path.join(path.curdir, "..", "out", f"{g_type}", f"grafo_{i+1}")
-                        makedirs(path_file, exist_ok=True)
-                        with open(path.join(path_file, f"{src}_to_{dest}.txt"), "w") as out_file:
-                            out_file.write(path_str)
+        g_list = Graph.from_edge_file(input_path, "lista", weighted=True)
+        g_matrix = Graph.from_edge_file(input_path, "matriz", weighted=True)
+
+        src = "1"
+        for dest in ["10", "100", "1000", "10000"]:
+            for g, g_type in [(g_list, "list"), (g_matrix, "matrix")]:
+                start = time()
+                minimum_path = g.find_minimum_path(src, dest)
+                finish = time()
+
+                print(f"{g_type} - grafo_{i+1} - {src}_to_{dest}: {(finish - start):.2e}")
+                # print(minimum_path)
+                if minimum_path:
+                    path_str = (
+                        "Complete path:\n"
+                        + " -> ".join([f"{step[0]} ({step[1]:.2f})" for step in minimum_path])
+                        + "\n"
+                    )
+                    path_str += f"Destination = {minimum_path[-1][0]} | Total distance = {minimum_path[-1][1]}\n"
+
+                    path_file = path.join(path.curdir, "..", "out", f"{g_type}", f"grafo_{i+1}")
+                    makedirs(path_file, exist_ok=True)
+                    with open(path.join(path_file, f"{src}_to_{dest}.txt"), "w") as out_file:
+                        out_file.write(path_str)
@@ -1,10 +1,25 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 from os import path
-from typing import Dict, List, Literal, Optional, Set, Tuple, Deque, Union
+from itertools import repeat
+import hashlib
+import os
+import struct
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from typing import Callable, Dict, Iterable, Iterator, List, Literal, NamedTuple, Optional, Set, Tuple, Deque, Union
 import numpy as np
 import math as m
-from collections import defaultdict, deque
+from collections import OrderedDict, deque
 from scipy import sparse as sps
+from scipy.sparse import csgraph
 import heapq
+import operator
+from bisect import insort
 
 
 class Edge:
@@ -14,18 +29,165 @@ class Edge:
         self.weight = float(weight)
 
 
+class SearchTree(NamedTuple):
+    # Índices internos (0-based); -1 indica raiz ou vértice não alcançado
+    order: np.ndarray
+    parents: np.ndarray
+    levels: np.ndarray
+
+
+class ShortestPaths(NamedTuple):
+    # Índices internos (0-based); -1 indica origem ou vértice não alcançado
+    parents: np.ndarray
+    distances: np.ndarray
+
+
+class DegreeDistribution(NamedTuple):
+    max_degree: int
+    min_degree: int
+    mean_degree: float
+    # histogram[d] = quantidade de vértices com grau d
+    histogram: np.ndarray
+    # log_histogram[i] = quantidade de vértices com grau em [log_bins[i], log_bins[i + 1])
+    log_bins: np.ndarray
+    log_histogram: np.ndarray
+
+
+class MemoryPeak:
+    # Pico de memória alocada (tracemalloc) dentro do bloco with, em bytes acima do que já estava alocado na entrada
+    def __enter__(self) -> "MemoryPeak":
+        self._started = not tracemalloc.is_tracing()
+        if self._started:
+            tracemalloc.start()
+
+        tracemalloc.reset_peak()
+        self._start, _ = tracemalloc.get_traced_memory()
+        self.peak = 0
+        self.allocated = 0
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        current, peak = tracemalloc.get_traced_memory()
+        self.peak = peak - self._start
+        # O que continuou alocado depois do bloco, por exemplo o grafo construído
+        self.allocated = current - self._start
+
+        if self._started:
+            tracemalloc.stop()
+
+
+class GraphStats:
+    # Contadores e tempos de uma operação do grafo, preenchidos só com a instrumentação ligada (Graph.instrument)
+    def __init__(self, operation: str) -> None:
+        self.operation = operation
+        self.vertices_settled = 0
+        self.edges_scanned = 0
+        self.heap_pushes = 0
+        # Entradas retiradas do heap cujo vértice já estava fechado
+        self.stale_pops = 0
+        # Segundos por fase: load, freeze, traversal, path e output (mais negative_cycle, com pesos negativos)
+        self.phases: Dict[str, float] = {}
+        self.total = 0.0
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "operation": self.operation,
+            "vertices_settled": self.vertices_settled,
+            "edges_scanned": self.edges_scanned,
+            "heap_pushes": self.heap_pushes,
+            "stale_pops": self.stale_pops,
+            "phases": dict(self.phases),
+            "total": self.total,
+        }
+
+    def __repr__(self) -> str:
+        return f"GraphStats({self.as_dict()})"
+
+
+def _instrumented(operation: str) -> Callable:
+    # Desligada, a instrumentação custa só um teste de atributo por chamada
+    def decorator(method: Callable) -> Callable:
+        @wraps(method)
+        def wrapper(self: "Graph", *args, **kwargs):
+            # Chamadas aninhadas (ex.: o Dijkstra dentro do caminho mínimo) somam na operação externa
+            if not self._instrumented or self._active_stats is not None:
+                return method(self, *args, **kwargs)
+
+            stats = GraphStats(operation)
+            self._active_stats = stats
+            start = time.perf_counter()
+            try:
+                with stats.phase("freeze"):
+                    self.freeze()
+                return method(self, *args, **kwargs)
+            finally:
+                stats.total = time.perf_counter() - start
+                self._active_stats = None
+                self.stats = stats
+                if self._stats_callback is not None:
+                    self._stats_callback(stats)
+
+        return wrapper
+
+    return decorator
+
+
 class Graph:
-    def __init__(self, graph_type: Literal["matriz", "lista"], vertices_num: int, weighted: bool) -> None:
+    def __init__(
+        self,
+        graph_type: Literal["matriz", "lista", "csr"],
+        vertices_num: int,
+        weighted: bool,
+        path_cache_size: int = 16,
+    ) -> None:
         self.graph_type = graph_type
         self.vertices_num = vertices_num
         self.weighted = weighted
 
+        # Árvores de caminhos mínimos já calculadas, {(origem, algoritmo): ShortestPaths}, em ordem de uso (LRU)
+        self.path_cache_size = path_cache_size
+        self._path_cache: "OrderedDict[Tuple[int, str], ShortestPaths]" = OrderedDict()
+        # Origens que já tiveram uma consulta ponto a ponto sem cache; a próxima falta calcula a árvore toda
+        self._path_misses: "OrderedDict[Tuple[int, str], None]" = OrderedDict()
+
+        # Rótulos só existem na entrada e na saída; os algoritmos usam índices 0-based
+        self.labels: List[str] = [str(v + 1) for v in range(vertices_num)]
+        self.vertices: Dict[str, int] = {label: v for v, label in enumerate(self.labels)}
+
+        # Componentes conexos mantidos a cada inserção, para consultas sem percorrer o grafo
+        self._components = _UnionFind(vertices_num)
+
+        # Faixa dos pesos já inseridos, para escolher o algoritmo de caminho mínimo sem varrer as arestas
+        self._min_weight = np.inf
+        self._max_weight = -np.inf
+        self._integer_weights = True
+        # Pesos inteiros pequenos usam a fila de baldes (Dial) em vez do heap binário
+        self.bucket_queue = True
+        # Com pesos negativos: {raiz do componente: há ciclo negativo}, decidido por um Bellman-Ford por componente
+        self._negative_cycles: Dict[int, bool] = {}
+
+        # Contadores da última operação instrumentada; desligado por padrão
+        self.stats: Optional[GraphStats] = None
+        self._instrumented = False
+        self._stats_callback: Optional[Callable[[GraphStats], None]] = None
+        self._active_stats: Optional[GraphStats] = None
+
         if self.graph_type == "matriz":
             self.__instance = _GraphMatrix(self.vertices_num, self.weighted)
             self.graph_type = "matrix"
         elif self.graph_type == "lista":
             self.__instance = _GraphList(self.vertices_num)
             self.graph_type = "list"
+        elif self.graph_type == "csr":
+            self.__instance = _GraphCSR(self.vertices_num, self.weighted)
         else:
             raise ValueError("Tipo de grafo inválido!")
 
@@ -35,434 +197,2087 @@ class Graph:
         if (not self.weighted) and (edge.weight is not np.nan):
             raise ValueError("Grafo não aceita pesos")
 
-        self.__instance.insert_relation(edge)
+        src, dest = self.vertices[edge.src], self.vertices[edge.dest]
+        self.__instance.insert_relation(src, dest, edge.weight)
+        self._components.union(src, dest)
+        if self.weighted:
+            self._track_weights(np.array([edge.weight]))
+        self._path_cache.clear()
+        self._path_misses.clear()
+        self._negative_cycles.clear()
+
+    def insert_relations(self, src: np.ndarray, dest: np.ndarray, weights: Optional[np.ndarray] = None) -> None:
+        # src e dest são índices internos (0-based), não rótulos
+        if self.weighted and weights is None:
+            raise ValueError("Peso inexistente")
+        if (not self.weighted) and weights is not None:
+            raise ValueError("Grafo não aceita pesos")
+
+        src = np.asarray(src, dtype=np.int32)
+        dest = np.asarray(dest, dtype=np.int32)
+        if src.shape != dest.shape or (weights is not None and np.shape(weights) != src.shape):
+            raise ValueError("Arrays de arestas com tamanhos diferentes")
+        if len(src) != 0 and (min(src.min(), dest.min()) < 0 or max(src.max(), dest.max()) >= self.vertices_num):
+            raise ValueError("Vértice não pertence ao grafo")
+
+        weights = None if weights is None else np.asarray(weights, dtype=np.float64)
+        self.__instance.insert_relations(src, dest, weights)
+        self._components.union_all(src, dest)
+        if weights is not None:
+            self._track_weights(weights)
+        self._path_cache.clear()
+        self._path_misses.clear()
+        self._negative_cycles.clear()
+
+    def _track_weights(self, weights: np.ndarray) -> None:
+        # Conservador: um peso sobrescrito continua contando, o que no máximo evita o algoritmo mais rápido
+        if len(weights) == 0:
+            return
+        self._min_weight = min(self._min_weight, float(weights.min()))
+        self._max_weight = max(self._max_weight, float(weights.max()))
+        self._integer_weights = self._integer_weights and bool(np.all(np.mod(weights, 1) == 0))
+
+    def _check_negative_cycle(self, origin_id: int) -> None:
+        # Dijkstra e derivados só valem sem ciclo negativo alcançável. Um Bellman-Ford decide isso uma vez por
+        # componente; as consultas seguintes no mesmo componente voltam direto para o Dijkstra
+        if self._min_weight >= 0:
+            return
+
+        root = self._components.find(origin_id)
+        if root not in self._negative_cycles:
+            with self._phase("negative_cycle"):
+                shortest_paths = _bellman_ford(*self.__instance.edge_arrays(), origin_id, self._active_stats)
+            self._negative_cycles[root] = shortest_paths is None
+
+        if self._negative_cycles[root]:
+            # Num grafo não direcionado basta uma aresta negativa: ir e voltar por ela já é um ciclo negativo
+            raise ValueError("Há um ciclo negativo alcançável a partir da origem: caminho mínimo indefinido!")
+
+    def _bucket_bound(self) -> Optional[int]:
+        # Maior peso quando todos são inteiros em [0, DIAL_MAX_WEIGHT]; None se o Dial não se aplica
+        if not self.bucket_queue or not self._integer_weights:
+            return None
+        if self._min_weight < 0 or self._max_weight > DIAL_MAX_WEIGHT:
+            return None
+        return int(max(self._max_weight, 0))
+
+    @classmethod
+    def from_edge_file(
+        cls,
+        file_path: str,
+        graph_type: Literal["matriz", "lista", "csr"],
+        weighted: bool = False,
+        cache: bool = True,
+        instrument: bool = False,
+    ) -> "Graph":
+        if not instrument:
+            return cls._from_edge_file(file_path, graph_type, weighted, cache)
+
+        # Já devolve o grafo instrumentado, com os tempos da carga em graph.stats
+        stats = GraphStats("load")
+        start = time.perf_counter()
+        with stats.phase("load"):
+            graph = cls._from_edge_file(file_path, graph_type, weighted, cache)
+        with stats.phase("freeze"):
+            graph.freeze()
+        stats.total = time.perf_counter() - start
+
+        graph.instrument()
+        graph.stats = stats
+        return graph
+
+    @classmethod
+    def _from_edge_file(
+        cls, file_path: str, graph_type: Literal["matriz", "lista", "csr"], weighted: bool, cache: bool
+    ) -> "Graph":
+        # O cache binário fica ao lado do arquivo texto e só é usado se a fonte não mudou. Um por representação:
+        # cada uma resolve arestas repetidas do seu jeito (a lista guarda paralelas, a matriz descarta peso 0)
+        cache_path = f"{file_path}.{graph_type}{CACHE_SUFFIX}"
+        if cache and _check_graph_cache(cache_path, file_path, weighted):
+            return cls.load(cache_path, graph_type)
+
+        source_key = _source_key(file_path) if cache else None
+        vertices_num, src, dest, weights = _read_edge_file(file_path, weighted)
+
+        graph = cls(graph_type, vertices_num, weighted)
+        graph.insert_relations(src, dest, weights)
+
+        if cache:
+            try:
+                graph.save(cache_path, source_key)
+            except OSError:
+                pass
+
+        return graph
+
+    def freeze(self) -> None:
+        # Consolida as inserções pendentes; as consultas também fazem isso automaticamente
+        self.__instance.freeze()
+
+    def instrument(self, enabled: bool = True, callback: Optional[Callable[[GraphStats], None]] = None) -> None:
+        # Cada operação instrumentada deixa seus contadores em self.stats e os repassa ao callback
+        self._instrumented = enabled
+        self._stats_callback = callback if enabled else None
+
+    def _phase(self, name: str):
+        if self._active_stats is None:
+            return nullcontext()
+        return self._active_stats.phase(name)
+
+    def save(self, file_path: str, source_key: Optional[Tuple[int, int, bytes]] = None) -> None:
+        offsets, neighbors, weights = self.__instance.csr_arrays()
+        _write_graph_cache(
+            file_path, self.vertices_num, offsets, neighbors, weights if self.weighted else None, source_key
+        )
+
+    @classmethod
+    def load(cls, file_path: str, graph_type: Literal["matriz", "lista", "csr"]) -> "Graph":
+        vertices_num, offsets, neighbors, weights = _map_graph_cache(file_path)
+
+        graph = cls(graph_type, vertices_num, weights is not None)
+        src = np.repeat(np.arange(vertices_num, dtype=np.int32), np.diff(offsets))
+        upper = src <= neighbors
+        if isinstance(graph.__instance, _GraphCSR):
+            # Usa os arrays mapeados diretamente: nada é copiado para a memória do processo
+            graph.__instance.set_arrays(offsets, neighbors, weights)
+            graph._components.union_all(src[upper], neighbors[upper])
+            if weights is not None:
+                graph._track_weights(weights)
+        else:
+            graph.insert_relations(src[upper], neighbors[upper], None if weights is None else weights[upper])
+
+        return graph
+
+    def get_graph_degrees(self, raw: bool = False) -> Union[Dict[str, int], np.ndarray]:
+        degrees = self.__instance.get_graph_degrees()
+        if raw:
+            return degrees
+
+        return dict(zip(self.labels, degrees.tolist()))
+
+    def degree_distribution(self) -> DegreeDistribution:
+        degrees = self.__instance.get_graph_degrees()
+        if len(degrees) == 0:
+            empty = np.zeros(1, dtype=np.int64)
+            return DegreeDistribution(0, 0, 0.0, empty, np.array([0, 1]), empty)
+
+        max_degree = int(degrees.max())
+        # Faixas [0, 1), [1, 2), [2, 4), [4, 8), ... até cobrir o maior grau
+        log_bins = np.concatenate(([0], 2 ** np.arange(m.ceil(m.log2(max_degree + 1)) + 1)))
+        log_histogram, _ = np.histogram(degrees, bins=log_bins)
+
+        return DegreeDistribution(
+            max_degree, int(degrees.min()), float(degrees.mean()), np.bincount(degrees), log_bins, log_histogram
+        )
+
+    def memory_usage(self) -> Dict[str, int]:
+        # Bytes de cada estrutura interna com o conteúdo dos contêineres; a representação usa os nomes dos atributos
+        seen: Set[int] = set()
+        usage = {
+            "vertex_maps": _deep_sizeof(self.labels, seen) + _deep_sizeof(self.vertices, seen),
+            "components": _deep_sizeof(self._components, seen),
+        }
+        usage["path_cache"] = _deep_sizeof(self._path_cache, seen)
+        for name, value in vars(self.__instance).items():
+            usage[name.lstrip("_")] = _deep_sizeof(value, seen)
 
-    def get_graph_degrees(self) -> Dict[str, int]:
-        return self.__instance.get_graph_degrees()
+        usage["total"] = sum(usage.values())
+        return usage
 
     def out_graph(self, out_path: str) -> None:
-        self.__instance.out_graph(out_path)
+        degrees = self.__instance.get_graph_degrees()
 
-    def breadth_first_search(self, origin: str, out_path: Optional[str] = None):
-        vertices = self.__instance.breadth_first_search(origin)
+        with open(path.join(out_path, f"graph_{self.graph_type}_out.txt"), "w") as file:
+            file.write(f"# n = {self.vertices_num}\n")
+            file.write(f"# m = {int(degrees.sum() / 2)}\n")
+            for label, degree in zip(self.labels, degrees.tolist()):
+                file.write(f"{label} {degree}\n")
 
-        if vertices is None:
+    @_instrumented("bfs")
+    def breadth_first_search(
+        self, origin: str, out_path: Optional[str] = None, raw: bool = False, level_sync: bool = False
+    ):
+        if origin not in self.vertices:
             raise ValueError(f"O argumento origem: {origin} não pertence ao grafo!")
 
-        if out_path is not None:
-            self._search_out_graph(vertices, "largura", out_path)
+        if level_sync:
+            # Expande cada nível inteiro de uma vez com operações vetorizadas
+            if self.graph_type != "matrix":
+                raise ValueError("A busca em largura por níveis só está disponível para a matriz!")
+            with self._phase("traversal"):
+                vertices = self.__instance.breadth_first_search(
+                    self.vertices[origin], level_sync=True, stats=self._active_stats
+                )
+        else:
+            with self._phase("traversal"):
+                vertices = self.__instance.breadth_first_search(self.vertices[origin], stats=self._active_stats)
 
-    def depth_first_search(self, origin: str, out_path: Optional[str] = None):
-        vertices = self.__instance.depth_first_search(origin)
+        if raw:
+            with self._phase("path"):
+                return self._search_tree(vertices)
 
-        if vertices is None:
+        if out_path is not None:
+            with self._phase("output"):
+                self._search_out_graph(vertices, "largura", out_path)
+
+    @_instrumented("dfs")
+    def depth_first_search(self, origin: str, out_path: Optional[str] = None, raw: bool = False):
+        if origin not in self.vertices:
             raise ValueError(f"O argumento origem: {origin} não pertence ao grafo!")
 
+        with self._phase("traversal"):
+            vertices = self.__instance.depth_first_search(self.vertices[origin], stats=self._active_stats)
+
+        if raw:
+            with self._phase("path"):
+                return self._search_tree(vertices)
+
         if out_path is not None:
-            self._search_out_graph(vertices, "profundidade", out_path)
+            with self._phase("output"):
+                self._search_out_graph(vertices, "profundidade", out_path)
 
-    def find_minimum_path(self, origin: str, end: str) -> Optional[Union[List[str], List[Tuple[str, float]]]]:
-        if self.weighted:  # dijkstra
-            # Dijkstra feito com Heap Binária
+    def iter_bfs(self, origin: str, max_level: Optional[int] = None) -> Iterator[Tuple[str, str, int]]:
+        # (vértice, pai, nível) sob demanda; a raiz tem pai ""
+        if origin not in self.vertices:
+            raise ValueError(f"O argumento origem: {origin} não pertence ao grafo!")
 
-            if not self.__instance._check_all_positive():
-                print(
-                    "WARNING: Há pesos negativos no grafo, ou seja, o algorítmo de dijkstra pode não achar uma solução ótima ou até mesmo entrar em um ciclo infinito"
-                )
+        vertices = self.__instance.iter_breadth_first_search(self.vertices[origin], max_level)
+        return self._iter_labels(vertices)
+
+    def iter_dfs(self, origin: str, max_level: Optional[int] = None) -> Iterator[Tuple[str, str, int]]:
+        if origin not in self.vertices:
+            raise ValueError(f"O argumento origem: {origin} não pertence ao grafo!")
+
+        vertices = self.__instance.iter_depth_first_search(self.vertices[origin], max_level)
+        return self._iter_labels(vertices)
+
+    def _iter_labels(self, vertices: Iterator[Tuple[int, int, int]]) -> Iterator[Tuple[str, str, int]]:
+        for vertex, parent, level in vertices:
+            yield self.labels[vertex], "" if parent == -1 else self.labels[parent], level
+
+    @_instrumented("minimum_path")
+    def find_minimum_path(
+        self,
+        origin: str,
+        end: str,
+        algorithm: Literal["dijkstra", "bidirecional", "a_estrela", "delta_stepping"] = "dijkstra",
+        heuristic: Optional[Callable[[str, str], float]] = None,
+    ) -> Optional[Union[List[str], List[Tuple[str, float]]]]:
+        if algorithm not in ("dijkstra", "bidirecional", "a_estrela", "delta_stepping"):
+            raise ValueError("Algoritmo de caminho mínimo inválido!")
+        if algorithm == "a_estrela" and heuristic is None:
+            raise ValueError("O A* precisa de uma heurística!")
+
+        if origin not in self.vertices:
+            raise ValueError(f"O argumento origem: {origin} não pertence ao grafo!")
+        if end not in self.vertices or not self.same_component(origin, end):
+            # O union-find responde sem rodar nenhuma busca
+            print("O vértice de destino não se encontra no mesmo componente do vértice de origem")
+            return None
+
+        origin_id, end_id = self.vertices[origin], self.vertices[end]
 
-            vertices = self.__instance.dijkstra(origin)
-            if end not in vertices:
+        if self.weighted:  # dijkstra
+            # Dijkstra feito com Heap Binária, ou com baldes (Dial) quando os pesos são inteiros pequenos
+            self._check_negative_cycle(origin_id)
+
+            if algorithm == "bidirecional":
+                with self._phase("traversal"):
+                    weighted_path = self.__instance.bidirectional_dijkstra(origin_id, end_id, self._active_stats)
+                if weighted_path is None:
+                    print("O vértice de destino não se encontra no mesmo componente do vértice de origem")
+                    return None
+
+                # [(edge, acc_weight), ...]
+                with self._phase("path"):
+                    return [(self.labels[vertex], weight) for vertex, weight in weighted_path]
+
+            if algorithm in ("dijkstra", "delta_stepping"):
+                parents, distances = self._shortest_path_tree(origin_id, end_id, algorithm)
+            else:
+                # A heurística recebe (vértice, destino) e deve ser admissível e consistente
+                with self._phase("traversal"):
+                    vertices = self.__instance.dijkstra(
+                        origin_id, end_id, lambda vertex: heuristic(self.labels[vertex], end), self._active_stats
+                    )
+                with self._phase("path"):
+                    parents, distances = self._shortest_paths(vertices)
+
+            if np.isinf(distances[end_id]):
                 print("O vértice de destino não se encontra no mesmo componente do vértice de origem")
                 return None
 
             # [(edge, acc_weight), ...]
-            path: List[Tuple[str, float]] = []
-            next_vertice, accumulated_weight = vertices[end]
-            current = end
-            while current != origin:
-                path.append((current, accumulated_weight))
-                current = next_vertice
-                next_vertice, accumulated_weight = vertices[current]
-
-            path.append((current, accumulated_weight))
+            with self._phase("path"):
+                path: List[Tuple[str, float]] = []
+                current = end_id
+                while current != -1:
+                    path.append((self.labels[current], float(distances[current])))
+                    current = int(parents[current])
 
             return path[::-1]
-        else:  # bfs
-            vertices = self.__instance.breadth_first_search(origin)
+        else:  # bfs bidirecional
+            with self._phase("traversal"):
+                vertices_path = self.__instance.bidirectional_search(origin_id, end_id, self._active_stats)
 
-            if end not in vertices:
+            if vertices_path is None:
                 print("O vértice de destino não se encontra no mesmo componente do vértice de origem")
                 return None
 
             # [edge, edge, ...]
-            path = []
-            next_vertice, _ = vertices[end]
-            current = end
-            while current != origin:
-                path.append(current)
-                current = next_vertice
-                next_vertice, _ = vertices[current]
+            with self._phase("path"):
+                return [self.labels[vertex] for vertex in vertices_path]
+
+    @_instrumented("dijkstra")
+    def _dijkstra(
+        self, origin: str, raw: bool = False, algorithm: Literal["dijkstra", "delta_stepping"] = "dijkstra"
+    ) -> Union[Dict[str, Tuple[str, float]], ShortestPaths]:
+        if algorithm not in ("dijkstra", "delta_stepping"):
+            raise ValueError("Algoritmo de caminho mínimo inválido!")
+        if origin not in self.vertices:
+            raise ValueError(f"O argumento origem: {origin} não pertence ao grafo!")
 
-            path.append(current)
+        shortest_paths = self._shortest_path_tree(self.vertices[origin], algorithm=algorithm)
 
-            return path[::-1]
+        if raw:
+            return shortest_paths
+
+        parents, distances = shortest_paths
+        with self._phase("path"):
+            reached = np.flatnonzero(~np.isinf(distances))
+            return {
+                self.labels[vertex]: ("" if parent == -1 else self.labels[parent], weight)
+                for vertex, parent, weight in zip(
+                    reached.tolist(), parents[reached].tolist(), distances[reached].tolist()
+                )
+            }
+
+    def _shortest_path_tree(
+        self,
+        origin_id: int,
+        end_id: Optional[int] = None,
+        algorithm: Literal["dijkstra", "delta_stepping"] = "dijkstra",
+    ) -> ShortestPaths:
+        # Entre caminhos de mesmo peso os dois algoritmos podem escolher pais diferentes, então o cache os separa
+        key = (origin_id, algorithm)
+        if key in self._path_cache:
+            self._path_cache.move_to_end(key)
+            return self._path_cache[key]
+
+        # Uma consulta ponto a ponto isolada para assim que o destino é fechado e não entra no cache, pois a árvore
+        # parcial só vale até o destino. A segunda falta da mesma origem calcula e guarda a árvore toda
+        cached = self.path_cache_size > 0 and (end_id is None or key in self._path_misses)
+        if cached:
+            self._path_misses.pop(key, None)
+            end_id = None
+        elif self.path_cache_size > 0:
+            self._path_misses[key] = None
+            self._path_misses.move_to_end(key)
+            if len(self._path_misses) > self.path_cache_size:
+                self._path_misses.popitem(last=False)
+
+        self._check_negative_cycle(origin_id)
+        if algorithm == "delta_stepping":
+            # Relaxa as arestas de cada balde em lotes vetorizados e já devolve os arrays
+            with self._phase("traversal"):
+                parents, distances = _delta_stepping(
+                    *self.__instance.edge_arrays(), origin_id, end_id, stats=self._active_stats
+                )
+            shortest_paths = _read_only_paths(parents, distances)
+        else:
+            with self._phase("traversal"):
+                vertices = self.__instance.dijkstra(
+                    origin_id, end_id, stats=self._active_stats, max_weight=self._bucket_bound()
+                )
+            with self._phase("path"):
+                shortest_paths = self._shortest_paths(vertices)
+        if not cached:
+            return shortest_paths
 
-    def _dijkstra(self, origin: str) -> List[Tuple[str, float]]:
-        return self.__instance.dijkstra(origin)
+        self._path_cache[key] = shortest_paths
+        if len(self._path_cache) > self.path_cache_size:
+            self._path_cache.popitem(last=False)
+
+        return shortest_paths
+
+    def _shortest_paths(self, vertices: Dict[int, Tuple[int, float]]) -> ShortestPaths:
+        reached = np.fromiter(vertices.keys(), dtype=np.int32, count=len(vertices))
+        parents = np.full(self.vertices_num, -1, dtype=np.int32)
+        distances = np.full(self.vertices_num, np.inf, dtype=np.float64)
+
+        parents[reached] = np.fromiter((p for p, _ in vertices.values()), dtype=np.int32, count=len(reached))
+        distances[reached] = np.fromiter((d for _, d in vertices.values()), dtype=np.float64, count=len(reached))
+
+        return _read_only_paths(parents, distances)
+
+    @_instrumented("all_pairs")
+    def all_pairs_distances(
+        self,
+        method: Optional[Literal["floyd_warshall", "dijkstra"]] = None,
+        workers: Optional[int] = None,
+        max_bytes: float = 2**31,
+    ) -> np.ndarray:
+        # distances[u, v] entre índices internos; -1 (tipos inteiros) ou inf (float32) quando v não é alcançável.
+        # Sem method, grafos densos usam o Floyd-Warshall e os esparsos um Dijkstra (BFS sem pesos) por origem
+        method, matrix, dtype, memory = self._all_pairs_plan(method, workers)
+        if memory > max_bytes:
+            raise ValueError(
+                f"As distâncias entre todos os pares precisam de {memory / 2**20:.0f} MiB, "
+                f"acima do limite de {max_bytes / 2**20:.0f} MiB!"
+            )
+
+        with self._phase("traversal"):
+            if method == "floyd_warshall":
+                distances = _floyd_warshall(matrix, not self.weighted, dtype)
+            else:
+                distances = _parallel_all_pairs(matrix, not self.weighted, dtype, workers)
+        if self._active_stats is not None:
+            self._active_stats.vertices_settled += self.vertices_num
+
+        return distances
+
+    def all_pairs_memory(
+        self, method: Optional[Literal["floyd_warshall", "dijkstra"]] = None, workers: Optional[int] = None
+    ) -> int:
+        # Estimativa em bytes do que all_pairs_distances aloca, para decidir antes de rodar
+        return self._all_pairs_plan(method, workers)[3]
+
+    def _all_pairs_plan(
+        self, method: Optional[str], workers: Optional[int]
+    ) -> Tuple[str, sps.csr_matrix, np.dtype, int]:
+        if method not in (None, "floyd_warshall", "dijkstra"):
+            raise ValueError("Método de caminhos mínimos entre todos os pares inválido!")
+
+        if self.weighted:
+            offsets, neighbors, weights = self.__instance.edge_arrays()
+            # Num grafo não direcionado toda aresta negativa já é um ciclo negativo (ver _check_negative_cycle)
+            if self._min_weight < 0 and (weights < 0).any():
+                raise ValueError("Há um ciclo negativo no grafo: caminhos mínimos entre todos os pares indefinidos!")
+        else:
+            offsets, neighbors, _ = self.__instance.csr_arrays()
+            weights = np.ones(len(neighbors), dtype=np.float64)
+
+        vertices_num = self.vertices_num
+        matrix = sps.csr_matrix((weights, neighbors, offsets), shape=(vertices_num, vertices_num))
+        if method is None:
+            dense = matrix.nnz >= FLOYD_WARSHALL_DENSITY * vertices_num**2
+            method = "floyd_warshall" if dense else "dijkstra"
+
+        integer = not self.weighted or self._integer_weights
+        dtype = _distances_dtype(matrix, not self.weighted) if integer else np.dtype(np.float32)
+
+        memory = vertices_num**2 * dtype.itemsize
+        if method == "floyd_warshall":
+            memory += vertices_num**2 * _floyd_warshall_dtype(dtype).itemsize
+        else:
+            workers = (os.cpu_count() or 1) if workers is None else workers
+            memory += _all_pairs_chunk(vertices_num) * vertices_num * 8 * max(workers, 1)
 
-    def find_connected_components(self) -> List[Set[str]]:
-        return self.__instance.find_connected_components()
+        return method, matrix, dtype, memory
+
+    @_instrumented("components")
+    def find_connected_components(self, raw: bool = False) -> Union[List[Set[str]], np.ndarray]:
+        if raw and isinstance(self.__instance, _GraphMatrix):
+            # A matriz rotula todos os vértices de uma vez, sem montar os conjuntos
+            with self._phase("traversal"):
+                return self.__instance.component_labels(self._active_stats)
+
+        with self._phase("traversal"):
+            connected_components = self.__instance.find_connected_components(self._active_stats)
+
+        with self._phase("output"):
+            if raw:
+                # component_labels[v] = índice do componente de v
+                component_labels = np.empty(self.vertices_num, dtype=np.int32)
+                for idx, component in enumerate(connected_components):
+                    component_labels[np.fromiter(component, dtype=np.int32, count=len(component))] = idx
+                return component_labels
+
+            return [{self.labels[vertex] for vertex in component} for component in connected_components]
+
+    def connected_components_count(self) -> int:
+        return self._components.count
+
+    def connected_component_size(self, vertex: str) -> int:
+        if vertex not in self.vertices:
+            raise ValueError(f"O vértice: {vertex} não pertence ao grafo!")
+
+        return int(self._components.sizes[self._components.find(self.vertices[vertex])])
+
+    def same_component(self, src: str, dest: str) -> bool:
+        for vertex in (src, dest):
+            if vertex not in self.vertices:
+                raise ValueError(f"O vértice: {vertex} não pertence ao grafo!")
+
+        return self._components.find(self.vertices[src]) == self._components.find(self.vertices[dest])
+
+    def _search_tree(self, vertices: Dict[int, Tuple[int, int]]) -> SearchTree:
+        order = np.fromiter(vertices.keys(), dtype=np.int32, count=len(vertices))
+        parents = np.full(self.vertices_num, -1, dtype=np.int32)
+        levels = np.full(self.vertices_num, -1, dtype=np.int32)
+
+        parents[order] = np.fromiter((parent for parent, _ in vertices.values()), dtype=np.int32, count=len(order))
+        levels[order] = np.fromiter((level for _, level in vertices.values()), dtype=np.int32, count=len(order))
+
+        return SearchTree(order, parents, levels)
 
     def _search_out_graph(
         self,
-        vertices: Dict[str, Tuple[str, int]],
+        vertices: Dict[int, Tuple[int, int]],
         search_type: Literal["largura", "profundidade"],
         out_path: str,
     ):
         translate_search_type = {"largura": "breadth", "profundidade": "depth"}
         max_len_number = m.floor(m.log10(self.vertices_num)) + 1
-        max_len_level = m.floor(m.log10(max((values[1] for values in vertices.values())))) + 1
+        max_len_level = m.floor(m.log10(max(max(values[1] for values in vertices.values()), 1))) + 1
 
         with open(
             path.join(out_path, f"graph_{self.graph_type}_{translate_search_type[search_type]}_search_out.txt"), "w"
         ) as file:
             for vertex, (parent, level) in vertices.items():
+                label = self.labels[vertex]
                 line = (
-                    f"{vertex:>{max_len_number}}: {'Raiz':^{max_len_number + 6}} | Nível = {level:>{max_len_level}}\n"
-                    if parent == ""
-                    else f"{vertex:>{max_len_number}}: Pai = {parent:>{max_len_number}} | Nível = {level:>{max_len_level}}\n"
+                    f"{label:>{max_len_number}}: {'Raiz':^{max_len_number + 6}} | Nível = {level:>{max_len_level}}\n"
+                    if parent == -1
+                    else f"{label:>{max_len_number}}: Pai = {self.labels[parent]:>{max_len_number}} | Nível = {level:>{max_len_level}}\n"
                 )
 
                 file.write(line)
 
 
-class _GraphMatrix:
-    def __init__(self, vertices_num: int, weighted: bool) -> None:
-        self.vertices = {str(v + 1): v for v in range(vertices_num)}
-        self.adj_matrix = sps.dok_matrix((vertices_num, vertices_num), dtype=float if weighted else bool)
+def _read_edge_file(file_path: str, weighted: bool) -> Tuple[int, np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    with open(file_path) as file:
+        vertices_num = int(file.readline())
+        # Converte o arquivo inteiro de uma vez, sem criar um objeto por aresta. Sempre em float64, para que um
+        # peso fracionário num grafo sem pesos chegue à checagem de colunas abaixo
+        values = np.loadtxt(file, dtype=np.float64, ndmin=2)
 
-    def insert_relation(self, edge: Edge):
-        if edge.weight is not np.nan:
-            self.adj_matrix[self.vertices[edge.src], self.vertices[edge.dest]] = edge.weight
-            self.adj_matrix[self.vertices[edge.dest], self.vertices[edge.src]] = edge.weight
-        else:
-            self.adj_matrix[self.vertices[edge.src], self.vertices[edge.dest]] = 1
-            self.adj_matrix[self.vertices[edge.dest], self.vertices[edge.src]] = 1
+    if values.size == 0:
+        values = values.reshape(0, 3 if weighted else 2)
+    elif weighted and values.shape[1] != 3:
+        raise ValueError("Peso inexistente")
+    elif (not weighted) and values.shape[1] != 2:
+        raise ValueError("Grafo não aceita pesos")
 
-    def find_minimum_path(
-        self, origin: str, end: str, mode: Union[Literal["bfs"], Literal["dijkstra"]]
-    ) -> Optional[Dict[str, Tuple[str, int]]]:
-        if mode == "dijkstra":
-            return self.dijkstra(origin)
-        else:
-            return self.breadth_first_search(origin, end)
+    # Rótulos "1".."n" -> índices 0..n-1
+    src = values[:, 0].astype(np.int32) - 1
+    dest = values[:, 1].astype(np.int32) - 1
+    weights = values[:, 2].copy() if weighted else None
 
-    def _check_all_positive(self) -> bool:
-        return min(self.adj_matrix.values()) >= 0
+    return vertices_num, src, dest, weights
 
-    def dijkstra(self, origin: str):
-        if origin not in self.vertices:
-            return None
 
-        paths: Dict[str, Tuple[str, float]] = defaultdict(lambda: ("", np.inf))
-        paths[origin] = ("", 0)
+def _merge_undirected(
+    src: np.ndarray, dest: np.ndarray, weights: Optional[np.ndarray], vertices_num: int
+) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    # Arestas não direcionadas em ordem de inserção -> as duas direções de cada uma, ordenadas por origem e destino.
+    # Repetidas são identificadas pelo par (menor, maior), então a última inserção vale para as duas direções,
+    # mesmo quando a aresta volta invertida
+    low = np.minimum(src, dest).astype(np.int64)
+    high = np.maximum(src, dest).astype(np.int64)
+    keys, last = np.unique((low * vertices_num + high)[::-1], return_index=True)
+    low, high = keys // vertices_num, keys % vertices_num
 
-        vertices_queue: List[Tuple[float, str]] = list()
-        visited_vertices: Set[str] = set()
+    # Laços aparecem uma vez só
+    mirrored = low != high
+    all_src = np.concatenate((low, high[mirrored]))
+    all_dest = np.concatenate((high, low[mirrored]))
+    order = np.lexsort((all_dest, all_src))
+    all_src, all_dest = all_src[order].astype(np.int32), all_dest[order].astype(np.int32)
+    if weights is None:
+        return all_src, all_dest, None
 
-        heapq.heappush(vertices_queue, (0, origin))
+    latest = weights[::-1][last]
+    return all_src, all_dest, np.concatenate((latest, latest[mirrored]))[order]
 
-        qtd_vertices = len(self.vertices)
-        while len(visited_vertices) < qtd_vertices:
-            acc_weigth, current = heapq.heappop(vertices_queue)
-            if current in visited_vertices:
-                continue
 
-            for next_vertice, weight in self.adj_matrix[self.vertices[current]].items():
-                next_vertice = str(next_vertice[1] + 1)
-                new_weigth = acc_weigth + weight
-                old_weigth = paths[next_vertice][1]
+def _read_only_paths(parents: np.ndarray, distances: np.ndarray) -> ShortestPaths:
+    # Compartilhados com o cache, então não podem ser alterados por quem os recebe
+    parents.flags.writeable = False
+    distances.flags.writeable = False
 
-                if new_weigth < old_weigth:
-                    paths[next_vertice] = current, new_weigth
-                    heapq.heappush(vertices_queue, (new_weigth, next_vertice))
+    return ShortestPaths(parents, distances)
 
-            visited_vertices.add(current)
 
-        return dict(paths)
+def _deep_sizeof(obj: object, seen: Set[int]) -> int:
+    # Bytes do objeto e de tudo que ele referencia; objetos já vistos (por exemplo os rótulos) contam uma vez
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
 
-    def breadth_first_search(self, origin: str, end: Optional[str] = None) -> Optional[Dict[str, Tuple[str, int]]]:
-        if origin not in self.vertices:
-            return None
-        if end is not None and end not in self.vertices:
-            return None
-
-        # [current, parent, level]
-        vertices_queue: Deque[Tuple[str, str, int]] = deque()
-        # {current: (parent, level)}
-        visited_vertices: Dict[str, Tuple[str, int]] = dict()
-
-        to_be_visited_vertices: Set[str] = set()
-
-        vertices_queue.append((origin, "", 0))
-
-        while len(vertices_queue) > 0:
-            (current, parent, level) = vertices_queue.popleft()
-            to_be_visited_vertices.discard(current)
+    if isinstance(obj, np.ndarray):
+        # Views e arrays mapeados do cache não são donos dos dados, mas o grafo os usa do mesmo jeito
+        return sys.getsizeof(obj) + (0 if obj.flags.owndata else obj.nbytes)
 
-            visited_vertices[current] = (parent, level)
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_sizeof(key, seen) + _deep_sizeof(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(_deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, "__dict__") and not isinstance(obj, type):
+        size += _deep_sizeof(vars(obj), seen)
 
-            for _, idx in self.adj_matrix[self.vertices[current]].keys():
-                vertex = str(idx + 1)
-                if vertex not in visited_vertices and vertex not in to_be_visited_vertices:
-                    vertices_queue.append((vertex, current, level + 1))
-                    to_be_visited_vertices.add(vertex)
+    return size
 
-            if current == end:
-                return visited_vertices
 
-        return visited_vertices
+class _ScratchBuffers:
+    def __init__(self, vertices_num: int) -> None:
+        # marks[v] == stamp: v já foi descoberto na travessia atual
+        self.marks = bytearray(vertices_num)
+        self.parents = array("i", bytes(4 * vertices_num))
+        self.levels = array("i", bytes(4 * vertices_num))
+        self.distances = array("d", bytes(8 * vertices_num))
+        # closed[v] == stamp: caminho mínimo até v já definido
+        self.closed = bytearray(vertices_num)
+        self.stamp = 0
 
-    def depth_first_search(self, origin: str) -> Optional[Dict[str, Tuple[str, int]]]:
-        if origin not in self.vertices:
-            return None
 
-        # [current, parent, level]
-        vertices_stack: Deque[Tuple[str, str, int]] = deque()
-        # {current: (parent, level)}
-        visited_vertices: Dict[str, Tuple[str, int]] = dict()
-        to_be_visited_vertices: Set[str] = set()
+class _ScratchPool:
+    def __init__(self, vertices_num: int) -> None:
+        self.vertices_num = vertices_num
+        # Buffers devolvidos pelas travessias já terminadas
+        self._free: List[_ScratchBuffers] = []
 
-        vertices_stack.append((origin, "", 0))
+    def acquire(self) -> _ScratchBuffers:
+        buffers = self._free.pop() if len(self._free) != 0 else _ScratchBuffers(self.vertices_num)
 
-        while len(vertices_stack) != 0:
-            current, parent, level = vertices_stack.pop()
-            visited_vertices[current] = (parent, level)
-            to_be_visited_vertices.discard(current)
+        # Um carimbo novo invalida as marcas antigas sem percorrer os arrays; só zera quando o byte estoura
+        if buffers.stamp == 255:
+            buffers.marks[:] = bytes(self.vertices_num)
+            buffers.closed[:] = bytes(self.vertices_num)
+            buffers.stamp = 0
+        buffers.stamp += 1
 
-            for _, idx in self.adj_matrix[self.vertices[current]].keys():
-                vertex = str(idx + 1)
-                if vertex not in visited_vertices and vertex not in to_be_visited_vertices:
-                    vertices_stack.append((vertex, current, level + 1))
-                    to_be_visited_vertices.add(vertex)
+        return buffers
 
-        return visited_vertices
+    def release(self, buffers: _ScratchBuffers) -> None:
+        self._free.append(buffers)
 
-    def find_connected_components(self) -> List[Set[str]]:
-        connected_components: List[Set[str]] = list()
-        component: List[str] = list()
 
-        vertices_queue: Deque[str] = deque()
+class _UnionFind:
+    def __init__(self, vertices_num: int) -> None:
+        # parents[v] == v nas raízes; ranks[v] limita a altura da árvore de v e sizes[v] só vale nas raízes
+        self.parents = np.arange(vertices_num, dtype=np.int32)
+        self.ranks = np.zeros(vertices_num, dtype=np.uint8)
+        self.sizes = np.ones(vertices_num, dtype=np.int32)
+        self.count = vertices_num
+
+    def find(self, vertex: int) -> int:
+        parents = self.parents
+
+        root = vertex
+        while parents[root] != root:
+            root = int(parents[root])
+
+        # Compressão de caminho: todo o caminho passa a apontar direto para a raiz
+        while parents[vertex] != root:
+            parents[vertex], vertex = root, int(parents[vertex])
+
+        return root
+
+    def union(self, src: int, dest: int) -> None:
+        src, dest = self.find(src), self.find(dest)
+        if src == dest:
+            return
+
+        # União por rank: a árvore mais baixa fica embaixo da mais alta
+        if self.ranks[src] < self.ranks[dest]:
+            src, dest = dest, src
+        self.parents[dest] = src
+        self.sizes[src] += self.sizes[dest]
+        if self.ranks[src] == self.ranks[dest]:
+            self.ranks[src] += 1
+        self.count -= 1
+
+    def union_all(self, src: np.ndarray, dest: np.ndarray) -> None:
+        # Inserção em lote: pendura cada raiz na menor raiz vizinha e comprime tudo, até as arestas não unirem mais nada
+        parents = self.parents
+        while True:
+            self._compress()
+            src_roots, dest_roots = parents[src], parents[dest]
+            differ = src_roots != dest_roots
+            if not differ.any():
+                break
+
+            src_roots, dest_roots = src_roots[differ], dest_roots[differ]
+            np.minimum.at(parents, np.maximum(src_roots, dest_roots), np.minimum(src_roots, dest_roots))
+
+        # Depois de comprimidas as árvores têm altura no máximo 1
+        roots = parents == np.arange(len(parents))
+        self.sizes[roots] = np.bincount(parents, minlength=len(parents))[roots]
+        self.ranks[:] = 0
+        self.ranks[roots & (self.sizes > 1)] = 1
+        self.count = int(np.count_nonzero(roots))
+
+    def _compress(self) -> None:
+        # Salto de ponteiros: parents[v] = parents[parents[v]] até todo vértice apontar para a raiz
+        parents = self.parents
+        while True:
+            grandparents = parents[parents]
+            if np.array_equal(grandparents, parents):
+                return
+            parents[:] = grandparents
+
+
+def _iter_breadth_first_search(
+    adjacent: Callable[[int], Iterable[int]],
+    scratch: _ScratchPool,
+    origin: int,
+    max_level: Optional[int] = None,
+    stats: Optional[GraphStats] = None,
+) -> Iterator[Tuple[int, int, int]]:
+    # Contadores locais, copiados para stats só no fim
+    settled = scanned = 0
+    buffers = scratch.acquire()
+    try:
+        marks, parents, levels, stamp = buffers.marks, buffers.parents, buffers.levels, buffers.stamp
+
+        marks[origin] = stamp
+        parents[origin] = -1
+        levels[origin] = 0
+
+        # [current]; pai e nível ficam nos buffers
+        vertices_queue: Deque[int] = deque()
+        vertices_queue.append(origin)
 
-        to_be_visited_vertices: Set[str] = set()
-        visited_vertices: Set[str] = set()
+        while len(vertices_queue) != 0:
+            current = vertices_queue.popleft()
+            level = levels[current]
+            settled += 1
 
-        for vertex in self.vertices:
-            if vertex not in visited_vertices:
-                vertices_queue.append(vertex)
-                component = list()
+            # Entrega o vértice antes de expandi-lo: quem parar aqui não paga pelos vizinhos dele
+            yield current, parents[current], level
 
-                while len(vertices_queue) != 0:
-                    current = vertices_queue.popleft()
+            if max_level is not None and level >= max_level:
+                continue
 
-                    component.append(current)
+            neighbors = adjacent(current)
+            scanned += len(neighbors)
+            for vertex in neighbors:
+                if marks[vertex] != stamp:
+                    marks[vertex] = stamp
+                    parents[vertex] = current
+                    levels[vertex] = level + 1
+                    vertices_queue.append(vertex)
+    finally:
+        if stats is not None:
+            stats.vertices_settled += settled
+            stats.edges_scanned += scanned
+        scratch.release(buffers)
+
+
+def _iter_depth_first_search(
+    adjacent: Callable[[int], Iterable[int]],
+    scratch: _ScratchPool,
+    origin: int,
+    max_level: Optional[int] = None,
+    stats: Optional[GraphStats] = None,
+) -> Iterator[Tuple[int, int, int]]:
+    # Contadores locais, copiados para stats só no fim
+    settled = scanned = 0
+    buffers = scratch.acquire()
+    try:
+        marks, parents, levels, stamp = buffers.marks, buffers.parents, buffers.levels, buffers.stamp
+
+        marks[origin] = stamp
+        parents[origin] = -1
+        levels[origin] = 0
+
+        # [current]; pai e nível ficam nos buffers
+        vertices_stack: Deque[int] = deque()
+        vertices_stack.append(origin)
 
-                    to_be_visited_vertices.discard(current)
-                    visited_vertices.add(current)
+        while len(vertices_stack) != 0:
+            current = vertices_stack.pop()
+            level = levels[current]
+            settled += 1
 
-                    for _, idx in self.adj_matrix[self.vertices[current]].keys():
-                        vertex = str(idx + 1)
-                        if vertex not in visited_vertices and vertex not in to_be_visited_vertices:
-                            vertices_queue.append(vertex)
-                            to_be_visited_vertices.add(vertex)
+            yield current, parents[current], level
 
-                connected_components.append(set(component))
+            if max_level is not None and level >= max_level:
+                continue
 
-        return connected_components
+            neighbors = adjacent(current)
+            scanned += len(neighbors)
+            for vertex in neighbors:
+                if marks[vertex] != stamp:
+                    marks[vertex] = stamp
+                    parents[vertex] = current
+                    levels[vertex] = level + 1
+                    vertices_stack.append(vertex)
+    finally:
+        if stats is not None:
+            stats.vertices_settled += settled
+            stats.edges_scanned += scanned
+        scratch.release(buffers)
+
+
+def _connected_components(
+    adjacent: Callable[[int], Iterable[int]],
+    scratch: _ScratchPool,
+    vertices_num: int,
+    stats: Optional[GraphStats] = None,
+) -> List[Set[int]]:
+    connected_components: List[Set[int]] = list()
+    scanned = 0
+
+    buffers = scratch.acquire()
+    try:
+        marks, stamp = buffers.marks, buffers.stamp
+
+        for vertex in range(vertices_num):
+            if marks[vertex] == stamp:
+                continue
 
-    def get_graph_degrees(self) -> Dict[str, int]:
-        return {str(vertex + 1): line.count_nonzero() for vertex, line in enumerate(self.adj_matrix)}
+            marks[vertex] = stamp
+            vertices_stack: List[int] = [vertex]
+            local_component: Set[int] = set()
 
-    def out_graph(self, out_path: str):
-        with open(path.join(out_path, "graph_matrix_out.txt"), "w") as file:
-            file.write(f"# n = {len(self.vertices)}\n")
-            file.write(f"# m = {int(self.adj_matrix.count_nonzero() / 2)}\n")
-            for vertex, line in enumerate(self.adj_matrix):
-                file.write(f"{vertex + 1} {line.count_nonzero()}\n")
+            while len(vertices_stack) != 0:
+                current_vertex = vertices_stack.pop()
+                local_component.add(current_vertex)
 
+                neighbors = adjacent(current_vertex)
+                scanned += len(neighbors)
+                for neighbor in neighbors:
+                    if marks[neighbor] != stamp:
+                        marks[neighbor] = stamp
+                        vertices_stack.append(neighbor)
 
-class _GraphList:
-    def __init__(self, vertices_num: int) -> None:
-        # {vertice: (vizinho, peso)}
-        self.elements: Dict[str, Set[Tuple[str, float]]] = {
-            vertex: set() for vertex in (str(vertice + 1) for vertice in range(vertices_num))
-        }
+            connected_components.append(local_component)
+    finally:
+        if stats is not None:
+            stats.vertices_settled += vertices_num
+            stats.edges_scanned += scanned
+        scratch.release(buffers)
+
+    return connected_components
+
+
+def _level_sync_bfs(
+    offsets: np.ndarray,
+    neighbors: np.ndarray,
+    origin: int,
+    end: Optional[int] = None,
+    stats: Optional[GraphStats] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    vertices_num = len(offsets) - 1
+    parents = np.full(vertices_num, -1, dtype=np.int32)
+    levels = np.full(vertices_num, -1, dtype=np.int32)
+
+    levels[origin] = 0
+    frontier = np.array([origin], dtype=np.int32)
+    order = [frontier]
+
+    level = 0
+    while len(frontier) != 0 and (end is None or levels[end] == -1):
+        starts = offsets[frontier].astype(np.int64)
+        counts = offsets[frontier + 1] - starts
+        if stats is not None:
+            stats.vertices_settled += len(frontier)
+            stats.edges_scanned += int(counts.sum())
+
+        # Todos os vizinhos da fronteira de uma vez, na ordem em que a fila os visitaria
+        entries = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        candidates = neighbors[entries]
+        positions = np.repeat(np.arange(len(frontier)), counts)
+
+        new = levels[candidates] == -1
+        candidates, positions = candidates[new], positions[new]
+
+        # A primeira ocorrência de cada vértice define o pai (o primeiro da fila) e a ordem de chegada
+        _, first = np.unique(candidates, return_index=True)
+        first.sort()
+
+        level += 1
+        parents[candidates[first]] = frontier[positions[first]]
+        frontier = candidates[first].astype(np.int32)
+        levels[frontier] = level
+        order.append(frontier)
+
+    return np.concatenate(order), parents, levels
+
+
+def _bidirectional_bfs(
+    adjacent: Callable[[int], List[int]],
+    scratch: _ScratchPool,
+    origin: int,
+    end: int,
+    stats: Optional[GraphStats] = None,
+) -> Optional[List[int]]:
+    if origin == end:
+        return [origin]
+
+    settled = scanned = 0
+    # Um conjunto de buffers (marca, pai, nível) para cada lado
+    forward, backward = scratch.acquire(), scratch.acquire()
+    try:
+        for buffers, root in ((forward, origin), (backward, end)):
+            buffers.marks[root] = buffers.stamp
+            buffers.parents[root] = -1
+            buffers.levels[root] = 0
+        forward_frontier, backward_frontier = [origin], [end]
+
+        while len(forward_frontier) != 0 and len(backward_frontier) != 0:
+            # Expande sempre o lado com a menor fronteira, um nível inteiro por vez
+            expand_forward = len(forward_frontier) <= len(backward_frontier)
+            visited, other = (forward, backward) if expand_forward else (backward, forward)
+            frontier = forward_frontier if expand_forward else backward_frontier
+
+            marks, parents, levels, stamp = visited.marks, visited.parents, visited.levels, visited.stamp
+            other_marks, other_levels, other_stamp = other.marks, other.levels, other.stamp
+
+            # (tamanho, vértice deste lado, vértice do outro lado)
+            meeting: Optional[Tuple[int, int, int]] = None
+            next_frontier: List[int] = []
+            settled += len(frontier)
+            for current in frontier:
+                level = levels[current] + 1
+                neighbors = adjacent(current)
+                scanned += len(neighbors)
+                for vertex in neighbors:
+                    if other_marks[vertex] == other_stamp:
+                        length = level + other_levels[vertex]
+                        if meeting is None or length < meeting[0]:
+                            meeting = (length, current, vertex)
+                    if marks[vertex] != stamp:
+                        marks[vertex] = stamp
+                        parents[vertex] = current
+                        levels[vertex] = level
+                        next_frontier.append(vertex)
+
+            if meeting is not None:
+                _, near, far = meeting
+                if not expand_forward:
+                    near, far = far, near
+
+                path: List[int] = []
+                while near != -1:
+                    path.append(near)
+                    near = forward.parents[near]
+                path.reverse()
+                while far != -1:
+                    path.append(far)
+                    far = backward.parents[far]
+
+                return path
+
+            if expand_forward:
+                forward_frontier = next_frontier
+            else:
+                backward_frontier = next_frontier
+
+        return None
+    finally:
+        if stats is not None:
+            stats.vertices_settled += settled
+            stats.edges_scanned += scanned
+        scratch.release(forward)
+        scratch.release(backward)
+
+
+def _dijkstra_search(
+    adjacent: Callable[[int], Iterable[Tuple[int, float]]],
+    scratch: _ScratchPool,
+    origin: int,
+    end: Optional[int] = None,
+    heuristic: Optional[Callable[[int], float]] = None,
+    stats: Optional[GraphStats] = None,
+    max_weight: Optional[int] = None,
+) -> Dict[int, Tuple[int, float]]:
+    if max_weight is not None and heuristic is None:
+        return _dial_search(adjacent, scratch, origin, max_weight, end, stats)
+
+    # Contadores locais, copiados para stats só no fim
+    settled = scanned = stale = 0
+    pushes = 1
+    buffers = scratch.acquire()
+    try:
+        marks, closed, parents, distances, stamp = (
+            buffers.marks,
+            buffers.closed,
+            buffers.parents,
+            buffers.distances,
+            buffers.stamp,
+        )
+
+        marks[origin] = stamp
+        parents[origin] = -1
+        distances[origin] = 0
+        # Vértices alcançados, na ordem em que foram encontrados
+        reached_vertices: List[int] = [origin]
+
+        # [(prioridade, peso acumulado, vértice)]; no A* a prioridade soma a heurística
+        vertices_queue: List[Tuple[float, float, int]] = [(0, 0, origin)]
 
-    def insert_relation(self, edge: Edge):
-        self[edge.src].add((edge.dest, edge.weight))
-        self[edge.dest].add((edge.src, edge.weight))
+        while len(vertices_queue) != 0:
+            _, accumulated_weight, current = heapq.heappop(vertices_queue)
+            if closed[current] == stamp:
+                # Entrada velha: o vértice já foi fechado com uma distância menor
+                stale += 1
+                continue
 
-    def get_graph_degrees(self) -> Dict[str, int]:
-        return {vertex: len(edges) for vertex, edges in self.elements.items()}
+            closed[current] = stamp
+            settled += 1
+            # O destino já tem seu caminho mínimo definido
+            if current == end:
+                break
 
-    def out_graph(self, out_path: str):
-        with open(path.join(out_path, "graph_list_out.txt"), "w") as file:
-            file.write(f"# n = {len(self.elements.keys())}\n")
-            file.write(f"# m = {int(sum(len(edges) for edges in self.elements.values()) / 2)}\n")
+            for edge, weight in adjacent(current):
+                scanned += 1
+                new_weight = accumulated_weight + weight
 
-            for vertex, edges in self.elements.items():
-                file.write(f"{vertex} {len(edges)}\n")
+                if marks[edge] != stamp:
+                    marks[edge] = stamp
+                    distances[edge] = np.inf
+                    reached_vertices.append(edge)
 
-    def find_minimum_path(
-        self, origin: str, end: str, mode: Union[Literal["bfs"], Literal["dijkstra"]]
-    ) -> Union[List[Tuple[str, float]], List[str]]:
-        if origin not in self.elements or end not in self.elements:
-            return None
+                if new_weight < distances[edge]:
+                    parents[edge] = current
+                    distances[edge] = new_weight
+                    priority = new_weight if heuristic is None else new_weight + heuristic(edge)
+                    heapq.heappush(vertices_queue, (priority, new_weight, edge))
+                    pushes += 1
 
-        if mode == "dijkstra":
-            vertices = self.dijkstra(origin)
+        # {vertex: (parent, weight)}
+        return {vertex: (parents[vertex], distances[vertex]) for vertex in reached_vertices}
+    finally:
+        if stats is not None:
+            stats.vertices_settled += settled
+            stats.edges_scanned += scanned
+            stats.heap_pushes += pushes
+            stats.stale_pops += stale
+        scratch.release(buffers)
+
+
+# Maior peso inteiro para o qual os baldes do Dial compensam; acima disso fica o heap binário
+DIAL_MAX_WEIGHT = 1 << 12
+
+
+def _dial_search(
+    adjacent: Callable[[int], Iterable[Tuple[int, float]]],
+    scratch: _ScratchPool,
+    origin: int,
+    max_weight: int,
+    end: Optional[int] = None,
+    stats: Optional[GraphStats] = None,
+) -> Dict[int, Tuple[int, float]]:
+    # Dijkstra com fila de baldes (Dial) para pesos inteiros em [0, max_weight]: as distâncias provisórias
+    # ficam sempre entre a atual e a atual + max_weight, então max_weight + 1 baldes circulares bastam
+    settled = scanned = stale = 0
+    pushes = 1
+    buffers = scratch.acquire()
+    try:
+        marks, closed, parents, distances, stamp = (
+            buffers.marks,
+            buffers.closed,
+            buffers.parents,
+            buffers.distances,
+            buffers.stamp,
+        )
+
+        marks[origin] = stamp
+        parents[origin] = -1
+        distances[origin] = 0
+        reached_vertices: List[int] = [origin]
+
+        buckets_num = max_weight + 1
+        buckets: List[List[int]] = [[] for _ in range(buckets_num)]
+        buckets[0].append(origin)
+        # Entradas nos baldes, inclusive as velhas
+        pending = 1
+
+        # Em float, como os pesos: a soma do laço interno não precisa converter tipos
+        distance, slot = 0.0, 0
+        while pending != 0:
+            bucket = buckets[slot]
+            # Mesma ordem do heap entre empates (menor índice primeiro), então as árvores são idênticas
+            bucket.sort(reverse=True)
+
+            while len(bucket) != 0:
+                current = bucket.pop()
+                pending -= 1
+                if closed[current] == stamp:
+                    stale += 1
+                    continue
+
+                closed[current] = stamp
+                settled += 1
+                if current == end:
+                    pending = 0
+                    break
+
+                for edge, weight in adjacent(current):
+                    scanned += 1
+                    new_weight = distance + weight
+
+                    if marks[edge] != stamp:
+                        marks[edge] = stamp
+                        distances[edge] = np.inf
+                        reached_vertices.append(edge)
+
+                    if new_weight < distances[edge]:
+                        parents[edge] = current
+                        distances[edge] = new_weight
+                        if new_weight != distance:
+                            buckets[int(new_weight) % buckets_num].append(edge)
+                        else:
+                            # Peso 0: entra no balde atual já na sua posição, mantendo a ordem decrescente
+                            insort(bucket, edge, key=operator.neg)
+                        pushes += 1
+                        pending += 1
+
+            distance += 1
+            slot = slot + 1 if slot != max_weight else 0
 
-            if end not in vertices:
-                print("O vértice de destino não se encontra no mesmo componente do vértice de origem")
-                return None
+        # {vertex: (parent, weight)}
+        return {vertex: (parents[vertex], distances[vertex]) for vertex in reached_vertices}
+    finally:
+        if stats is not None:
+            stats.vertices_settled += settled
+            stats.edges_scanned += scanned
+            stats.heap_pushes += pushes
+            stats.stale_pops += stale
+        scratch.release(buffers)
+
+
+def _delta_stepping(
+    offsets: np.ndarray,
+    neighbors: np.ndarray,
+    weights: np.ndarray,
+    origin: int,
+    end: Optional[int] = None,
+    delta: Optional[float] = None,
+    stats: Optional[GraphStats] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    # Delta-stepping (Meyer e Sanders): baldes de largura delta em vez de uma fila de prioridade. As arestas leves
+    # (peso <= delta) do balde atual são relaxadas em lotes vetorizados até ele esvaziar; as pesadas, uma vez no fim
+    vertices_num = len(offsets) - 1
+    parents = np.full(vertices_num, -1, dtype=np.int32)
+    distances = np.full(vertices_num, np.inf, dtype=np.float64)
+    distances[origin] = 0
+
+    if delta is None:
+        # O peso médio deixa os lotes grandes sem muitas reinserções no mesmo balde
+        delta = float(weights.mean()) if len(weights) != 0 else 0.0
+    if delta <= 0:
+        delta = 1.0
+
+    rows = np.repeat(np.arange(vertices_num, dtype=np.int32), np.diff(offsets))
+    light = weights <= delta
+    light_edges = _edges_subset(vertices_num, rows, neighbors, weights, light)
+    heavy_edges = _edges_subset(vertices_num, rows, neighbors, weights, ~light)
+
+    settled = np.zeros(vertices_num, dtype=bool)
+    # Vértices alcançados e ainda não fechados, sem repetição
+    pending = np.array([origin], dtype=np.int32)
+    settled_num = scanned = pushes = 0
+
+    while len(pending) != 0 and (end is None or not settled[end]):
+        buckets = np.floor(distances[pending] / delta)
+        bucket = buckets.min()
+        in_bucket = buckets == bucket
+        frontier = pending[in_bucket]
+        pending = pending[~in_bucket]
+
+        # Um vértice pode voltar à fronteira se a distância dele cair sem sair do balde
+        bucket_vertices = [frontier]
+        while len(frontier) != 0:
+            improved, edges_num = _relax_edges(light_edges, frontier, distances, parents)
+            scanned += edges_num
+            pushes += len(improved)
+
+            stays = np.floor(distances[improved] / delta) == bucket
+            frontier = improved[stays]
+            bucket_vertices.append(frontier)
+            pending = np.union1d(pending, improved[~stays])
+
+        # As pesadas só alcançam baldes seguintes, então cada uma é relaxada uma vez
+        closed = np.unique(np.concatenate(bucket_vertices))
+        settled[closed] = True
+        settled_num += len(closed)
+        improved, edges_num = _relax_edges(heavy_edges, closed, distances, parents)
+        scanned += edges_num
+        pushes += len(improved)
+        pending = np.union1d(pending[~settled[pending]], improved)
+
+    if stats is not None:
+        stats.vertices_settled += settled_num
+        stats.edges_scanned += scanned
+        stats.heap_pushes += pushes
+
+    return parents, distances
+
+
+def _edges_subset(
+    vertices_num: int, rows: np.ndarray, neighbors: np.ndarray, weights: np.ndarray, mask: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # CSR só com as arestas selecionadas; rows está em ordem, então a máscara preserva o agrupamento por vértice
+    offsets = np.zeros(vertices_num + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows[mask], minlength=vertices_num), out=offsets[1:])
+    return offsets, neighbors[mask], weights[mask]
+
+
+def _relax_edges(
+    edges: Tuple[np.ndarray, np.ndarray, np.ndarray],
+    sources: np.ndarray,
+    distances: np.ndarray,
+    parents: np.ndarray,
+) -> Tuple[np.ndarray, int]:
+    offsets, neighbors, weights = edges
+    starts = offsets[sources]
+    counts = offsets[sources + 1] - starts
+
+    # Todas as arestas das origens de uma vez, como na busca em largura por níveis
+    entries = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+    origins = np.repeat(sources, counts)
+    targets = neighbors[entries]
+    candidates = distances[origins] + weights[entries]
+    better = candidates < distances[targets]
+    origins, targets, candidates = origins[better], targets[better], candidates[better]
+
+    # Vários pedidos para o mesmo vértice: fica o menor
+    order = np.lexsort((candidates, targets))
+    targets, candidates, origins = targets[order], candidates[order], origins[order]
+    first = np.ones(len(targets), dtype=bool)
+    first[1:] = targets[1:] != targets[:-1]
+    targets = targets[first]
+
+    distances[targets] = candidates[first]
+    parents[targets] = origins[first]
+    return targets, len(entries)
+
+
+def _bellman_ford(
+    offsets: np.ndarray,
+    neighbors: np.ndarray,
+    weights: np.ndarray,
+    origin: int,
+    stats: Optional[GraphStats] = None,
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    # Bellman-Ford com fila (SPFA), vetorizado: cada rodada relaxa de uma vez as arestas dos vértices que melhoraram
+    # na anterior. Devolve None se houver um ciclo negativo alcançável a partir da origem
+    vertices_num = len(offsets) - 1
+    parents = np.full(vertices_num, -1, dtype=np.int32)
+    distances = np.full(vertices_num, np.inf, dtype=np.float64)
+    distances[origin] = 0
+
+    edges = (offsets, neighbors, weights)
+    frontier = np.array([origin], dtype=np.int32)
+    rounds = settled = scanned = pushes = 0
+    negative_cycle = False
+
+    while len(frontier) != 0:
+        improved, edges_num = _relax_edges(edges, frontier, distances, parents)
+        rounds += 1
+        settled += len(frontier)
+        scanned += edges_num
+        pushes += len(improved)
+
+        # Sem ciclo negativo, n - 1 rodadas bastam; antes disso, um ciclo na árvore de pais já é a prova.
+        # A árvore só é conferida nas rodadas potência de 2, o que mantém o custo da verificação pequeno
+        if len(improved) != 0 and (
+            rounds >= vertices_num or (rounds & (rounds - 1) == 0 and _has_parent_cycle(parents))
+        ):
+            negative_cycle = True
+            break
+        frontier = improved
+
+    if stats is not None:
+        stats.vertices_settled += settled
+        stats.edges_scanned += scanned
+        stats.heap_pushes += pushes
+
+    return None if negative_cycle else (parents, distances)
+
+
+def _has_parent_cycle(parents: np.ndarray) -> bool:
+    # Saltos de 2^k ancestrais (pointer jumping): quem não chega à raiz (-1) em log n saltos está preso num ciclo.
+    # O -1 indexa a sentinela no fim, que aponta para ela mesma
+    ancestors = np.append(parents, -1)
+    for _ in range(max(1, len(parents).bit_length())):
+        ancestors = ancestors[ancestors]
+
+    return bool((ancestors[:-1] != -1).any())
+
+
+# Acima desta densidade (arestas / n²) o Floyd-Warshall vetorizado ganha de um Dijkstra por origem
+FLOYD_WARSHALL_DENSITY = 0.25
+# Linhas atualizadas de cada vez no Floyd-Warshall, para o bloco e o temporário ficarem no cache
+_FLOYD_WARSHALL_ROWS = 64
+# Bytes da matriz float64 de cada lote de origens do Dijkstra, antes de compactar
+_ALL_PAIRS_CHUNK_BYTES = 1 << 26
+
+
+def _distances_dtype(matrix: sps.csr_matrix, unweighted: bool) -> np.dtype:
+    # Distâncias inteiras: o menor inteiro que comporta o maior valor possível. Dentro de um componente nenhuma
+    # distância passa do dobro da excentricidade de um vértice, então uma só busca a partir de uma raiz por
+    # componente limita todas
+    _, labels = csgraph.connected_components(matrix, directed=False)
+    _, roots = np.unique(labels, return_index=True)
+    reach = csgraph.dijkstra(matrix, indices=roots, unweighted=unweighted, min_only=True)
+    bound = 2 * float(reach[~np.isinf(reach)].max(initial=0))
+
+    for dtype in (np.int16, np.int32):
+        if bound <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.float64)
+
+
+def _floyd_warshall_dtype(dtype: np.dtype) -> np.dtype:
+    # float32 é exato para as somas de inteiros que cabem em int16; o resto trabalha em float64
+    return np.dtype(np.float32 if dtype == np.int16 else np.float64)
+
+
+def _compact_distances(distances: np.ndarray, dtype: np.dtype) -> np.ndarray:
+    if dtype.kind == "f":
+        return distances.astype(dtype, copy=False)
+    return np.where(np.isinf(distances), -1, distances).astype(dtype)
+
+
+def _floyd_warshall(matrix: sps.csr_matrix, unweighted: bool, dtype: np.dtype) -> np.ndarray:
+    # Para cada k: D = min(D, D[:, k] + D[k, :]), vetorizado em blocos de linhas. Sem pesos negativos D[k, k] = 0,
+    # então a linha e a coluna k não mudam na própria iteração e a atualização pode ser feita no lugar
+    vertices_num = matrix.shape[0]
+    distances = np.full((vertices_num, vertices_num), np.inf, dtype=_floyd_warshall_dtype(dtype))
+
+    rows = np.repeat(np.arange(vertices_num), np.diff(matrix.indptr))
+    weights = np.ones(matrix.nnz) if unweighted else matrix.data
+    # Arestas repetidas ficam com o menor peso
+    np.minimum.at(distances, (rows, matrix.indices), weights.astype(distances.dtype))
+    np.fill_diagonal(distances, 0)
+
+    buffer = np.empty((_FLOYD_WARSHALL_ROWS, vertices_num), dtype=distances.dtype)
+    for k in range(vertices_num):
+        row_k = distances[k]
+        for start in range(0, vertices_num, _FLOYD_WARSHALL_ROWS):
+            block = distances[start : start + _FLOYD_WARSHALL_ROWS]
+            candidates = buffer[: len(block)]
+            np.add(block[:, k, None], row_k, out=candidates)
+            np.minimum(block, candidates, out=block)
+
+    if distances.dtype == dtype:
+        return distances
+
+    compact = np.empty((vertices_num, vertices_num), dtype=dtype)
+    step = _all_pairs_chunk(vertices_num)
+    for start in range(0, vertices_num, step):
+        compact[start : start + step] = _compact_distances(distances[start : start + step], dtype)
+    return compact
+
+
+def _all_pairs_chunk(vertices_num: int) -> int:
+    return max(1, min(vertices_num, _ALL_PAIRS_CHUNK_BYTES // (8 * max(vertices_num, 1))))
+
+
+def _sources_distances(matrix: sps.csr_matrix, unweighted: bool, dtype: np.dtype, sources: np.ndarray) -> np.ndarray:
+    return _compact_distances(csgraph.dijkstra(matrix, indices=sources, unweighted=unweighted), dtype)
+
+
+# Arestas compartilhadas com os processos do pool, definidas em _attach_shared_edges
+_shared_edges: Optional[Tuple[sps.csr_matrix, bool, np.dtype]] = None
+_shared_blocks: List[shared_memory.SharedMemory] = []
+
+
+def _attach_shared_edges(specs: Tuple[Tuple[str, int, str], ...], unweighted: bool, dtype: np.dtype) -> None:
+    global _shared_edges
+
+    arrays = []
+    for name, size, array_dtype in specs:
+        block = shared_memory.SharedMemory(name=name)
+        _shared_blocks.append(block)
+        arrays.append(np.ndarray(size, dtype=array_dtype, buffer=block.buf))
+
+    indptr, indices, data = arrays
+    vertices_num = len(indptr) - 1
+    _shared_edges = (sps.csr_matrix((data, indices, indptr), shape=(vertices_num, vertices_num)), unweighted, dtype)
+
+
+def _shared_distances(sources: np.ndarray) -> np.ndarray:
+    return _sources_distances(*_shared_edges, sources)
+
+
+def _parallel_all_pairs(
+    matrix: sps.csr_matrix, unweighted: bool, dtype: np.dtype, workers: Optional[int] = None
+) -> np.ndarray:
+    vertices_num = matrix.shape[0]
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    distances = np.empty((vertices_num, vertices_num), dtype=dtype)
+    if vertices_num == 0:
+        return distances
+
+    # Lotes limitados em bytes; com o pool, vários lotes por processo para equilibrar os componentes
+    tasks_num = -(-vertices_num // _all_pairs_chunk(vertices_num))
+    if workers > 1:
+        tasks_num = max(tasks_num, min(vertices_num, workers * 8))
+    tasks = np.array_split(np.arange(vertices_num, dtype=np.int32), tasks_num)
+
+    if workers <= 1:
+        for sources in tasks:
+            distances[sources] = _sources_distances(matrix, unweighted, dtype, sources)
+        return distances
+
+    blocks: List[shared_memory.SharedMemory] = []
+    try:
+        specs = []
+        for source in (matrix.indptr, matrix.indices, matrix.data):
+            block = shared_memory.SharedMemory(create=True, size=max(source.nbytes, 1))
+            blocks.append(block)
+            np.ndarray(len(source), dtype=source.dtype, buffer=block.buf)[:] = source
+            specs.append((block.name, len(source), source.dtype.str))
+
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_attach_shared_edges, initargs=(tuple(specs), unweighted, dtype)
+        ) as pool:
+            for sources, rows in zip(tasks, pool.map(_shared_distances, tasks)):
+                distances[sources] = rows
+        return distances
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def _bidirectional_dijkstra(
+    adjacent: Callable[[int], Iterable[Tuple[int, float]]],
+    scratch: _ScratchPool,
+    origin: int,
+    end: int,
+    stats: Optional[GraphStats] = None,
+) -> Optional[List[Tuple[int, float]]]:
+    if origin == end:
+        return [(origin, 0)]
+
+    settled = scanned = stale = 0
+    pushes = 2
+    # Um conjunto de buffers (marca, fechado, pai, distância) para cada lado
+    forward, backward = scratch.acquire(), scratch.acquire()
+    try:
+        for buffers, root in ((forward, origin), (backward, end)):
+            buffers.marks[root] = buffers.stamp
+            buffers.parents[root] = -1
+            buffers.distances[root] = 0
+        forward_queue: List[Tuple[float, int]] = [(0, origin)]
+        backward_queue: List[Tuple[float, int]] = [(0, end)]
+
+        # (peso total, vértice do lado da origem, vértice do lado do destino, peso da aresta entre eles)
+        best: Tuple[float, int, int, float] = (np.inf, -1, -1, np.inf)
+
+        while len(forward_queue) != 0 and len(backward_queue) != 0:
+            # Nenhum caminho que passe pelas fronteiras atuais pode ser menor que o melhor encontrado
+            if forward_queue[0][0] + backward_queue[0][0] >= best[0]:
+                break
+
+            expand_forward = forward_queue[0][0] <= backward_queue[0][0]
+            queue, visited, other = (
+                (forward_queue, forward, backward) if expand_forward else (backward_queue, backward, forward)
+            )
+
+            accumulated_weight, current = heapq.heappop(queue)
+            if visited.closed[current] == visited.stamp:
+                stale += 1
+                continue
 
-            # [(edge, acc_weight), ...]
-            path: List[Tuple[str, float]] = []
-            current, accumulated_weight = vertices[end]
-            while current != origin:
-                path.append((current, accumulated_weight))
-                current, accumulated_weight = vertices[current]
+            visited.closed[current] = visited.stamp
+            settled += 1
 
-            path.append((current, accumulated_weight))
+            marks, parents, distances, stamp = visited.marks, visited.parents, visited.distances, visited.stamp
+            for edge, weight in adjacent(current):
+                scanned += 1
+                new_weight = accumulated_weight + weight
 
-            return path.reverse()
-        else:  # bfs
-            vertices = self.breadth_first_search(origin)
+                if marks[edge] != stamp:
+                    marks[edge] = stamp
+                    distances[edge] = np.inf
 
-            # [edge, edge, ...]
-            path = []
-            current, _ = vertices[end]
-            while current != origin:
-                path.append(current)
-                current, _ = vertices[current]
+                if new_weight < distances[edge]:
+                    parents[edge] = current
+                    distances[edge] = new_weight
+                    heapq.heappush(queue, (new_weight, edge))
+                    pushes += 1
 
-            path.append(current)
+                if other.marks[edge] == other.stamp and new_weight + other.distances[edge] < best[0]:
+                    total = new_weight + other.distances[edge]
+                    best = (total, current, edge, weight) if expand_forward else (total, edge, current, weight)
 
-            return path.reverse()
-
-    def breadth_first_search(self, origin: str) -> Optional[Dict[str, Tuple[str, int]]]:
-        if origin not in self.elements:
+        _, near, far, weight = best
+        if near == -1:
             return None
 
-        # [current, parent, level]
-        vertices_queue: Deque[Tuple[str, str, int]] = deque()
-        # {current: (parent, level)}
-        visited_vertices: Dict[str, Tuple[str, int]] = dict()
+        # [(vertex, acc_weight), ...]
+        path: List[Tuple[int, float]] = []
+        while near != -1:
+            path.append((near, forward.distances[near]))
+            near = forward.parents[near]
+        path.reverse()
+
+        total = path[-1][1] + weight + backward.distances[far]
+        while far != -1:
+            path.append((far, total - backward.distances[far]))
+            far = backward.parents[far]
+
+        return path
+    finally:
+        if stats is not None:
+            stats.vertices_settled += settled
+            stats.edges_scanned += scanned
+            stats.heap_pushes += pushes
+            stats.stale_pops += stale
+        scratch.release(forward)
+        scratch.release(backward)
+
+
+def _search_dict(order: np.ndarray, parents: np.ndarray, levels: np.ndarray) -> Dict[int, Tuple[int, int]]:
+    # {vertex: (parent, level)} na ordem de visita, como devolvido pelas buscas com fila
+    return dict(zip(order.tolist(), zip(parents[order].tolist(), levels[order].tolist())))
+
+
+CACHE_SUFFIX = ".graphcache"
+
+# magic, vértices, tamanho de neighbors, tamanho da fonte, mtime da fonte (ns), hash da fonte, ponderado
+_CACHE_HEADER = struct.Struct("<8sqqqq32s?")
+_CACHE_HEADER_SIZE = 128
+_CACHE_MAGIC = b"GRAFOCSR"
+
+
+def _labels_to_components(component_labels: np.ndarray) -> List[Set[int]]:
+    # Conjuntos de vértices a partir dos rótulos, na ordem dos índices dos componentes
+    if len(component_labels) == 0:
+        return []
+
+    order = np.argsort(component_labels, kind="stable")
+    bounds = np.cumsum(np.bincount(component_labels))[:-1]
+    return [set(component.tolist()) for component in np.split(order, bounds)]
+
+
+def _source_key(file_path: str) -> Tuple[int, int, bytes]:
+    # (tamanho, mtime em ns, hash do conteúdo)
+    stat = os.stat(file_path)
+    return stat.st_size, stat.st_mtime_ns, _source_hash(file_path)
+
+
+def _source_hash(file_path: str) -> bytes:
+    digest = hashlib.blake2b(digest_size=32)
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def _align(position: int) -> int:
+    return (position + 7) & ~7
+
+
+def _write_graph_cache(
+    file_path: str,
+    vertices_num: int,
+    offsets: np.ndarray,
+    neighbors: np.ndarray,
+    weights: Optional[np.ndarray],
+    source_key: Optional[Tuple[int, int, bytes]],
+):
+    source_size, source_mtime, source_hash = source_key if source_key is not None else (0, 0, bytes(32))
+    header = _CACHE_HEADER.pack(
+        _CACHE_MAGIC, vertices_num, len(neighbors), source_size, source_mtime, source_hash, weights is not None
+    )
+
+    # Escreve em um arquivo temporário e troca de uma vez, para que leitores nunca vejam um cache incompleto
+    tmp_path = f"{file_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(header.ljust(_CACHE_HEADER_SIZE, b"\0"))
+        arrays = [offsets.astype("<i4"), neighbors.astype("<i4")]
+        if weights is not None:
+            arrays.append(weights.astype("<f8"))
+        for values in arrays:
+            file.write(bytes(_align(file.tell()) - file.tell()))
+            file.write(values.tobytes())
+    os.replace(tmp_path, file_path)
+
+
+def _read_cache_header(file_path: str) -> Optional[Tuple]:
+    try:
+        with open(file_path, "rb") as file:
+            header = file.read(_CACHE_HEADER.size)
+    except OSError:
+        return None
+
+    if len(header) != _CACHE_HEADER.size or header[:8] != _CACHE_MAGIC:
+        return None
+    return _CACHE_HEADER.unpack(header)
+
+
+def _check_graph_cache(cache_path: str, source_path: str, weighted: bool) -> bool:
+    header = _read_cache_header(cache_path)
+    if header is None:
+        return False
+
+    magic, vertices_num, neighbors_num, cached_size, cached_mtime, cached_hash, cached_weighted = header
+    stat = os.stat(source_path)
+
+    if cached_weighted != weighted or cached_size != stat.st_size:
+        return False
+    if cached_mtime == stat.st_mtime_ns:
+        return True
+
+    # Só o mtime mudou (ex.: checkout): confere o conteúdo e atualiza o cabeçalho
+    if cached_hash != _source_hash(source_path):
+        return False
+    try:
+        with open(cache_path, "r+b") as file:
+            file.write(
+                _CACHE_HEADER.pack(
+                    magic, vertices_num, neighbors_num, stat.st_size, stat.st_mtime_ns, cached_hash, cached_weighted
+                )
+            )
+    except OSError:
+        pass
+    return True
 
-        to_be_visited_vertices: Set[str] = set()
 
-        vertices_queue.append((origin, "", 0))
+def _map_graph_cache(file_path: str) -> Tuple[int, np.ndarray, Optional[np.ndarray], Optional[np.ndarray]]:
+    header = _read_cache_header(file_path)
+    if header is None:
+        raise ValueError(f"Cache de grafo inválido: {file_path}")
 
-        while len(vertices_queue) != 0:
-            current, parent, level = vertices_queue.popleft()
-            visited_vertices[current] = parent, level
-            to_be_visited_vertices.discard(current)
+    _, vertices_num, neighbors_num, _, _, _, weighted = header
 
-            for edge, _ in self[current]:
-                if edge not in visited_vertices and edge not in to_be_visited_vertices:
-                    vertices_queue.append((edge, current, level + 1))
-                    to_be_visited_vertices.add(edge)
+    def map_array(position: int, dtype: str, size: int) -> np.ndarray:
+        if size == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(file_path, dtype=dtype, mode="r", offset=position, shape=(size,))
 
-        return visited_vertices
+    # Mapeia os arrays em modo somente leitura: vários processos compartilham as mesmas páginas
+    position = _CACHE_HEADER_SIZE
+    offsets = map_array(position, "<i4", vertices_num + 1)
+    position = _align(position + offsets.nbytes)
+    neighbors = map_array(position, "<i4", neighbors_num)
+    position = _align(position + neighbors.nbytes)
+    weights = map_array(position, "<f8", neighbors_num) if weighted else None
 
-    def depth_first_search(self, origin: str) -> Optional[Dict[str, Tuple[str, int]]]:
-        if origin not in self.elements:
-            return None
+    return vertices_num, offsets, neighbors, weights
 
-        # [current, parent, level]
-        vertices_stack: Deque[Tuple[str, str, int]] = deque()
-        # {current: (parent, level)}
-        visited_vertices: Dict[str, Tuple[str, int]] = dict()
-
-        to_be_visited_vertices: Set[str] = set()
-
-        vertices_stack.append((origin, "", 0))
 
-        while len(vertices_stack) != 0:
-            current, parent, level = vertices_stack.pop()
-            visited_vertices[current] = parent, level
-            to_be_visited_vertices.discard(current)
+class _GraphMatrix:
+    def __init__(self, vertices_num: int, weighted: bool) -> None:
+        self.weighted = weighted
+        self._scratch = _ScratchPool(vertices_num)
+        # Consultas usam a matriz congelada em CSR (indptr/indices/data)
+        self.adj_matrix = sps.csr_matrix((vertices_num, vertices_num), dtype=float if weighted else bool)
+        # Inserções individuais entram no dok e são incorporadas no próximo freeze
+        self.pending = sps.dok_matrix((vertices_num, vertices_num), dtype=float if weighted else bool)
+        # Graus já com as inserções pendentes, sem fatiar linhas da matriz
+        self.degrees = np.zeros(vertices_num, dtype=np.int32)
+        # Há zeros explícitos na CSR, de arestas apagadas com peso 0, a remover no próximo freeze
+        self._zeroed = False
+
+    def insert_relation(self, src: int, dest: int, weight: float):
+        # Peso 0 não é guardado, então a aresta pode tanto surgir quanto continuar inexistente
+        frozen = self.adj_matrix[src, dest] != 0
+        existed = frozen or self.pending[src, dest] != 0
+
+        value = weight if self.weighted else 1
+        self.pending[src, dest] = value
+        self.pending[dest, src] = value
+        if frozen and value == 0:
+            # Como no dok, peso 0 apaga a aresta também da matriz congelada
+            self.adj_matrix[src, dest] = 0
+            self.adj_matrix[dest, src] = 0
+            self._zeroed = True
+
+        delta = int(value != 0) - int(existed)
+        self.degrees[src] += delta
+        if src != dest:
+            self.degrees[dest] += delta
+
+    def insert_relations(self, src: np.ndarray, dest: np.ndarray, weights: Optional[np.ndarray]):
+        # Mantém a ordem de inserção: o que estava pendente entra antes
+        self.freeze()
+
+        values = weights if self.weighted else np.ones(len(src), dtype=bool)
+        self._merge(src, dest, values)
+
+    def freeze(self):
+        if self._zeroed:
+            self.adj_matrix.eliminate_zeros()
+            self._zeroed = False
+        if self.pending.nnz == 0:
+            return
+
+        # O dok é simétrico, então basta uma direção de cada aresta pendente
+        pending = self.pending.tocoo()
+        upper = pending.row <= pending.col
+        self._merge(pending.row[upper], pending.col[upper], pending.data[upper])
+        self.pending = sps.dok_matrix(self.adj_matrix.shape, dtype=self.adj_matrix.dtype)
+
+    def _merge(self, src: np.ndarray, dest: np.ndarray, data: np.ndarray):
+        # Arestas não direcionadas, depois das já congeladas (uma direção de cada, pois a matriz é simétrica);
+        # para cada par prevalece o valor inserido por último, nas duas células
+        frozen = self.adj_matrix.tocoo()
+        upper = frozen.row <= frozen.col
+        rows, cols, data = _merge_undirected(
+            np.concatenate((frozen.row[upper], src)),
+            np.concatenate((frozen.col[upper], dest)),
+            np.concatenate((frozen.data[upper], data.astype(frozen.dtype))),
+            self.adj_matrix.shape[0],
+        )
+
+        self.adj_matrix = sps.csr_matrix((data, (rows, cols)), shape=self.adj_matrix.shape, dtype=self.adj_matrix.dtype)
+        # Como no dok, peso 0 não é guardado
+        self.adj_matrix.eliminate_zeros()
+        self.adj_matrix.sort_indices()
+        self.degrees = np.diff(self.adj_matrix.indptr).astype(np.int32)
+
+    def _adjacent(self, vertex: int) -> List[int]:
+        return self.adj_matrix.indices[self.adj_matrix.indptr[vertex] : self.adj_matrix.indptr[vertex + 1]].tolist()
+
+    def csr_arrays(self) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+        self.freeze()
+        weights = self.adj_matrix.data.astype(np.float64) if self.weighted else None
+        return self.adj_matrix.indptr.astype(np.int32), self.adj_matrix.indices.astype(np.int32), weights
+
+    def _weighted_adjacent(self, vertex: int) -> Iterable[Tuple[int, float]]:
+        start, end = self.adj_matrix.indptr[vertex], self.adj_matrix.indptr[vertex + 1]
+        return zip(self.adj_matrix.indices[start:end].tolist(), self.adj_matrix.data[start:end].tolist())
+
+    def dijkstra(
+        self,
+        origin: int,
+        end: Optional[int] = None,
+        heuristic: Optional[Callable[[int], float]] = None,
+        stats: Optional[GraphStats] = None,
+        max_weight: Optional[int] = None,
+    ) -> Dict[int, Tuple[int, float]]:
+        self.freeze()
+        return _dijkstra_search(self._weighted_adjacent, self._scratch, origin, end, heuristic, stats, max_weight)
+
+    def bidirectional_dijkstra(
+        self, origin: int, end: int, stats: Optional[GraphStats] = None
+    ) -> Optional[List[Tuple[int, float]]]:
+        self.freeze()
+        return _bidirectional_dijkstra(self._weighted_adjacent, self._scratch, origin, end, stats)
+
+    def edge_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # (offsets, neighbors, weights) para os algoritmos vetorizados, sem copiar a matriz
+        self.freeze()
+        return self.adj_matrix.indptr, self.adj_matrix.indices, self.adj_matrix.data.astype(np.float64, copy=False)
+
+    def iter_breadth_first_search(
+        self, origin: int, max_level: Optional[int] = None, stats: Optional[GraphStats] = None
+    ) -> Iterator[Tuple[int, int, int]]:
+        self.freeze()
+        return _iter_breadth_first_search(self._adjacent, self._scratch, origin, max_level, stats)
+
+    def iter_depth_first_search(
+        self, origin: int, max_level: Optional[int] = None, stats: Optional[GraphStats] = None
+    ) -> Iterator[Tuple[int, int, int]]:
+        self.freeze()
+        return _iter_depth_first_search(self._adjacent, self._scratch, origin, max_level, stats)
+
+    def breadth_first_search(
+        self,
+        origin: int,
+        end: Optional[int] = None,
+        level_sync: bool = False,
+        stats: Optional[GraphStats] = None,
+    ) -> Dict[int, Tuple[int, int]]:
+        self.freeze()
+
+        if level_sync:
+            indptr, indices = self.adj_matrix.indptr, self.adj_matrix.indices
+            order, parents, levels = _level_sync_bfs(indptr, indices, origin, end, stats)
+            return _search_dict(order, parents, levels)
 
-            for edge, _ in self[current]:
-                if edge not in visited_vertices and edge not in to_be_visited_vertices:
-                    vertices_stack.append((edge, current, level + 1))
-                    to_be_visited_vertices.add(edge)
+        # {current: (parent, level)}
+        visited_vertices: Dict[int, Tuple[int, int]] = dict()
+        for current, parent, level in self.iter_breadth_first_search(origin, stats=stats):
+            visited_vertices[current] = (parent, level)
+            if current == end:
+                break
 
         return visited_vertices
 
-    def dijkstra(self, origin: str) -> Dict[str, Tuple[str, float]]:
-        # {vertex: (parent, weight)}
-        paths: Dict[str, Tuple[str, float]] = defaultdict(lambda: ("", np.inf))
-        paths[origin] = ("", 0)
+    def bidirectional_search(self, origin: int, end: int, stats: Optional[GraphStats] = None) -> Optional[List[int]]:
+        self.freeze()
+        return _bidirectional_bfs(self._adjacent, self._scratch, origin, end, stats)
 
-        vertices_queue: List[Tuple[float, str]] = list()
-        visited_vertices: Set[str] = set()
+    def depth_first_search(self, origin: int, stats: Optional[GraphStats] = None) -> Dict[int, Tuple[int, int]]:
+        # {current: (parent, level)}
+        vertices = self.iter_depth_first_search(origin, stats=stats)
+        return {current: (parent, level) for current, parent, level in vertices}
 
-        heapq.heappush(vertices_queue, (0, origin))
+    def find_connected_components(self, stats: Optional[GraphStats] = None) -> List[Set[int]]:
+        return _labels_to_components(self.component_labels(stats))
 
-        qtd_vertices = len(self.elements)
-        while len(visited_vertices) < qtd_vertices:
-            accumulated_weight, current = heapq.heappop(vertices_queue)
-            if current in visited_vertices:
-                continue
+    def component_labels(self, stats: Optional[GraphStats] = None) -> np.ndarray:
+        self.freeze()
+        _, labels = csgraph.connected_components(self.adj_matrix, directed=False)
+        if stats is not None:
+            # A rotulação do scipy visita cada vértice e cada entrada da matriz uma vez
+            stats.vertices_settled += self.adj_matrix.shape[0]
+            stats.edges_scanned += self.adj_matrix.nnz
 
-            for (edge, weight) in self[current]:
-                new_weight = accumulated_weight + weight
-                old_weight = paths[edge][1]
+        # Renumera na ordem do menor vértice de cada componente, a mesma ordem das buscas
+        _, first = np.unique(labels, return_index=True)
+        relabel = np.empty(len(first), dtype=np.int32)
+        relabel[np.argsort(first)] = np.arange(len(first), dtype=np.int32)
+        return relabel[labels]
 
-                if new_weight < old_weight:
-                    paths[edge] = current, new_weight
-                    heapq.heappush(vertices_queue, (new_weight, edge))
+    def get_graph_degrees(self) -> np.ndarray:
+        return self.degrees.copy()
 
-            visited_vertices.add(current)
 
-        return dict(paths)
+class _GraphList:
+    def __init__(self, vertices_num: int) -> None:
+        # [vertice] -> {(vizinho, peso)}
+        self.elements: List[Set[Tuple[int, float]]] = [set() for _ in range(vertices_num)]
+        # degrees[v] == len(elements[v]), mantido a cada inserção
+        self.degrees = np.zeros(vertices_num, dtype=np.int32)
+        self._scratch = _ScratchPool(vertices_num)
+        # (offsets, neighbors, weights) para os algoritmos vetorizados, refeito após novas inserções
+        self._csr_index: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+
+    def insert_relation(self, src: int, dest: int, weight: float):
+        self._csr_index = None
+        if (dest, weight) not in self[src]:
+            self[src].add((dest, weight))
+            self[dest].add((src, weight))
+            self.degrees[src] += 1
+            if src != dest:
+                self.degrees[dest] += 1
+
+    def insert_relations(self, src: np.ndarray, dest: np.ndarray, weights: Optional[np.ndarray]):
+        self._csr_index = None
+        # Agrupa as arestas por vértice de origem e atualiza cada conjunto uma única vez
+        all_src = np.concatenate((src, dest))
+        order = np.argsort(all_src, kind="stable")
+        all_src = all_src[order]
+        all_dest = np.concatenate((dest, src))[order]
+        all_weights = None if weights is None else np.concatenate((weights, weights))[order]
+
+        vertices, starts = np.unique(all_src, return_index=True)
+        for vertex, neighbors, edge_weights in zip(
+            vertices.tolist(),
+            np.split(all_dest, starts[1:]),
+            repeat(None) if all_weights is None else np.split(all_weights, starts[1:]),
+        ):
+            # Sem pesos usa o próprio np.nan, como Edge, para que arestas repetidas sejam iguais no set
+            self.elements[vertex].update(
+                zip(neighbors.tolist(), repeat(np.nan) if edge_weights is None else edge_weights.tolist())
+            )
+            self.degrees[vertex] = len(self.elements[vertex])
+
+    def freeze(self):
+        # Os conjuntos de adjacência já servem diretamente às consultas
+        pass
+
+    def get_graph_degrees(self) -> np.ndarray:
+        return self.degrees.copy()
+
+    def csr_arrays(self) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+        offsets = np.zeros(len(self.elements) + 1, dtype=np.int32)
+        np.cumsum(self.get_graph_degrees(), out=offsets[1:])
+
+        edges_num = int(offsets[-1])
+        neighbors = np.fromiter((v for edges in self.elements for v, _ in edges), dtype=np.int32, count=edges_num)
+        weights = np.fromiter((w for edges in self.elements for _, w in edges), dtype=np.float64, count=edges_num)
+
+        return offsets, neighbors, weights
+
+    def iter_breadth_first_search(
+        self, origin: int, max_level: Optional[int] = None, stats: Optional[GraphStats] = None
+    ) -> Iterator[Tuple[int, int, int]]:
+        return _iter_breadth_first_search(self._adjacent, self._scratch, origin, max_level, stats)
+
+    def iter_depth_first_search(
+        self, origin: int, max_level: Optional[int] = None, stats: Optional[GraphStats] = None
+    ) -> Iterator[Tuple[int, int, int]]:
+        return _iter_depth_first_search(self._adjacent, self._scratch, origin, max_level, stats)
+
+    def breadth_first_search(self, origin: int, stats: Optional[GraphStats] = None) -> Dict[int, Tuple[int, int]]:
+        # {current: (parent, level)}
+        vertices = self.iter_breadth_first_search(origin, stats=stats)
+        return {current: (parent, level) for current, parent, level in vertices}
 
-    def _check_all_positive(self) -> bool:
-        return min(min(edge[1] for edge in edges) for edges in self.elements.values()) >= 0
+    def bidirectional_search(self, origin: int, end: int, stats: Optional[GraphStats] = None) -> Optional[List[int]]:
+        return _bidirectional_bfs(self._adjacent, self._scratch, origin, end, stats)
 
-    def find_connected_components(self) -> List[Set[str]]:
-        connected_components: List[Set[str]] = list()
-        visited_vertices: Set[str] = set()
+    def depth_first_search(self, origin: int, stats: Optional[GraphStats] = None) -> Dict[int, Tuple[int, int]]:
+        # {current: (parent, level)}
+        vertices = self.iter_depth_first_search(origin, stats=stats)
+        return {current: (parent, level) for current, parent, level in vertices}
 
-        for vertex in self.elements:
-            if vertex in visited_vertices:
-                continue
+    def _weighted_adjacent(self, vertex: int) -> Iterable[Tuple[int, float]]:
+        return self[vertex]
 
-            to_be_visited_vertices: Set[str] = set()
-            vertices_stack: Deque[str] = deque()
-            local_component: Set[str] = set()
+    def dijkstra(
+        self,
+        origin: int,
+        end: Optional[int] = None,
+        heuristic: Optional[Callable[[int], float]] = None,
+        stats: Optional[GraphStats] = None,
+        max_weight: Optional[int] = None,
+    ) -> Dict[int, Tuple[int, float]]:
+        return _dijkstra_search(self._weighted_adjacent, self._scratch, origin, end, heuristic, stats, max_weight)
+
+    def bidirectional_dijkstra(
+        self, origin: int, end: int, stats: Optional[GraphStats] = None
+    ) -> Optional[List[Tuple[int, float]]]:
+        return _bidirectional_dijkstra(self._weighted_adjacent, self._scratch, origin, end, stats)
+
+    def edge_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if self._csr_index is None:
+            self._csr_index = self.csr_arrays()
+        return self._csr_index
+
+    def find_connected_components(self, stats: Optional[GraphStats] = None) -> List[Set[int]]:
+        return _connected_components(self._adjacent, self._scratch, len(self.elements), stats)
+
+    def _adjacent(self, vertex: int) -> List[int]:
+        return [edge for edge, _ in self[vertex]]
 
-            vertices_stack.append(vertex)
+    def __getitem__(self, key):
+        return self.elements[key]
 
-            while len(vertices_stack) != 0:
-                current_vertex = vertices_stack.pop()
 
-                visited_vertices.add(current_vertex)
-                local_component.add(current_vertex)
-                to_be_visited_vertices.discard(current_vertex)
+class _GraphCSR:
+    def __init__(self, vertices_num: int, weighted: bool) -> None:
+        self.vertices_num = vertices_num
+        self._scratch = _ScratchPool(vertices_num)
+        # vizinhos de v: neighbors[offsets[v]:offsets[v + 1]] (pesos em weights, se houver)
+        self.offsets = np.zeros(vertices_num + 1, dtype=np.int32)
+        self.neighbors = np.zeros(0, dtype=np.int32)
+        self.weights: Optional[np.ndarray] = np.zeros(0, dtype=np.float64) if weighted else None
+
+        # Arestas inseridas desde a última compactação
+        self._pending_src = array("i")
+        self._pending_dest = array("i")
+        self._pending_weights = array("d")
+
+    def insert_relation(self, src: int, dest: int, weight: float):
+        self._pending_src.append(src)
+        self._pending_dest.append(dest)
+        if self.weights is not None:
+            self._pending_weights.append(weight)
+
+    def insert_relations(self, src: np.ndarray, dest: np.ndarray, weights: Optional[np.ndarray]):
+        self._pending_src.frombytes(src.astype(np.int32).tobytes())
+        self._pending_dest.frombytes(dest.astype(np.int32).tobytes())
+        if self.weights is not None:
+            self._pending_weights.frombytes(weights.astype(np.float64).tobytes())
+
+    def freeze(self):
+        if len(self._pending_src) == 0:
+            return
+
+        vertices_num = self.vertices_num
+        pending_src = np.frombuffer(self._pending_src, dtype=np.int32)
+        pending_dest = np.frombuffer(self._pending_dest, dtype=np.int32)
+
+        # O CSR já é simétrico: basta uma direção de cada aresta compactada, antes das pendentes
+        frozen_src = np.repeat(np.arange(vertices_num, dtype=np.int32), np.diff(self.offsets))
+        upper = frozen_src <= self.neighbors
+        weights = None
+        if self.weights is not None:
+            pending_weights = np.frombuffer(self._pending_weights, dtype=np.float64)
+            weights = np.concatenate((self.weights[upper], pending_weights))
+
+        src, self.neighbors, weights = _merge_undirected(
+            np.concatenate((frozen_src[upper], pending_src)),
+            np.concatenate((self.neighbors[upper], pending_dest)),
+            weights,
+            vertices_num,
+        )
+        self.offsets = np.zeros(vertices_num + 1, dtype=np.int32)
+        np.cumsum(np.bincount(src, minlength=vertices_num), out=self.offsets[1:])
+        if self.weights is not None:
+            self.weights = weights
+
+        self._pending_src = array("i")
+        self._pending_dest = array("i")
+        self._pending_weights = array("d")
+
+    def set_arrays(self, offsets: np.ndarray, neighbors: np.ndarray, weights: Optional[np.ndarray]):
+        self.offsets = offsets
+        self.neighbors = neighbors
+        if self.weights is not None:
+            self.weights = weights
+
+        self._pending_src = array("i")
+        self._pending_dest = array("i")
+        self._pending_weights = array("d")
+
+    def csr_arrays(self) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+        self.freeze()
+        return self.offsets, self.neighbors, self.weights
+
+    def _adjacent(self, vertex: int) -> List[int]:
+        return self.neighbors[self.offsets[vertex] : self.offsets[vertex + 1]].tolist()
+
+    def get_graph_degrees(self) -> np.ndarray:
+        self.freeze()
+        return np.diff(self.offsets)
+
+    def _weighted_adjacent(self, vertex: int) -> Iterable[Tuple[int, float]]:
+        start, end = self.offsets[vertex], self.offsets[vertex + 1]
+        return zip(self.neighbors[start:end].tolist(), self.weights[start:end].tolist())
+
+    def dijkstra(
+        self,
+        origin: int,
+        end: Optional[int] = None,
+        heuristic: Optional[Callable[[int], float]] = None,
+        stats: Optional[GraphStats] = None,
+        max_weight: Optional[int] = None,
+    ) -> Dict[int, Tuple[int, float]]:
+        self.freeze()
+        return _dijkstra_search(self._weighted_adjacent, self._scratch, origin, end, heuristic, stats, max_weight)
+
+    def bidirectional_dijkstra(
+        self, origin: int, end: int, stats: Optional[GraphStats] = None
+    ) -> Optional[List[Tuple[int, float]]]:
+        self.freeze()
+        return _bidirectional_dijkstra(self._weighted_adjacent, self._scratch, origin, end, stats)
+
+    def edge_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        self.freeze()
+        return self.offsets, self.neighbors, self.weights
+
+    def iter_breadth_first_search(
+        self, origin: int, max_level: Optional[int] = None, stats: Optional[GraphStats] = None
+    ) -> Iterator[Tuple[int, int, int]]:
+        self.freeze()
+        return _iter_breadth_first_search(self._adjacent, self._scratch, origin, max_level, stats)
+
+    def iter_depth_first_search(
+        self, origin: int, max_level: Optional[int] = None, stats: Optional[GraphStats] = None
+    ) -> Iterator[Tuple[int, int, int]]:
+        self.freeze()
+        return _iter_depth_first_search(self._adjacent, self._scratch, origin, max_level, stats)
+
+    def breadth_first_search(
+        self, origin: int, end: Optional[int] = None, stats: Optional[GraphStats] = None
+    ) -> Dict[int, Tuple[int, int]]:
+        # {current: (parent, level)}
+        visited_vertices: Dict[int, Tuple[int, int]] = dict()
+        for current, parent, level in self.iter_breadth_first_search(origin, stats=stats):
+            visited_vertices[current] = (parent, level)
+            if current == end:
+                break
 
-                for edge, _ in self[current_vertex]:
-                    if edge not in visited_vertices and edge not in to_be_visited_vertices:
-                        vertices_stack.append(edge)
-                        to_be_visited_vertices.add(edge)
+        return visited_vertices
 
-            connected_components.append(local_component)
+    def bidirectional_search(self, origin: int, end: int, stats: Optional[GraphStats] = None) -> Optional[List[int]]:
+        self.freeze()
+        return _bidirectional_bfs(self._adjacent, self._scratch, origin, end, stats)
 
-        return connected_components
+    def depth_first_search(self, origin: int, stats: Optional[GraphStats] = None) -> Dict[int, Tuple[int, int]]:
+        # {current: (parent, level)}
+        vertices = self.iter_depth_first_search(origin, stats=stats)
+        return {current: (parent, level) for current, parent, level in vertices}
 
-    def __getitem__(self, key):
-        return self.elements[key]
+    def find_connected_components(self, stats: Optional[GraphStats] = None) -> List[Set[int]]:
+        self.freeze()
+        return _connected_components(self._adjacent, self._scratch, self.vertices_num, stats)
 
 
 if __name__ == "__main__":